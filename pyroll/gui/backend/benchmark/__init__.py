@@ -0,0 +1 @@
+from .runner import load_fixtures, run_in_process, run_client, run_benchmark, compare_reports
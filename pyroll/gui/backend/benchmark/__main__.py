@@ -0,0 +1,59 @@
+"""
+Benchmark the simulation pipeline of the backend.
+
+Run from the backend directory::
+
+    python -m benchmark --output report.json
+    python -m benchmark --fixture wire_rod_long --repeat 10 --baseline report.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .runner import FIXTURES_DIR, compare_reports, run_benchmark
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--fixture", action="append", dest="fixtures",
+        help=f"fixture to run, may be repeated, all of {FIXTURES_DIR} if omitted"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timed in-process runs per fixture")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed in-process runs per fixture")
+    parser.add_argument("--requests", type=int, default=5, help="cold and cached requests per fixture")
+    parser.add_argument("--workers", type=int, default=1, help="simulation worker processes of the app")
+    parser.add_argument("--contours", action="store_true", help="request contours from the app")
+    parser.add_argument("--format", choices=["json", "columnar"], default=None, help="response format of the app")
+    parser.add_argument("--in-process-only", action="store_true", help="skip the requests to the app")
+    parser.add_argument("--client-only", action="store_true", help="skip the in-process runs")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    parser.add_argument("--output", type=Path, help="file to write the report to, standard output if omitted")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        fixture_names=args.fixtures,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        requests=args.requests,
+        workers=args.workers,
+        in_process=not args.client_only,
+        client=not args.in_process_only,
+        include_contours=args.contours,
+        response_format=args.format,
+    )
+
+    if args.baseline is not None:
+        report["comparison"] = compare_reports(report, json.loads(args.baseline.read_text()))
+
+    encoded = json.dumps(report, indent=2)
+    if args.output is None:
+        print(encoded)
+    else:
+        args.output.write_text(encoded + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+import copy
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+STAGES = (
+    "create_units",
+    "solve",
+    "extract_results",
+    "resolve_contours",
+    "serialize_json",
+    "serialize_columnar",
+)
+
+
+def load_fixtures(names: Optional[List[str]] = None, directory: Path = FIXTURES_DIR) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the pass schedules to benchmark, each a JSON file holding a request body of ``/api/simulate``.
+
+    Args:
+        names: file names without extension, all fixtures of the directory if omitted
+        directory: directory holding the fixture files
+    """
+    paths = sorted(directory.glob("*.json")) if names is None else [directory / f"{n}.json" for n in names]
+
+    fixtures = {}
+    for path in paths:
+        if not path.exists():
+            raise ValueError(f"Unknown fixture '{path.stem}', available: {', '.join(p.stem for p in directory.glob('*.json'))}")
+        with path.open() as f:
+            fixtures[path.stem] = json.load(f)
+
+    return fixtures
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Statistics of a list of durations in seconds."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def _run_pipeline(fixture: Dict[str, Any], timings: Optional[Dict[str, List[float]]] = None) -> int:
+    from pyroll.basic import PassSequence
+
+    from simulation.cache import encode_result
+    from simulation.encoding import encode_columnar
+    from simulation.helpers import create_initial_profile
+    from simulation.pyroll_basic_runner import CONTOUR_FIELDS, UNIT_TYPES, create_unit, extract_results, \
+        select_contours
+
+    def stage(name: str, fn: Callable[[], Any]):
+        start = time.perf_counter()
+        value = fn()
+        if timings is not None:
+            timings[name].append(time.perf_counter() - start)
+        return value
+
+    units = [u for u in fixture["passDesignData"] if u.get("type") in UNIT_TYPES]
+    in_profile_data = copy.deepcopy(fixture["inProfile"])
+
+    profile, sequence = stage(
+        "create_units",
+        lambda: (create_initial_profile(in_profile_data), PassSequence([create_unit(u) for u in units]))
+    )
+    stage("solve", lambda: sequence.solve(in_profile=profile))
+    results = stage("extract_results", lambda: extract_results(sequence))
+    resolved = stage("resolve_contours", lambda: select_contours(results, CONTOUR_FIELDS))
+    payload = stage("serialize_json", lambda: encode_result(resolved))
+    stage("serialize_columnar", lambda: encode_result(encode_columnar(resolved)))
+
+    return len(payload)
+
+
+def run_in_process(fixture: Dict[str, Any], repeat: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Time the stages of the simulation pipeline in the current process.
+
+    The pipeline is run ``warmup`` times untimed, ``repeat`` times timed and once more
+    under :py:mod:`tracemalloc` to find the peak of allocated memory.
+    """
+    for _ in range(warmup):
+        _run_pipeline(fixture)
+
+    timings: Dict[str, List[float]] = {s: [] for s in STAGES}
+    totals = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result_bytes = _run_pipeline(fixture, timings)
+        totals.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        _run_pipeline(fixture)
+        _, memory_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "stages": {s: summarize(t) for s, t in timings.items()},
+        "total": summarize(totals),
+        "memory_peak_bytes": memory_peak,
+        "result_bytes": result_bytes,
+    }
+
+
+def _request_series(client, fixture: Dict[str, Any], requests: int, params: Dict[str, Any],
+                    before: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    latencies = []
+    response_bytes = 0
+    started = time.perf_counter()
+
+    for _ in range(requests):
+        if before is not None:
+            before()
+
+        start = time.perf_counter()
+        response = client.post("/api/simulate", json=fixture, params=params)
+        latencies.append(time.perf_counter() - start)
+
+        response.raise_for_status()
+        body = response.json()
+        if not body.get("success"):
+            raise RuntimeError(f"Simulation failed: {body.get('errors')}")
+        response_bytes = len(response.content)
+
+    # clearing the cache between cold requests is not part of the measured time
+    measured = sum(latencies)
+    return {
+        "requests": requests,
+        "wall_seconds": time.perf_counter() - started,
+        "requests_per_second": requests / measured if measured > 0 else None,
+        "latency": summarize(latencies),
+        "response_bytes": response_bytes,
+    }
+
+
+def run_client(fixtures: Dict[str, Dict[str, Any]], requests: int = 5,
+               include_contours: bool = False, response_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Send the fixtures to ``/api/simulate`` of the FastAPI app through a test client.
+
+    Per fixture, ``cold`` requests are solved by the workers with the result cache cleared before each one,
+    ``cached`` requests are answered from the result cache.
+    The worker processes are configured by the ``PYROLL_GUI_*`` environment variables read on import of the app,
+    :py:func:`run_benchmark` sets them.
+    """
+    from fastapi.testclient import TestClient
+
+    import main
+
+    params = {"format": response_format} if response_format else {}
+    report = {}
+
+    with TestClient(main.app) as client:
+        for name, fixture in fixtures.items():
+            body = dict(fixture, include=["contours"]) if include_contours else fixture
+
+            # the first request also starts the worker processes
+            client.delete("/api/cache")
+            client.post("/api/simulate", json=body, params=params).raise_for_status()
+
+            report[name] = {
+                "cold": _request_series(client, body, requests, params, lambda: client.delete("/api/cache")),
+                "cached": _request_series(client, body, requests, params),
+            }
+
+    return report
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def run_benchmark(
+        fixture_names: Optional[List[str]] = None,
+        repeat: int = 5,
+        warmup: int = 1,
+        requests: int = 5,
+        workers: int = 1,
+        in_process: bool = True,
+        client: bool = True,
+        include_contours: bool = False,
+        response_format: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run the benchmark suite and return the report as JSON-serializable dictionary.
+
+    Prefix snapshots and the result cache database are disabled, so cold requests solve the whole sequence.
+    """
+    os.environ["PYROLL_GUI_WORKERS"] = str(workers)
+    os.environ["PYROLL_GUI_SNAPSHOT_MAX_ENTRIES"] = "0"
+    os.environ.pop("PYROLL_GUI_CACHE_DB", None)
+
+    fixtures = load_fixtures(fixture_names)
+
+    report: Dict[str, Any] = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "pyroll-core": _package_version("pyroll-core"),
+            "pyroll-basic": _package_version("pyroll-basic"),
+            "fastapi": _package_version("fastapi"),
+        },
+        "config": {
+            "repeat": repeat,
+            "warmup": warmup,
+            "requests": requests,
+            "workers": workers,
+            "include_contours": include_contours,
+            "format": response_format or "json",
+        },
+        "fixtures": {
+            name: {
+                "units": len(f["passDesignData"]),
+                "roll_passes": sum(u.get("type") in ("TwoRollPass", "ThreeRollPass") for u in f["passDesignData"]),
+            }
+            for name, f in fixtures.items()
+        },
+    }
+
+    if in_process:
+        for name, fixture in fixtures.items():
+            report["fixtures"][name]["in_process"] = run_in_process(fixture, repeat=repeat, warmup=warmup)
+
+    if client:
+        for name, client_report in run_client(fixtures, requests, include_contours, response_format).items():
+            report["fixtures"][name]["client"] = client_report
+
+    # maximum resident set size of this process, kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["max_rss_bytes"] = max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    return report
+
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ratios of the mean durations and of the throughput of ``report`` to those of ``baseline``.
+
+    A stage ratio above 1 means the stage got slower, a requests per second ratio above 1 means faster responses.
+    Fixtures and stages missing in one of the reports are left out.
+    """
+    comparison = {}
+
+    for name, current in report["fixtures"].items():
+        previous = baseline.get("fixtures", {}).get(name)
+        if previous is None:
+            continue
+
+        ratios: Dict[str, Any] = {}
+        if "in_process" in current and "in_process" in previous:
+            ratios["stages"] = {
+                stage: current["in_process"]["stages"][stage]["mean"] / previous["in_process"]["stages"][stage]["mean"]
+                for stage in current["in_process"]["stages"]
+                if stage in previous["in_process"]["stages"] and previous["in_process"]["stages"][stage]["mean"] > 0
+            }
+            ratios["memory_peak"] = \
+                current["in_process"]["memory_peak_bytes"] / previous["in_process"]["memory_peak_bytes"]
+
+        if "client" in current and "client" in previous:
+            ratios["requests_per_second"] = {
+                mode: current["client"][mode]["requests_per_second"] / previous["client"][mode]["requests_per_second"]
+                for mode in current["client"]
+                if mode in previous["client"] and previous["client"][mode]["requests_per_second"]
+            }
+
+        comparison[name] = ratios
+
+    return comparison
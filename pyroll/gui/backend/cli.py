@@ -0,0 +1,80 @@
+"""
+Command line simulation of designs without the server, installed as ``pyroll-gui``.
+
+Designs are read from JSON files in the form of the ``/api/simulate`` request body or from the XML files saved by
+the GUI, see :py:mod:`simulation.headless`. The outcome of each design is written as a line of JSON, or its
+results as Parquet or Arrow table with one row per design and unit. Failures are reported on stderr and make
+the exit code 1.
+
+Examples::
+
+    pyroll-gui designs/ --jobs 8 --output results.jsonl
+    pyroll-gui pass_design.xml --in-profile billet.xml --output results.parquet --contours out_profile_contour
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from typing import List, Optional
+
+from .simulation.constants import CONTOUR_FIELDS
+from .simulation.headless import find_designs, run_designs, write_jsonl, write_table
+
+FORMATS = ("jsonl", "parquet", "arrow")
+
+
+def _report_failures(outcomes):
+    for outcome in outcomes:
+        if not outcome["success"]:
+            print(f"{outcome['design']}: {outcome['error']}", file=sys.stderr)
+        yield outcome
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="pyroll-gui", description="Simulate pass designs without the server.")
+    parser.add_argument("paths", nargs="+", help="design files or directories searched for JSON and XML designs")
+    parser.add_argument("--in-profile", help="in-profile XML for pass design XML files")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="count of worker processes (default: 1)")
+    parser.add_argument("--output", "-o", help="output file (default: JSON lines on stdout)")
+    parser.add_argument(
+        "--format", choices=FORMATS,
+        help="output format (default: from the extension of the output file, else jsonl)"
+    )
+    parser.add_argument(
+        "--contours", action="append", choices=CONTOUR_FIELDS, default=[],
+        help="profile and roll contours to include, may be repeated"
+    )
+    args = parser.parse_args(argv)
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    file_format = args.format
+    if file_format is None:
+        suffix = args.output.rsplit(".", 1)[-1].lower() if args.output and "." in args.output else ""
+        file_format = suffix if suffix in FORMATS else "jsonl"
+    if file_format != "jsonl" and not args.output:
+        parser.error(f"{file_format} output requires --output")
+    if file_format != "jsonl" and importlib.util.find_spec("pyarrow") is None:
+        parser.error(f"{file_format} output requires pyarrow, install pyroll-gui[export]")
+
+    start = time.perf_counter()
+    outcomes = _report_failures(run_designs(find_designs(args.paths, args.in_profile), args.jobs, args.contours))
+
+    if file_format == "jsonl":
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                counts = write_jsonl(outcomes, file)
+        else:
+            counts = write_jsonl(outcomes, sys.stdout)
+    else:
+        counts = write_table(outcomes, args.output, file_format)
+
+    print(json.dumps({**counts, "seconds": round(time.perf_counter() - start, 3)}), file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
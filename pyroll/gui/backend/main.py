@@ -1,10 +1,47 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from enum import Enum
-from fastapi import FastAPI
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, ValidationError, model_validator
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any, Optional, Union
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import List, Literal, Dict, Any, Awaitable, Callable, Optional, Tuple, Union
 
-from simulation import roll_pass_contour, get_in_profile_contour, run_pyroll_simulation, create_roll_pass
+import numpy as np
+
+# pyroll is loaded in the background, see load_simulation, everything imported here must not need it
+import simulation
+from simulation import settings
+from simulation.cache import ResultCache, canonical_hash, simulation_key, encode_result
+from simulation.constants import CONTOUR_FIELDS, UNIT_TYPES
+from simulation.encoding import COLUMNAR_MEDIA_TYPE, encode_columnar
+from simulation.export import EXPORT_FORMATS, MissingResultError, ResultTable, csv_chunks, write_columnar
+from simulation.executor import SimulationExecutor, ExecutorSaturatedError, SimulationCancelledError, \
+    SimulationLimitError
+from simulation.jobs import JobManager, JobStore
+from simulation.library import DesignLibrary
+from simulation.schema import InProfileData, PassDesignUnit, json_schemas
+from simulation.montecarlo import DISTRIBUTIONS, OUTPUTS, OutputStatistics, sample_parameters, sample_requests
+from simulation.optimize import FREE_PARAMETERS, PatternSearch, candidate_requests, parameter_path, score
+from simulation.series import SERIES, reduce_lines, result_series
+from simulation.singleflight import SingleFlight
+from simulation.metrics import METRICS_MEDIA_TYPE, UNIT_BUCKETS, MetricsRegistry, RequestMetricsMiddleware, \
+    StageTimer
+from simulation.sweep import expand_variants, lookup_value, parameter_values, results_table, run_simulation_batch, \
+    variant_count
+from simulation.warmup import warm_up
+
+logger = logging.getLogger(__name__)
 
 
 class SolveMethod(str, Enum):
@@ -22,7 +59,289 @@ class BackwardSolveParams(BaseModel):
     out_cross_section: float = Field(..., description="Final Profile Area")
     out_velocity: float = Field(..., description="Final Profile Velocity")
 
-app = FastAPI(title="PyRolL-Basic")
+
+
+def record_worker_start(event: Dict[str, Any]):
+    startup_duration.observe(event["import_seconds"], process="worker", phase="import")
+    if "warmup_seconds" in event:
+        startup_duration.observe(event["warmup_seconds"], process="worker", phase="warmup")
+    if "warmup_error" in event:
+        logger.warning("Warm-up of simulation worker %s failed: %s", event["pid"], event["warmup_error"])
+
+
+simulation_executor = SimulationExecutor(
+    max_workers=settings.SIMULATION_WORKERS,
+    queue_depth=settings.SIMULATION_QUEUE_DEPTH,
+    retry_after=settings.SIMULATION_RETRY_AFTER,
+    poll_interval=settings.DISCONNECT_POLL_INTERVAL,
+    warm_up=warm_up if settings.WORKER_WARMUP else None,
+    on_worker_started=record_worker_start,
+    memory_limit=settings.MAX_REQUEST_MEMORY,
+)
+
+result_cache = ResultCache(
+    max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+    db_path=settings.RESULT_CACHE_DB,
+    db_max_bytes=settings.RESULT_CACHE_DB_MAX_BYTES,
+)
+
+design_library = DesignLibrary(settings.LIBRARY_DB)
+
+simulations_in_flight = SingleFlight()
+contours_in_flight = SingleFlight()
+
+metrics = MetricsRegistry(prefix="pyroll_gui_")
+
+request_duration = metrics.histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the response headers.",
+    ["method", "route", "status"]
+)
+stage_duration = metrics.histogram(
+    "simulation_stage_duration_seconds", "Duration of the stages of simulation requests.", ["stage"]
+)
+unit_solve_duration = metrics.histogram(
+    "unit_solve_duration_seconds", "Solve time of single units summed over the iterations of a simulation.",
+    ["type"], buckets=UNIT_BUCKETS
+)
+startup_duration = metrics.histogram(
+    "startup_duration_seconds", "Time the server and the worker processes took to import pyroll and to warm up.",
+    ["process", "phase"]
+)
+simulations_total = metrics.counter("simulations_total", "Simulation requests by outcome.", ["outcome"])
+worker_busy_seconds = metrics.counter("worker_busy_seconds_total", "Time the workers spent on simulations.")
+
+metrics.gauge("simulation_jobs_in_flight", "Simulations running or waiting for a worker.",
+              lambda: simulation_executor.in_flight)
+metrics.gauge("simulation_capacity", "Maximum count of simulations running or waiting.",
+              lambda: simulation_executor.capacity)
+metrics.gauge("simulation_workers", "Count of worker processes.", lambda: simulation_executor.max_workers)
+metrics.gauge("simulation_worker_utilization", "Fraction of the workers busy right now.",
+              lambda: min(simulation_executor.in_flight, simulation_executor.max_workers)
+                      / simulation_executor.max_workers)
+
+for _name, _documentation in [
+    ("hits", "Result cache hits in memory."),
+    ("disk_hits", "Result cache hits in the database."),
+    ("misses", "Result cache misses."),
+    ("evictions", "Results evicted from memory."),
+]:
+    metrics.gauge(f"result_cache_{_name}_total", _documentation,
+                  lambda name=_name: result_cache.stats()[name], kind="counter")
+metrics.gauge("result_cache_bytes", "Size of the results cached in memory.", lambda: result_cache.stats()["bytes"])
+metrics.gauge("result_cache_entries", "Count of results cached in memory.", lambda: result_cache.stats()["entries"])
+metrics.gauge("simulations_coalesced_total", "Simulation requests that joined an identical one in flight.",
+              lambda: simulations_in_flight.coalesced, kind="counter")
+metrics.gauge("rollpass_contours_coalesced_total", "Roll pass contour requests that joined an identical one in flight.",
+              lambda: contours_in_flight.coalesced, kind="counter")
+metrics.gauge("rollpass_contour_cache_hits_total", "Roll pass contour cache hits.",
+              lambda: rollpass_contour_cache_stats()["hits"], kind="counter")
+metrics.gauge("rollpass_contour_cache_misses_total", "Roll pass contour cache misses.",
+              lambda: rollpass_contour_cache_stats()["misses"], kind="counter")
+metrics.gauge("simulation_workers_started", "Worker processes that have imported pyroll and warmed up.",
+              lambda: simulation_executor.workers_started)
+
+simulation_loading: Optional[asyncio.Future] = None
+
+
+async def load_simulation():
+    """
+    Await the import of pyroll and the simulation modules in a background thread.
+
+    Endpoints running in the event loop must call this before using anything of ``simulation`` needing pyroll,
+    otherwise the import would block all other requests. The import is started by the lifespan if
+    ``PYROLL_GUI_PRELOAD`` is set, else by the first call.
+    """
+    global simulation_loading
+    if simulation_loading is None:
+        simulation_loading = asyncio.get_running_loop().run_in_executor(None, load_simulation_modules)
+    await asyncio.shield(simulation_loading)
+
+
+def load_simulation_modules():
+    startup_duration.observe(simulation.load(), process="server", phase="import")
+
+
+def rollpass_contour_cache_stats() -> Dict[str, int]:
+    # the cache lives in a module loading pyroll, metrics and stats must not trigger that
+    if "simulation.roll_pass_plot_runner" not in sys.modules:
+        return {"entries": 0, "max_entries": settings.CONTOUR_CACHE_SIZE, "hits": 0, "misses": 0}
+    return simulation.contour_cache_stats()
+
+
+def groove_cache_stats() -> Dict[str, int]:
+    # grooves of this process only, i.e. those of the contour endpoints, workers keep their own
+    if "simulation.helpers" not in sys.modules:
+        return {"entries": 0, "max_entries": settings.TEMPLATE_CACHE_SIZE, "hits": 0, "misses": 0}
+    return simulation.groove_cache_stats()
+
+
+def stored_result(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Result of a request from the result cache or else from a solved design of the library.
+
+    This may read and decode results from disk, coroutines use :py:func:`lookup_result` instead.
+    """
+    result = result_cache.get(key)
+    if result is None:
+        result = design_library.result(key)
+    return result
+
+
+async def lookup_result(key: str) -> Optional[Dict[str, Any]]:
+    """:py:func:`stored_result` run in a thread, so the event loop is not blocked."""
+    return await run_in_threadpool(stored_result, key)
+
+
+async def cache_result(key: str, result: Dict[str, Any]):
+    """Put a result into the result cache in a thread, encoding and writing it may take a while."""
+    await run_in_threadpool(result_cache.put, key, result)
+
+
+def take_worker_timings(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Remove the timings from a result fresh from a worker and add them to the metrics."""
+    timings = result.pop("timings", None)
+    if timings is None:
+        return None
+
+    worker_busy_seconds.inc(timings["total"])
+    for stage, seconds in timings["stages"].items():
+        stage_duration.observe(seconds, stage=f"worker_{stage}")
+    for unit in timings.get("units", []):
+        unit_solve_duration.observe(unit["seconds"], type=unit["type"] or "unknown")
+
+    return timings
+
+
+async def solve_request(
+        key: str,
+        request: Dict[str, Any],
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        on_progress: Optional[Callable[[int], None]] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Solve a simulation request in a worker and cache the result, returns the result and the worker timings.
+
+    ``on_progress`` is called with the index of each unit of the final solution once it is solved.
+    """
+    await load_simulation()
+    progress = {} if on_progress is None else {
+        "on_event": lambda event: on_progress(event["index"]),
+        "progress_only": True,
+    }
+    result = await simulation_executor.run(
+        simulation.run_pyroll_simulation,
+        is_disconnected=is_disconnected,
+        units=request["passDesignData"],
+        in_profile_data=request["inProfile"],
+        solve_method=request["solve_method"],
+        solve_params=request["solve_params"],
+        **progress
+    )
+    timings = take_worker_timings(result)
+    await cache_result(key, result)
+    return result, timings
+
+
+async def solve_requests(
+        requests: List[Optional[Dict[str, Any]]],
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        use_cache: bool = True,
+        use_snapshots: bool = True
+) -> Tuple[List[Optional[str]], List[Optional[Dict[str, Any]]], List[Optional[str]]]:
+    """
+    Solve several validated requests on the free workers, taking cached results where available.
+
+    Requests not cached are split into contiguous chunks, one per free worker, so consecutive requests sharing
+    a prefix of units are solved by the same worker and restart from its snapshot of that prefix.
+
+    Args:
+        requests: dumps of :py:class:`SimulationRequest`, None entries are skipped
+        use_cache: whether to look up and store the results in the result cache, off for one-off requests
+        use_snapshots: whether the workers restart from and keep snapshots of solved prefixes, off for one-off
+            requests
+
+    Returns:
+        per request the cache key, the result and the error, all None for skipped requests
+
+    Raises:
+        ExecutorSaturatedError: if some requests are not cached and no worker is free
+    """
+    keys = [
+        simulation_key(r["passDesignData"], r["inProfile"], r["solve_method"], r["solve_params"])
+        if r is not None else None
+        for r in requests
+    ]
+    results = await run_in_threadpool(
+        lambda: [stored_result(key) if key is not None and use_cache else None for key in keys]
+    )
+    errors: List[Optional[str]] = [None] * len(requests)
+
+    pending = [i for i, r in enumerate(results) if r is None and keys[i] is not None]
+    chunk_count = min(len(pending), simulation_executor.max_workers, simulation_executor.available)
+    if pending and chunk_count == 0:
+        raise ExecutorSaturatedError(simulation_executor.retry_after)
+    chunks = [c.tolist() for c in np.array_split(pending, chunk_count)] if pending else []
+
+    outcomes = await asyncio.gather(*(
+        simulation_executor.run(
+            run_simulation_batch,
+            is_disconnected=is_disconnected,
+            requests=[requests[i] for i in chunk],
+            use_snapshots=use_snapshots
+        )
+        for chunk in chunks
+    ))
+
+    solved = []
+    for chunk, chunk_outcomes in zip(chunks, outcomes):
+        for i, outcome in zip(chunk, chunk_outcomes):
+            results[i] = outcome["result"]
+            errors[i] = outcome["error"]
+            if outcome["result"] is not None:
+                take_worker_timings(outcome["result"])
+                solved.append(i)
+
+    if use_cache and solved:
+        await run_in_threadpool(lambda: [result_cache.put(keys[i], results[i]) for i in solved])
+
+    return keys, results, errors
+
+
+async def solve_job(request: Dict[str, Any], on_unit_solved: Callable[[], None]) -> Tuple[str, Dict[str, Any]]:
+    key = simulation_key(request["passDesignData"], request["inProfile"], request["solve_method"],
+                         request["solve_params"])
+
+    result = await lookup_result(key)
+    if result is None:
+        result, _ = await solve_request(key, request, on_progress=lambda index: on_unit_solved())
+
+    return key, result
+
+
+job_manager = JobManager(
+    JobStore(settings.JOB_DB),
+    solve_job,
+    concurrency=settings.JOB_CONCURRENCY,
+    retry_after=settings.SIMULATION_RETRY_AFTER,
+    retention=settings.JOB_RETENTION,
+)
+
+metrics.gauge("jobs_running", "Jobs of /api/jobs being solved.", lambda: job_manager.running)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # workers may be forked, start them before the import thread runs, a fork during an import can deadlock
+    simulation_executor.start()
+    if settings.PRELOAD:
+        asyncio.ensure_future(load_simulation())
+    await job_manager.start()
+    yield
+    await job_manager.shutdown()
+    simulation_executor.shutdown()
+
+
+app = FastAPI(title="PyRolL-Basic", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,28 +352,316 @@ app.add_middleware(
 )
 
 
+app.add_middleware(RequestMetricsMiddleware, request_duration=request_duration, stage_duration=stage_duration)
+
+
+class ResultField(str, Enum):
+    CONTOURS = "contours"
+    IN_PROFILE_CONTOUR = "in_profile_contour"
+    OUT_PROFILE_CONTOUR = "out_profile_contour"
+    ROLL_CONTOUR = "roll_contour"
+    TIMINGS = "timings"
+
+
+def contour_fields(include: List[ResultField]) -> List[str]:
+    if ResultField.CONTOURS in include:
+        return list(CONTOUR_FIELDS)
+    return [f.value for f in include if f.value in CONTOUR_FIELDS]
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """
+    JSON response encoded in a single pass.
+
+    Returned models and dictionaries would be validated against the response model and converted by
+    ``jsonable_encoder`` before encoding, each walking all values of the results again. Results are built by the
+    backend and match the declared models by construction, so endpoints returning them skip those passes.
+    """
+    return Response(encode_result(content), status_code=status_code, media_type="application/json")
+
+
+def model_content(model: BaseModel, *raw: str) -> Dict[str, Any]:
+    """Fields of a response model as JSON data, the fields named ``raw`` are taken as they are."""
+    content = model.model_dump(mode="json", exclude=set(raw))
+    content.update((name, getattr(model, name)) for name in raw)
+    return content
+
+
 class SimulationRequest(BaseModel):
-    inProfile: Dict[str, Any]
-    passDesignData: List[Dict[str, Any]]
+    inProfile: InProfileData
+    passDesignData: List[PassDesignUnit] = Field(
+        ..., max_length=settings.MAX_UNITS,
+        description=f"Rows of the pass design table, at most {settings.MAX_UNITS} (PYROLL_GUI_MAX_UNITS)"
+    )
     solve_method: SolveMethod = SolveMethod.STANDARD
     solve_params: Union[StandardSolveParams, ForwardSolveParams, BackwardSolveParams] = Field(
         default_factory=StandardSolveParams
     )
+    include: List[ResultField] = Field(
+        default_factory=list,
+        description="Geometry fields to add to the roll pass results, skipped by default "
+                    "(see /api/simulate/contours for fetching them later)"
+    )
+    contour_tolerance: float = Field(
+        0, ge=0, description="Simplify contours so that no point deviates more than this from the exact contour"
+    )
+
+
+class ContourRequest(BaseModel):
+    result_id: str = Field(..., description="Result id returned by /api/simulate")
+    passes: Optional[List[int]] = Field(None, description="Pass numbers as in the results, all if omitted")
+    include: List[ResultField] = Field(default_factory=lambda: [ResultField.CONTOURS])
+    contour_tolerance: float = Field(
+        0, ge=0, description="Simplify contours so that no point deviates more than this from the exact contour"
+    )
+
+
+SeriesName = Enum("SeriesName", {name.upper(): name for name in SERIES}, type=str)
+
+
+class SeriesRequest(BaseModel):
+    result_id: str = Field(..., description="Result id returned by /api/simulate")
+    series: List[SeriesName] = Field(default_factory=lambda: list(SeriesName))
+    max_points: int = Field(500, ge=3, description="Point budget of each series")
+    contours: List[ResultField] = Field(
+        default_factory=list, description="Contours of all units to include, e.g. out_profile_contour"
+    )
+    contour_max_points: int = Field(200, ge=4, description="Point budget of each contour line")
+    contour_tolerance: float = Field(
+        0, ge=0, description="Simplify contours so that no point deviates more than this from the exact contour"
+    )
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
+class ExportRequest(BaseModel):
+    result_id: Optional[str] = Field(None, description="Result id returned by /api/simulate")
+    result_ids: Optional[List[Optional[str]]] = Field(
+        None, description="Result ids returned by /api/simulate/batch, the row variant is the index in this list"
+    )
+    job_id: Optional[str] = Field(None, description="Id of a succeeded job of /api/jobs")
+    format: ExportFormat = ExportFormat.CSV
+    include: List[ResultField] = Field(default_factory=list, description="Contours to include as JSON columns")
+    contour_tolerance: float = Field(
+        0, ge=0, description="Simplify contours so that no point deviates more than this from the exact contour"
+    )
+
+    @model_validator(mode="after")
+    def check_source(self):
+        given = [name for name in ("result_id", "result_ids", "job_id") if getattr(self, name) is not None]
+        if len(given) != 1:
+            raise ValueError("Exactly one of result_id, result_ids and job_id must be given")
+        return self
+
+
+class ResponseFormat(str, Enum):
+    JSON = "json"
+    COLUMNAR = "columnar"
 
 
 class SimulationResponse(BaseModel):
     success: bool
+    result_id: Optional[str] = None
     input_data: Optional[List[Dict[str, Any]]] = None
     pyroll_results: Optional[Dict[str, Any]] = None
+    profile: Optional[Dict[str, Any]] = Field(
+        None, description="Profiler report, only with ?profile=true on a server started with PYROLL_GUI_PROFILING=1"
+    )
+    timings: Optional[Dict[str, Any]] = Field(
+        None, description="Durations in seconds of the stages of the request and, if solved, of the worker stages "
+                          "and unit solves; encoding of this response is not included"
+    )
     errors: Optional[str] = None
 
 
+class JobProgress(BaseModel):
+    units_solved: int
+    units_total: int
+
+
+class JobResponse(BaseModel):
+    id: str
+    status: str = Field(..., description="One of queued, running, succeeded, failed and cancelled")
+    progress: JobProgress
+    created: datetime
+    updated: datetime
+    result_id: Optional[str] = None
+    pyroll_results: Optional[Dict[str, Any]] = None
+    errors: Optional[str] = None
+
+
+class SweepParameter(BaseModel):
+    path: str = Field(..., description="Parameter path, e.g. 'passDesignData[3].gap' or 'inProfile.temperature'")
+    values: Optional[List[Any]] = Field(None, description="Explicit values")
+    start: Optional[float] = Field(None, description="First value of a range")
+    stop: Optional[float] = Field(None, description="Last value of a range (inclusive)")
+    step: Optional[float] = Field(None, description="Step of a range")
+
+
+class BatchSimulationRequest(BaseModel):
+    base: SimulationRequest
+    grid: List[SweepParameter] = Field(default_factory=list, description="Parameters combined as cartesian product")
+    variants: Optional[List[Dict[str, Any]]] = Field(
+        None, description="Explicit variants as mappings of parameter path to value, each combined with the grid"
+    )
+
+
+class BatchSimulationResponse(BaseModel):
+    success: bool
+    variants: int = 0
+    table: Optional[Dict[str, List[Any]]] = None
+    result_ids: Optional[List[Optional[str]]] = Field(
+        None, description="Result id of each variant, None if it failed; use them with /api/export"
+    )
+    failed: Optional[List[Dict[str, Any]]] = None
+    errors: Optional[str] = None
+
+
+class OptimizationParameter(BaseModel):
+    unit: int = Field(..., ge=0, description="Index of the roll pass in passDesignData")
+    name: Literal[tuple(FREE_PARAMETERS)]
+    lower: float = Field(..., ge=0)
+    upper: float = Field(..., gt=0)
+
+
+class OptimizationTargets(BaseModel):
+    cross_section_area: Optional[float] = Field(None, gt=0, description="Cross-section area of the final profile")
+    width: Optional[float] = Field(None, gt=0, description="Width of the final profile")
+    height: Optional[float] = Field(None, gt=0, description="Height of the final profile")
+
+
+class OptimizationConstraints(BaseModel):
+    filling_ratio_min: Optional[float] = Field(None, gt=0, description="Lower bound of the filling ratio of all passes")
+    filling_ratio_max: Optional[float] = Field(None, gt=0, description="Upper bound of the filling ratio of all passes")
+    max_roll_force: Optional[float] = Field(None, gt=0, description="Upper bound of the roll force of all passes")
+    max_power: Optional[float] = Field(None, gt=0, description="Upper bound of the power of all passes")
+
+
+class OptimizationRequest(BaseModel):
+    base: SimulationRequest
+    parameters: List[OptimizationParameter] = Field(..., min_length=1, description="Free parameters and their bounds")
+    targets: OptimizationTargets
+    constraints: OptimizationConstraints = Field(default_factory=OptimizationConstraints)
+    initial_step: float = Field(0.25, gt=0, le=1, description="First step as fraction of each parameter range")
+    min_step: float = Field(1e-3, gt=0, description="Step as fraction of the ranges at which the search stops")
+    max_evaluations: int = Field(200, ge=1, le=settings.OPTIMIZATION_MAX_EVALUATIONS)
+
+    @model_validator(mode="after")
+    def check_parameters(self):
+        units = self.base.passDesignData
+        paths = set()
+
+        for p in self.parameters:
+            if p.unit >= len(units):
+                raise ValueError(f"Parameter {p.name} refers to unit {p.unit}, but there are {len(units)} units")
+            unit_type = units[p.unit].get("type")
+            if unit_type not in FREE_PARAMETERS[p.name]:
+                raise ValueError(f"Unit {p.unit} of type {unit_type} has no parameter {p.name}")
+            if p.upper <= p.lower:
+                raise ValueError(f"Upper bound of {p.name} of unit {p.unit} must be greater than the lower bound")
+
+            path = parameter_path(p.unit, p.name)
+            if path in paths:
+                raise ValueError(f"Parameter {p.name} of unit {p.unit} is given twice")
+            paths.add(path)
+
+        if not self.targets.model_dump(exclude_none=True):
+            raise ValueError("At least one target must be given")
+        return self
+
+
+class UncertainParameter(BaseModel):
+    path: str = Field(..., description="Parameter path, e.g. 'passDesignData[3].gap' or 'inProfile.temperature'")
+    distribution: Literal[DISTRIBUTIONS] = "normal"
+    mean: Optional[float] = Field(None, description="Mean of a normal distribution, the value of the base if omitted")
+    std: Optional[float] = Field(None, gt=0, description="Standard deviation of a normal distribution")
+    lower: Optional[float] = Field(None, description="Lower bound, normal distributions are clipped to it")
+    upper: Optional[float] = Field(None, description="Upper bound, normal distributions are clipped to it")
+    mode: Optional[float] = Field(
+        None, description="Mode of a triangular distribution, the value of the base if omitted"
+    )
+
+    @model_validator(mode="after")
+    def check_arguments(self):
+        if self.distribution == "normal" and self.std is None:
+            raise ValueError(f"{self.path}: a normal distribution needs std")
+        if self.distribution != "normal" and (self.lower is None or self.upper is None):
+            raise ValueError(f"{self.path}: a {self.distribution} distribution needs lower and upper")
+        if self.lower is not None and self.upper is not None and self.upper <= self.lower:
+            raise ValueError(f"{self.path}: upper must be greater than lower")
+        return self
+
+
+class MonteCarloRequest(BaseModel):
+    base: SimulationRequest
+    parameters: List[UncertainParameter] = Field(..., min_length=1, description="Parameters drawn independently")
+    samples: int = Field(1000, ge=2, le=settings.MONTE_CARLO_MAX_SAMPLES)
+    seed: Optional[int] = Field(None, description="Seed of the random generator, for reproducible samples")
+    outputs: List[str] = Field(default_factory=lambda: list(OUTPUTS), description="Unit result fields to analyse")
+    percentiles: List[float] = Field(default_factory=lambda: [5, 50, 95])
+
+    @model_validator(mode="after")
+    def check_percentiles(self):
+        if any(p < 0 or p > 100 for p in self.percentiles):
+            raise ValueError("Percentiles must be between 0 and 100")
+        return self
+
+
+class LibrarySaveRequest(BaseModel):
+    name: str = Field(..., min_length=1, max_length=200)
+    description: str = Field("", max_length=10000)
+    design: SimulationRequest
+
+
+class LibraryDesignSummary(BaseModel):
+    id: str
+    name: str
+    description: str
+    created: datetime
+    updated: datetime
+    shape: Optional[str] = Field(None, description="Shape of the in-profile")
+    units: int
+    solve_method: str
+    result_id: str = Field(..., description="Result id to use with /api/simulate/contours, /series and /api/export")
+    solved: bool = Field(..., description="Whether the result is stored, loading the design needs no simulation then")
+    final_cross_section_area: Optional[float] = None
+    final_width: Optional[float] = None
+    final_height: Optional[float] = None
+    grooves: List[str] = Field(default_factory=list, description="Groove types of the roll passes")
+    materials: List[str] = Field(default_factory=list, description="Materials of the in-profile")
+
+
+class LibraryPage(BaseModel):
+    total: int = Field(..., description="Count of all designs matching the criteria")
+    offset: int
+    limit: int
+    designs: List[LibraryDesignSummary]
+
+
+class LibraryDesignResponse(LibraryDesignSummary):
+    request: Dict[str, Any] = Field(..., description="The simulation request, in the form of the /api/simulate body")
+    pyroll_results: Optional[Dict[str, Any]] = None
+
+
+class LibrarySaveResponse(BaseModel):
+    success: bool
+    design: LibraryDesignSummary
+    errors: Optional[str] = Field(None, description="Why the design could not be solved, it is stored without result")
+
+
 @app.get("/")
 def read_root():
     return {
         "status": "API running",
         "version": "1.0",
-        "endpoints": ["/api/simulate", "/api/rollpass-contour", "/api/inprofile-contour", "/api/pass-with-profiles"]
+        "endpoints": ["/health", "/ready", "/metrics", "/api/simulate", "/api/rollpass-contour", "/api/inprofile-contour", "/api/pass-with-profiles",
+                      "/api/simulate/batch", "/api/simulate/stream", "/api/simulate/contours", "/api/simulate/series",
+                      "/api/rollpass-contour/batch", "/api/optimize", "/api/montecarlo", "/api/export",
+                      "/api/cache/stats", "/api/jobs", "/api/library", "/api/schema"]
     }
 
 
@@ -63,63 +670,801 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+def readiness_check():
+    """Answer 503 until pyroll is imported and all workers are warmed up, for readiness probes."""
+    ready = simulation.is_loaded() and simulation_executor.ready
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "starting",
+            "pyroll_loaded": simulation.is_loaded(),
+            "workers_started": simulation_executor.workers_started,
+            "workers": simulation_executor.max_workers,
+        },
+        status_code=200 if ready else 503
+    )
+
+
+@app.get("/api/schema")
+def pass_design_schema():
+    """JSON schemas of the pass design rows, the initial profile and the parameters of each groove type."""
+    return json_schemas()
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), media_type=METRICS_MEDIA_TYPE)
+
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    return {
+        **result_cache.stats(),
+        "rollpass_contours": rollpass_contour_cache_stats(),
+        "grooves": groove_cache_stats(),
+    }
+
+
+@app.delete("/api/cache")
+def clear_cache():
+    result_cache.clear()
+    return {"success": True}
+
+
 @app.post("/api/simulate", response_model=SimulationResponse)
-async def run_simulation(data: SimulationRequest):
+async def run_simulation(
+        data: SimulationRequest,
+        request: Request,
+        format: Optional[ResponseFormat] = Query(
+            None, description=f"Response format, 'columnar' may also be requested by Accept: {COLUMNAR_MEDIA_TYPE}"
+        ),
+        dtype: str = Query("float32", description="Float type of packed contour coordinates in columnar format"),
+        decimate: int = Query(1, ge=1, description="Keep only every n-th contour point in columnar format"),
+        precision: Optional[int] = Query(None, ge=0, description="Decimals of contour coordinates in columnar format"),
+        profile: bool = Query(
+            False, description="Solve under the profiler, bypassing the result cache (debugging only, "
+                               "requires PYROLL_GUI_PROFILING=1)"
+        ),
+        profile_limit: int = Query(30, ge=1, le=500, description="Count of functions and hooks in the profiler report")
+):
+    if profile and not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled on this server")
+
+    received = request.state.received
+    timer = StageTimer(started=received)
+    # body parsing and validation happen before the endpoint is called
+    timer.stages["request_parsing"] = time.perf_counter() - received
+
+    if format is None:
+        columnar = COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+    else:
+        columnar = format == ResponseFormat.COLUMNAR
+
     try:
+        await load_simulation()
+        solve_params = data.solve_params.model_dump()
+        key = simulation_key(data.passDesignData, data.inProfile, data.solve_method.value, solve_params)
+
+        with timer.span("cache_lookup"):
+            result = await lookup_result(key) if not profile else None
+
+        worker_timings = None
+        profile_report = None
+        coalesced = False
+        if result is None and profile:
+            with timer.span("simulation"):
+                result = await simulation_executor.run(
+                    simulation.run_profiled_simulation,
+                    is_disconnected=request.is_disconnected,
+                    units=data.passDesignData,
+                    in_profile_data=data.inProfile,
+                    solve_method=data.solve_method.value,
+                    solve_params=solve_params,
+                    limit=profile_limit
+                )
+            profile_report = result.pop("profile")
+            # times measured under the profiler would distort the metrics
+            worker_timings = result.pop("timings")
+            # the result is that of an ordinary solve, so its id works with the other endpoints
+            await cache_result(key, result)
+
+        elif result is None:
+            # identical requests arriving while this one is solved wait for the same job
+            coalesced = key in simulations_in_flight
+            solve_request_data = {
+                "passDesignData": data.passDesignData,
+                "inProfile": data.inProfile,
+                "solve_method": data.solve_method.value,  # Convert Enum to string value
+                "solve_params": solve_params,
+            }
+            with timer.span("simulation"):
+                result, worker_timings = await simulations_in_flight.run(
+                    key,
+                    lambda all_disconnected: solve_request(key, solve_request_data, is_disconnected=all_disconnected),
+                    is_disconnected=request.is_disconnected
+                )
+
+        if worker_timings is not None:
+            timer.stages["queue_and_transfer"] = max(0.0, timer.stages["simulation"] - worker_timings["total"])
+
+        with timer.span("select_contours"):
+            result = simulation.select_contours(result, contour_fields(data.include), data.contour_tolerance)
+
+        if columnar:
+            with timer.span("encode_columnar"):
+                result = encode_columnar(result, dtype=dtype, decimate=decimate, precision=precision)
+
+        if profile:
+            simulations_total.inc(outcome="profiled")
+        else:
+            simulations_total.inc(
+                outcome="cached" if worker_timings is None else "coalesced" if coalesced else "solved"
+            )
+            for stage, seconds in timer.stages.items():
+                stage_duration.observe(seconds, stage=stage)
+
+        request.state.handler_done = time.perf_counter()
+        return json_response(model_content(SimulationResponse(
+            success=True,
+            result_id=key,
+            input_data=data.passDesignData,
+            pyroll_results=result,
+            profile=profile_report,
+            timings={**timer.report(), "cached": worker_timings is None, "coalesced": coalesced,
+                     "worker": worker_timings}
+            if ResultField.TIMINGS in data.include else None
+        ), "input_data", "pyroll_results", "profile", "timings"))
+
+    except ExecutorSaturatedError as e:
+        simulations_total.inc(outcome="rejected")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    except SimulationCancelledError:
+        # nobody is listening anymore
+        simulations_total.inc(outcome="cancelled")
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
+    except SimulationLimitError as e:
+        simulations_total.inc(outcome="too_large")
+        raise HTTPException(status_code=413, detail=str(e))
+
+    except Exception as e:
+        logger.exception("Simulation failed")
+        simulations_total.inc(outcome="failed")
+        return SimulationResponse(success=False, input_data=data.passDesignData, errors=str(e))
+
+def job_response(job: Dict[str, Any], include_result: bool = True, status_code: int = 200) -> Response:
+    result = job.get("result")
+    if result is not None and include_result:
+        request = job["request"]
+        result = simulation.select_contours(
+            result, contour_fields([ResultField(f) for f in request.get("include", [])]),
+            request.get("contour_tolerance", 0)
+        )
+    else:
+        result = None
+
+    return json_response(model_content(JobResponse(
+        id=job["id"],
+        status=job["status"],
+        progress=JobProgress(units_solved=job["units_solved"], units_total=job["units_total"]),
+        created=datetime.fromtimestamp(job["created"], timezone.utc),
+        updated=datetime.fromtimestamp(job["updated"], timezone.utc),
+        result_id=job["result_id"],
+        pyroll_results=result,
+        errors=job["error"]
+    ), "pyroll_results"), status_code)
+
+
+# the job endpoints run in the threadpool, the job manager hands queue and tasks over to the event loop
+@app.post("/api/jobs", response_model=JobResponse, status_code=202)
+def submit_job(data: SimulationRequest):
+    """Queue a simulation and return at once, poll ``GET /api/jobs/{id}`` for progress and result."""
+    units_total = sum(u.get("type") in UNIT_TYPES for u in data.passDesignData)
+    job_id = job_manager.submit(data.model_dump(mode="json"), units_total)
+    return job_response(job_manager.store.get(job_id), status_code=202)
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str, include_result: bool = Query(True, description="Whether to add the results when done")):
+    job = job_manager.store.get(job_id, with_result=include_result)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job, include_result)
+
+
+@app.delete("/api/jobs/{job_id}", response_model=JobResponse)
+def delete_job(job_id: str):
+    """Cancel a queued or running job, or remove a finished one from the store."""
+    job = job_manager.store.get(job_id, with_result=False)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if not job_manager.cancel(job_id):
+        job_manager.store.delete(job_id)
+        return job_response(job, include_result=False)
+
+    return job_response(job_manager.store.get(job_id, with_result=False), include_result=False)
+
 
-        result = run_pyroll_simulation(
+def library_summary(design: Dict[str, Any]) -> LibraryDesignSummary:
+    return LibraryDesignSummary(**{
+        **design,
+        "created": datetime.fromtimestamp(design["created"], timezone.utc),
+        "updated": datetime.fromtimestamp(design["updated"], timezone.utc),
+    })
+
+
+@app.post("/api/library", response_model=LibrarySaveResponse, status_code=201)
+async def save_design(data: LibrarySaveRequest, request: Request):
+    """
+    Store a design in the library with its result, solving it unless the result is available already.
+
+    Designs that cannot be solved are stored without result, the reason is returned in ``errors``.
+    """
+    design = data.design.model_dump(mode="json")
+    key = simulation_key(design["passDesignData"], design["inProfile"], design["solve_method"], design["solve_params"])
+
+    result = await lookup_result(key)
+    error = None
+    if result is None:
+        try:
+            result, _ = await solve_request(key, design, is_disconnected=request.is_disconnected)
+        except ExecutorSaturatedError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        except SimulationCancelledError:
+            raise HTTPException(status_code=499, detail="Client disconnected")
+        except Exception as e:
+            error = str(e)
+
+    # the library encodes and writes the result, which may take a while and wait for other processes
+    design_id = await run_in_threadpool(design_library.save, data.name, design, key, result, data.description)
+    summary = await run_in_threadpool(design_library.get, design_id, with_result=False)
+    return LibrarySaveResponse(success=True, design=library_summary(summary), errors=error)
+
+
+@app.get("/api/library", response_model=LibraryPage)
+def search_designs(
+        name: Optional[str] = Query(None, description="Part of the design name, case-insensitive"),
+        groove_type: Optional[str] = Query(None, description="Groove type of any roll pass, e.g. RoundGroove"),
+        material: Optional[str] = Query(None, description="Material of the in-profile, e.g. C45"),
+        shape: Optional[str] = Query(None, description="Shape of the in-profile"),
+        min_cross_section_area: Optional[float] = Query(None, ge=0, description="Of the final profile"),
+        max_cross_section_area: Optional[float] = Query(None, ge=0, description="Of the final profile"),
+        created_after: Optional[datetime] = Query(None),
+        created_before: Optional[datetime] = Query(None),
+        offset: int = Query(0, ge=0, description="Count of matching designs to skip"),
+        limit: int = Query(50, ge=1, le=500, description="Maximum count of designs to return"),
+):
+    """Summaries of the designs of the library matching all given criteria, newest first."""
+    total, designs = design_library.search(
+        name=name,
+        groove_type=groove_type,
+        material=material,
+        shape=shape,
+        min_cross_section_area=min_cross_section_area,
+        max_cross_section_area=max_cross_section_area,
+        created_after=created_after.timestamp() if created_after is not None else None,
+        created_before=created_before.timestamp() if created_before is not None else None,
+        offset=offset,
+        limit=limit,
+    )
+    return LibraryPage(total=total, offset=offset, limit=limit, designs=[library_summary(d) for d in designs])
+
+
+@app.get("/api/library/{design_id}", response_model=LibraryDesignResponse)
+async def load_design(
+        design_id: str,
+        include: List[ResultField] = Query([], description="Geometry fields to add to the roll pass results"),
+        contour_tolerance: float = Query(0, ge=0, description="Simplification tolerance of the contours")
+):
+    """A design of the library with its stored result, without simulating it again."""
+    design = await run_in_threadpool(design_library.get, design_id)
+    if design is None:
+        raise HTTPException(status_code=404, detail="Design not found")
+
+    result = design.pop("result")
+    if result is not None:
+        await load_simulation()
+        result = simulation.select_contours(result, contour_fields(include), contour_tolerance)
+
+    return json_response(model_content(LibraryDesignResponse(
+        **library_summary(design).model_dump(),
+        request=design["request"],
+        pyroll_results=result
+    ), "request", "pyroll_results"))
+
+
+@app.delete("/api/library/{design_id}")
+def delete_design(design_id: str):
+    if not design_library.delete(design_id):
+        raise HTTPException(status_code=404, detail="Design not found")
+    return {"success": True}
+
+
+def server_sent_event(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + encode_result(data) + b"\n\n"
+
+
+@app.post("/api/simulate/stream")
+async def stream_simulation(data: SimulationRequest, request: Request):
+    """
+    Solve like ``/api/simulate``, but answer with server-sent events:
+    a ``unit`` event with the results of each unit as soon as it is first solved,
+    then, once the solver has converged, a ``unit`` event with the final results of each unit solved,
+    then a ``summary`` event with the count of units, or an ``error`` event.
+
+    The solver iterates over the sequence, so the first results of a unit are preliminary.
+    A later ``unit`` event with the same ``pass`` replaces them, the final results are those of ``/api/simulate``.
+    Units reused from an earlier solve and cached results are final right away and sent once.
+    """
+    await load_simulation()
+    solve_params = data.solve_params.model_dump()
+    key = simulation_key(data.passDesignData, data.inProfile, data.solve_method.value, solve_params)
+    cached = await lookup_result(key)
+    fields = contour_fields(data.include)
+
+    if cached is None and simulation_executor.available == 0:
+        raise HTTPException(
+            status_code=503,
+            detail="All simulation workers are busy",
+            headers={"Retry-After": str(simulation_executor.retry_after)}
+        )
+
+    async def events():
+        if cached is not None:
+            for unit_results in cached["passes"]:
+                yield server_sent_event("unit", simulation.resolve_contours(unit_results, fields, data.contour_tolerance))
+            yield server_sent_event(
+                "summary", {"success": True, "result_id": key, "units": cached["units"], "cached": True}
+            )
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        job = asyncio.create_task(simulation_executor.run(
+            simulation.run_pyroll_simulation,
+            is_disconnected=request.is_disconnected,
+            on_event=queue.put_nowait,
             units=data.passDesignData,
             in_profile_data=data.inProfile,
-            solve_method=data.solve_method.value,  # Convert Enum to string value
-            solve_params=data.solve_params
+            solve_method=data.solve_method.value,
+            solve_params=solve_params
+        ))
+        job.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield server_sent_event(event["type"], simulation.resolve_contours(event["data"], fields, data.contour_tolerance))
+
+            result = job.result()
+            take_worker_timings(result)
+            await cache_result(key, result)
+            yield server_sent_event(
+                "summary", {"success": True, "result_id": key, "units": result["units"], "cached": False}
+            )
+
+        except SimulationCancelledError:
+            return
+
+        except Exception as e:
+            yield server_sent_event("error", {"success": False, "errors": str(e)})
+
+        finally:
+            job.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.post("/api/simulate/contours")
+def simulation_contours(data: ContourRequest):
+    result = stored_result(data.result_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Result not found, it may have been evicted, simulate again")
+
+    fields = contour_fields(data.include)
+    passes = [
+        simulation.resolve_contours(p, fields, data.contour_tolerance) for p in result["passes"]
+        if data.passes is None or p["pass"] in data.passes
+    ]
+
+    return json_response({
+        "success": True,
+        "result_id": data.result_id,
+        "passes": [{"pass": p["pass"], **{f: p[f] for f in fields if f in p}} for p in passes]
+    })
+
+
+@app.post("/api/simulate/series")
+def simulation_series(data: SeriesRequest):
+    """Plot series of a cached result reduced to a point budget, optionally with the contours of the units."""
+    result = stored_result(data.result_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Result not found, it may have been evicted, simulate again")
+
+    response = {
+        "success": True,
+        "result_id": data.result_id,
+        "series": result_series(result, [s.value for s in data.series], data.max_points),
+    }
+
+    fields = contour_fields(data.contours)
+    if fields:
+        response["contours"] = []
+        for p in result["passes"]:
+            if "geometry" not in p:
+                continue
+            resolved = simulation.resolve_contours(p, fields, data.contour_tolerance)
+            response["contours"].append({
+                "pass": p["pass"],
+                "label": p.get("label"),
+                **{f: reduce_lines(resolved[f], data.contour_max_points) for f in fields if f in resolved},
+            })
+
+    return json_response(response)
+
+
+@app.post("/api/export")
+async def export_results(data: ExportRequest):
+    """
+    Unit results of a simulation, a batch or a job as table with one row per variant and unit.
+
+    CSV is streamed while it is written, Parquet and Arrow files are written to disk first.
+    Failed variants of a batch (None in ``result_ids``) are skipped, their variant index stays unused.
+    """
+    if data.job_id is not None:
+        job = job_manager.store.get(data.job_id, with_result=False)
+        if job is None or job["status"] != "succeeded":
+            raise HTTPException(status_code=404, detail="No succeeded job with this id")
+
+        result_ids = [data.job_id]
+
+        def load(job_id: str) -> Optional[Dict[str, Any]]:
+            job = job_manager.store.get(job_id)
+            return job["result"] if job is not None else None
+
+    else:
+        result_ids = [data.result_id] if data.result_id is not None else data.result_ids
+        load = stored_result
+
+    fields = contour_fields(data.include)
+    if fields:
+        await load_simulation()
+
+    table = ResultTable(result_ids, load, fields, data.contour_tolerance)
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, table.scan)
+    except MissingResultError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    media_type, extension = EXPORT_FORMATS[data.format.value]
+    filename = f"pyroll-results.{extension}"
+
+    if data.format == ExportFormat.CSV:
+        return StreamingResponse(
+            csv_chunks(table), media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
 
-        return SimulationResponse(
-            success=True,
-            input_data=data.passDesignData,
-            pyroll_results=result
+    fd, path = tempfile.mkstemp(suffix=f".{extension}", dir=settings.EXPORT_DIR)
+    os.close(fd)
+    try:
+        await loop.run_in_executor(None, write_columnar, table, path, data.format.value)
+    except ImportError:
+        os.remove(path)
+        raise HTTPException(status_code=501, detail=f"Export as {data.format.value} needs pyarrow to be installed")
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return FileResponse(path, media_type=media_type, filename=filename, background=BackgroundTask(os.remove, path))
+
+
+@app.post("/api/optimize")
+async def optimize_pass_design(data: OptimizationRequest, request: Request):
+    """
+    Search values of the free parameters of the base request meeting the targets and constraints,
+    see :py:mod:`simulation.optimize`, answered with server-sent events:
+    an ``iteration`` event with the candidates of each iteration and the best design so far,
+    then a ``summary`` event with the best design, or an ``error`` event.
+
+    Candidates are solved in parallel and cached like any simulation, so revisited designs cost nothing.
+    """
+    base = data.base.model_dump(mode="json")
+    # candidates come in parameter order, grouping them by unit lets workers reuse solved prefixes
+    parameters = sorted(data.parameters, key=lambda p: p.unit)
+    paths = [parameter_path(p.unit, p.name) for p in parameters]
+    initial = [base["passDesignData"][p.unit].get(p.name) for p in parameters]
+
+    search = PatternSearch(
+        [p.lower for p in parameters],
+        [p.upper for p in parameters],
+        [v if v is not None else (p.lower + p.upper) / 2 for v, p in zip(initial, parameters)],
+        data.initial_step,
+        data.min_step
+    )
+    targets = data.targets.model_dump(exclude_none=True)
+    constraints = data.constraints.model_dump()
+
+    async def events():
+        best = None
+        evaluations = 0
+        iterations = 0
+
+        try:
+            while evaluations < data.max_evaluations:
+                points = search.poll()[:data.max_evaluations - evaluations]
+                if not points:
+                    break
+
+                candidates = candidate_requests(base, paths, [search.values(p) for p in points])
+                while True:
+                    try:
+                        keys, results, errors = await solve_requests(
+                            [r for _, r in candidates], is_disconnected=request.is_disconnected
+                        )
+                        break
+                    except ExecutorSaturatedError as e:
+                        await asyncio.sleep(e.retry_after)
+
+                evaluated = []
+                for (overrides, _), key, result, error in zip(candidates, keys, results, errors):
+                    candidate = {"parameters": overrides, "result_id": key, "objective": None}
+                    if result is not None:
+                        try:
+                            candidate.update(score(result, targets, constraints))
+                        except ValueError as e:
+                            error = str(e)
+                    if error is not None:
+                        candidate["error"] = error
+                    evaluated.append(candidate)
+
+                    objective = candidate["objective"]
+                    if objective is not None and (best is None or objective < best["objective"]):
+                        best = candidate
+
+                search.tell(points, [c["objective"] if c["objective"] is not None else math.inf for c in evaluated])
+                evaluations += len(points)
+                iterations += 1
+
+                yield server_sent_event("iteration", {
+                    "iteration": iterations,
+                    "evaluations": evaluations,
+                    "step": search.step,
+                    "candidates": evaluated,
+                    "best": best,
+                })
+
+            if best is None:
+                yield server_sent_event("error", {"success": False, "errors": "No candidate could be simulated"})
+                return
+
+            yield server_sent_event("summary", {
+                "success": True,
+                "converged": search.converged,
+                "iterations": iterations,
+                "evaluations": evaluations,
+                "best": best,
+            })
+
+        except SimulationCancelledError:
+            return
+
+        except Exception as e:
+            yield server_sent_event("error", {"success": False, "errors": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.post("/api/montecarlo")
+async def monte_carlo_analysis(data: MonteCarloRequest, request: Request):
+    """
+    Distributions of unit results under scattering parameters, see :py:mod:`simulation.montecarlo`,
+    answered with server-sent events: a ``progress`` event after each chunk of samples,
+    then a ``summary`` event with the statistics and sensitivities of each unit, or an ``error`` event.
+
+    Samples failing to simulate are counted and left out of the statistics. Neither the results nor the solved
+    prefixes of samples are kept, they would only displace those of other requests.
+    """
+    base = data.base.model_dump(mode="json")
+    paths = [p.path for p in data.parameters]
+    distributions = []
+
+    try:
+        for p in data.parameters:
+            distribution = p.model_dump()
+            for name in ("mean", "mode"):
+                if distribution[name] is None:
+                    distribution[name] = lookup_value(base, p.path)
+            if p.distribution in ("normal", "triangular"):
+                argument = "mean" if p.distribution == "normal" else "mode"
+                if not isinstance(distribution[argument], (int, float)):
+                    raise ValueError(f"{p.path}: the base has no numeric value, give the {argument} explicitly")
+            distributions.append(distribution)
+
+        inputs = sample_parameters(distributions, data.samples, data.seed)
+
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    statistics = OutputStatistics(data.samples, len(base["passDesignData"]), data.outputs)
+    chunk_size = 4 * simulation_executor.max_workers
+
+    async def events():
+        samples = sample_requests(base, paths, inputs)
+        done = 0
+
+        try:
+            while done < data.samples:
+                chunk = [next(samples) for _ in range(min(chunk_size, data.samples - done))]
+                while True:
+                    try:
+                        _, results, _ = await solve_requests(
+                            chunk, is_disconnected=request.is_disconnected, use_cache=False, use_snapshots=False
+                        )
+                        break
+                    except ExecutorSaturatedError as e:
+                        await asyncio.sleep(e.retry_after)
+
+                for i, result in enumerate(results):
+                    if result is None:
+                        statistics.add_failure()
+                    else:
+                        statistics.add(done + i, result)
+                done += len(chunk)
+                del chunk, results
+
+                yield server_sent_event("progress", {
+                    "samples": done, "total": data.samples, "failed": statistics.failed
+                })
+
+            if statistics.failed == data.samples:
+                yield server_sent_event("error", {"success": False, "errors": "No sample could be simulated"})
+                return
+
+            loop = asyncio.get_running_loop()
+            units = await loop.run_in_executor(None, statistics.summary, inputs, paths, data.percentiles)
+            yield server_sent_event("summary", {
+                "success": True,
+                "samples": data.samples,
+                "failed": statistics.failed,
+                "parameters": paths,
+                "units": units,
+            })
+
+        except SimulationCancelledError:
+            return
+
+        except Exception as e:
+            yield server_sent_event("error", {"success": False, "errors": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def expand_batch(
+        data: BatchSimulationRequest, grid: Dict[str, List[Any]]
+) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]], List[Optional[str]]]:
+    """
+    Build and validate the variants of a batch, returns them with the validation error of each.
+
+    Overrides may make a variant invalid, it fails without taking a worker.
+    """
+    expanded = []
+    errors: List[Optional[str]] = []
+
+    for overrides, r in expand_variants(data.base.model_dump(mode="json"), grid, data.variants):
+        try:
+            expanded.append((overrides, SimulationRequest.model_validate(r).model_dump(mode="json")))
+            errors.append(None)
+        except ValidationError as e:
+            expanded.append((overrides, r))
+            errors.append("; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ))
+
+    return expanded, errors
+
+
+@app.post("/api/simulate/batch", response_model=BatchSimulationResponse)
+async def run_batch_simulation(data: BatchSimulationRequest, request: Request):
+    # the size of the batch is checked before building any variant, invalid paths fail the whole batch
+    try:
+        limit = settings.BATCH_MAX_VARIANTS
+        grid = {p.path: parameter_values(p.values, p.start, p.stop, p.step, max_count=limit) for p in data.grid}
+        count = variant_count(grid, data.variants)
+        if count > limit:
+            raise ValueError(f"Batch has {count} variants, the limit is {limit}")
+        expanded, errors = await run_in_threadpool(expand_batch, data, grid)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        keys, results, solve_errors = await solve_requests(
+            [r if errors[i] is None else None for i, (_, r) in enumerate(expanded)],
+            is_disconnected=request.is_disconnected
         )
+        errors = [error or solve_errors[i] for i, error in enumerate(errors)]
+
+        overrides = [o for o, _ in expanded]
+        return json_response(model_content(BatchSimulationResponse(
+            success=True,
+            variants=len(expanded),
+            table=results_table(overrides, results),
+            result_ids=[key if result is not None else None for key, result in zip(keys, results)],
+            failed=[
+                {"variant": i, "overrides": overrides[i], "error": error}
+                for i, error in enumerate(errors) if error is not None
+            ]
+        ), "table", "result_ids", "failed"))
+
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    except SimulationCancelledError:
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
+    except SimulationLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
     except Exception as e:
-        import traceback
-        return SimulationResponse(
-            success=False,
-            input_data=data.passDesignData,
-            errors=f"{str(e)}\n\n{traceback.format_exc()}"
-        )
+        logger.exception("Batch simulation failed")
+        return BatchSimulationResponse(success=False, errors=str(e))
+
 
 @app.post("/api/rollpass-contour")
 async def rollpass_contour(data: dict):
-    print(data)
     try:
-        contour = roll_pass_contour(data)
+        await load_simulation()
+        # off the event loop, so identical requests fired by re-renders can join the running one
+        loop = asyncio.get_running_loop()
+        contour = await contours_in_flight.run(
+            canonical_hash(data),
+            lambda all_disconnected: loop.run_in_executor(None, simulation.roll_pass_contour, data)
+        )
         return contour
 
     except Exception as e:
-        import traceback
-        return {
-            "success": False,
-            "error": str(e),
-            "traceback": traceback.format_exc()
-        }
+        logger.exception("Roll pass contour failed")
+        return {"success": False, "error": str(e)}
+
+
+class RollPassContourBatchRequest(BaseModel):
+    rows: List[Dict[str, Any]] = Field(
+        ..., max_length=settings.MAX_UNITS,
+        description=f"Rows of the pass design table, at most {settings.MAX_UNITS} (PYROLL_GUI_MAX_UNITS)"
+    )
+
+
+@app.post("/api/rollpass-contour/batch")
+def rollpass_contour_batch(data: RollPassContourBatchRequest):
+    return {
+        "success": True,
+        "contours": simulation.roll_pass_contours(data.rows)
+    }
 
 
 @app.post("/api/inprofile-contour")
 async def inprofile_contour(data: dict):
     try:
-        contour = get_in_profile_contour(data)
+        await load_simulation()
+        # building the profile geometry takes a while, keep it off the event loop like the roll pass contours
+        loop = asyncio.get_running_loop()
+        contour = await contours_in_flight.run(
+            canonical_hash({"inProfile": data}),
+            lambda all_disconnected: loop.run_in_executor(None, simulation.get_in_profile_contour, data)
+        )
         return contour
 
     except Exception as e:
-        import traceback
-        return {
-            "success": False,
-            "error": str(e),
-            "traceback": traceback.format_exc()
-        }
+        logger.exception("In-profile contour failed")
+        return {"success": False, "error": str(e)}
 
 
 if __name__ == "__main__":
-    import uvicorn
+    import serve
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # development server, see serve.py for running several processes
+    serve.run(reload=True)
\ No newline at end of file
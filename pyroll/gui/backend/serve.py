@@ -0,0 +1,85 @@
+"""
+Launcher of the backend server.
+
+By default, a single server process is started, as needed for development. For production, start several
+processes with ``--workers N`` or ``PYROLL_GUI_HTTP_WORKERS=N``. They listen on the same port and share the
+result cache and the jobs through SQLite files, so a result solved by one process is served by all others.
+Unless configured explicitly, the cores are divided among the processes for their simulation workers.
+
+Examples::
+
+    python serve.py --reload
+    python serve.py --workers 4 --port 8080
+"""
+
+import argparse
+import os
+from typing import List, Optional
+
+from simulation import settings
+
+SHARED_CACHE_DB = os.path.join(settings.DATA_DIR, "pyroll-gui-cache.sqlite3")
+"""Cache database used by several server processes if ``PYROLL_GUI_CACHE_DB`` is not set."""
+
+
+def configure_workers(workers: int):
+    """
+    Set the environment the server processes read their settings from, unless set already.
+
+    Must be called before the processes are started, they import :py:mod:`simulation.settings` anew.
+    """
+    if workers <= 1:
+        return
+
+    os.environ.setdefault("PYROLL_GUI_CACHE_DB", SHARED_CACHE_DB)
+    os.environ.setdefault("PYROLL_GUI_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+
+
+def run(host: str = settings.HOST, port: int = settings.PORT, workers: int = settings.HTTP_WORKERS,
+        reload: bool = False):
+    """
+    Serve the API until interrupted.
+
+    Args:
+        host: address to listen on
+        port: port to listen on
+        workers: count of server processes
+        reload: restart the server on changes of the sources, only with a single process
+    """
+    import uvicorn
+
+    if reload and workers > 1:
+        raise ValueError("Reloading is only supported with a single server process")
+
+    configure_workers(workers)
+    uvicorn.run(
+        "main:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=host,
+        port=port,
+        workers=workers if workers > 1 else None,
+        reload=reload,
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serve the pyroll GUI backend.")
+    parser.add_argument("--host", default=settings.HOST, help="address to listen on (PYROLL_GUI_HOST)")
+    parser.add_argument("--port", type=int, default=settings.PORT, help="port to listen on (PYROLL_GUI_PORT)")
+    parser.add_argument(
+        "--workers", type=int, default=settings.HTTP_WORKERS,
+        help="count of server processes sharing the result cache (PYROLL_GUI_HTTP_WORKERS)"
+    )
+    parser.add_argument("--reload", action="store_true", help="restart on source changes, for development")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.reload and args.workers > 1:
+        parser.error("--reload requires a single worker")
+
+    run(args.host, args.port, args.workers, args.reload)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,51 @@
-from .pyroll_basic_runner import run_pyroll_simulation, create_roll_pass
-from .roll_pass_plot_runner import roll_pass_contour
-from .in_profile_plot_runner import get_in_profile_contour
\ No newline at end of file
+"""
+Simulation backend of the GUI.
+
+The functions exported here need pyroll and all its plugins, which take seconds to import.
+They are therefore imported from their modules on first access, or all at once by :py:func:`load`,
+so the server can answer health checks before pyroll is loaded.
+"""
+
+import importlib
+import sys
+import time
+
+_EXPORTS = {
+    "run_pyroll_simulation": "pyroll_basic_runner",
+    "create_roll_pass": "pyroll_basic_runner",
+    "resolve_contours": "pyroll_basic_runner",
+    "select_contours": "pyroll_basic_runner",
+    "roll_pass_contour": "roll_pass_plot_runner",
+    "roll_pass_contours": "roll_pass_plot_runner",
+    "contour_cache_stats": "roll_pass_plot_runner",
+    "groove_cache_stats": "helpers",
+    "get_in_profile_contour": "in_profile_plot_runner",
+    "run_profiled_simulation": "profiling",
+    "find_designs": "headless",
+    "run_designs": "headless",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def is_loaded() -> bool:
+    """Whether the modules of all exported functions are imported."""
+    return all(f"{__name__}.{module}" in sys.modules for module in set(_EXPORTS.values()))
+
+
+def load() -> float:
+    """Import the modules of all exported functions, returns the seconds it took."""
+    start = time.perf_counter()
+    for name in _EXPORTS:
+        __getattr__(name)
+    return time.perf_counter() - start
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pydantic_core import to_json
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """
+    Connection to a SQLite database that may be shared by several server processes.
+
+    With write-ahead logging readers do not block the writer and vice versa, writers wait up to 30 seconds
+    for each other instead of failing. The directory of the database is created if missing.
+    """
+    if db_path != ":memory:" and os.path.dirname(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    if db_path != ":memory:":
+        db.execute("PRAGMA journal_mode=WAL")
+    return db
+
+
+def _to_builtin(value: Any):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _normalize(value: Any):
+    # 1 and 1.0 describe the same input, but would hash differently
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def canonical_hash(data: Any) -> str:
+    """Hash of a JSON-like structure independent of key order and of int/float notation of numbers."""
+    encoded = json.dumps(_normalize(data), sort_keys=True, separators=(",", ":"), default=_to_builtin)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def simulation_key(
+        units: List[Dict[str, Any]],
+        in_profile_data: Dict[str, Any],
+        solve_method: str,
+        solve_params: Optional[Dict[str, Any]]
+) -> str:
+    """Cache key of a simulation request."""
+    return canonical_hash({
+        "inProfile": in_profile_data,
+        "passDesignData": units,
+        "solve_method": solve_method,
+        "solve_params": solve_params or {},
+    })
+
+
+def encode_result(result: Dict[str, Any]) -> bytes:
+    # the serializer of pydantic-core encodes large results about ten times faster than the json module
+    return to_json(result, fallback=_to_builtin)
+
+
+def decode_result(payload: bytes) -> Dict[str, Any]:
+    return json.loads(payload)
+
+
+class ResultCache:
+    """
+    Two-tier cache of simulation results keyed by :py:func:`simulation_key`.
+
+    Results are held JSON-encoded in memory with LRU eviction once ``max_bytes`` is exceeded.
+    If ``db_path`` is given, results are also written to a SQLite database, which is consulted on memory misses
+    and pruned by last access once it exceeds ``db_max_bytes``.
+    Server processes using the same database share the results solved by any of them.
+
+    Lookups and writes may touch the database, coroutines must call them in a thread.
+    The memory tier and the database are guarded by separate locks, so memory hits do not wait for the disk.
+    """
+
+    def __init__(self, max_bytes: int, db_path: Optional[str] = None, db_max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.db_max_bytes = db_max_bytes
+
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if db_path:
+            self._db = connect(db_path)
+            # the totals are kept up to date by triggers, so no write has to scan the table,
+            # whichever process of those sharing the database makes it
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);"
+                "CREATE TABLE IF NOT EXISTS results_total ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL);"
+                "INSERT OR IGNORE INTO results_total (id, entries, bytes) "
+                "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM results;"
+                "CREATE TRIGGER IF NOT EXISTS results_inserted AFTER INSERT ON results BEGIN "
+                "UPDATE results_total SET entries = entries + 1, bytes = bytes + NEW.size; END;"
+                "CREATE TRIGGER IF NOT EXISTS results_deleted AFTER DELETE ON results BEGIN "
+                "UPDATE results_total SET entries = entries - 1, bytes = bytes - OLD.size; END;"
+                "CREATE TRIGGER IF NOT EXISTS results_resized AFTER UPDATE OF size ON results BEGIN "
+                "UPDATE results_total SET bytes = bytes + NEW.size - OLD.size; END;"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if payload is None and self._db is not None:
+            with self._db_lock:
+                row = self._db.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+
+            if row is not None:
+                payload = row[0]
+                with self._lock:
+                    self.disk_hits += 1
+                    self._put_memory(key, payload)
+
+        if payload is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        return decode_result(payload)
+
+    def put(self, key: str, result: Dict[str, Any]):
+        payload = encode_result(result)
+
+        with self._lock:
+            self._put_memory(key, payload)
+
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT INTO results (key, payload, size, last_access) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET "
+                    "payload = excluded.payload, size = excluded.size, last_access = excluded.last_access",
+                    (key, payload, len(payload), time.time())
+                )
+                self._prune_db()
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else None,
+            }
+
+        if self._db is not None:
+            with self._db_lock:
+                count, size = self._db.execute("SELECT entries, bytes FROM results_total").fetchone()
+            stats["disk_entries"] = count
+            stats["disk_bytes"] = size
+
+        return stats
+
+    def _put_memory(self, key: str, payload: bytes):
+        if len(payload) > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+
+        self._entries[key] = payload
+        self._bytes += len(payload)
+
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _prune_db(self):
+        if not self.db_max_bytes:
+            return
+
+        total = self._db.execute("SELECT bytes FROM results_total").fetchone()[0]
+        if total <= self.db_max_bytes:
+            return
+
+        # least recently used first, read through the index only as far as needed
+        expired = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY last_access ASC"):
+            if total <= self.db_max_bytes:
+                break
+            expired.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM results WHERE key = ?", expired)
@@ -0,0 +1,5 @@
+UNIT_TYPES = ('TwoRollPass', 'ThreeRollPass', 'Transport', 'CoolingPipe')
+"""Unit types of the pass design table solved by the simulation, other rows are ignored."""
+
+CONTOUR_FIELDS = ('in_profile_contour', 'out_profile_contour', 'roll_contour')
+"""Contour fields a unit result can be resolved to from its stored geometry."""
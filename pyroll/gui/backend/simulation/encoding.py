@@ -0,0 +1,119 @@
+import base64
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.pyroll.columnar+json"
+
+DTYPES = {"float32": "<f4", "float64": "<f8"}
+
+
+def is_line(value: Any) -> bool:
+    return isinstance(value, dict) and isinstance(value.get("x"), list) and isinstance(value.get("y"), list)
+
+
+def decimate_line(x: np.ndarray, y: np.ndarray, decimate: int):
+    """Keep every ``decimate``-th point and always the last one, so closed contours stay closed."""
+    if decimate <= 1 or len(x) <= 2:
+        return x, y
+
+    indices = np.arange(0, len(x), decimate)
+    if indices[-1] != len(x) - 1:
+        indices = np.append(indices, len(x) - 1)
+    return x[indices], y[indices]
+
+
+class _LineGroup:
+    def __init__(self):
+        self.unit_lines: List[int] = []
+        self.counts: List[int] = []
+        self.x: List[np.ndarray] = []
+        self.y: List[np.ndarray] = []
+
+    def add_unit(self, lines: List[Dict[str, List[float]]], decimate: int, precision: Optional[int]):
+        self.unit_lines.append(len(lines))
+        for line in lines:
+            x, y = decimate_line(np.asarray(line["x"], dtype=float), np.asarray(line["y"], dtype=float), decimate)
+            if precision is not None:
+                x, y = np.round(x, precision), np.round(y, precision)
+            self.counts.append(len(x))
+            self.x.append(x)
+            self.y.append(y)
+
+    def pack(self, dtype) -> Dict[str, Any]:
+        x = np.concatenate(self.x).astype(dtype) if self.x else np.empty(0, dtype)
+        y = np.concatenate(self.y).astype(dtype) if self.y else np.empty(0, dtype)
+        return {
+            "unit_lines": self.unit_lines,
+            "counts": self.counts,
+            "x": base64.b64encode(x.tobytes()).decode("ascii"),
+            "y": base64.b64encode(y.tobytes()).decode("ascii"),
+        }
+
+
+def encode_columnar(
+        results: Dict[str, Any],
+        dtype: str = "float32",
+        decimate: int = 1,
+        precision: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Re-encode the output of ``extract_results`` column-wise.
+
+    Scalar values of the units become one list per field (nested fields joined with dots, None where a unit
+    has no such field). Contour lines become packed little-endian float arrays, grouped by field:
+    ``unit_lines`` holds the count of lines of each unit, ``counts`` the count of points of each line,
+    ``x`` and ``y`` the base64 encoded coordinates of all lines in order.
+
+    Args:
+        results: the results as returned by ``run_pyroll_simulation``
+        dtype: "float32" or "float64"
+        decimate: keep only every n-th contour point
+        precision: count of decimals to round contour coordinates to
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown dtype '{dtype}', must be one of: {', '.join(DTYPES)}")
+    if decimate < 1:
+        raise ValueError("decimate must be at least 1")
+
+    passes = results["passes"]
+    columns: Dict[str, List[Any]] = {}
+    lines: Dict[str, _LineGroup] = {}
+
+    def walk(i: int, prefix: str, value: Any):
+        if is_line(value):
+            unit_lines[prefix] = [value]
+        elif isinstance(value, list) and value and all(is_line(v) for v in value):
+            unit_lines[prefix] = value
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                walk(i, f"{prefix}.{k}" if prefix else k, v)
+        else:
+            if prefix not in columns:
+                columns[prefix] = [None] * i
+            columns[prefix].append(value)
+
+    for i, unit_results in enumerate(passes):
+        unit_lines: Dict[str, List[Dict[str, List[float]]]] = {}
+        walk(i, "", unit_results)
+
+        for column in columns.values():
+            if len(column) < i + 1:
+                column.append(None)
+
+        for name in unit_lines:
+            if name not in lines:
+                lines[name] = _LineGroup()
+                lines[name].unit_lines = [0] * i
+        for name, group in lines.items():
+            group.add_unit(unit_lines.get(name, []), decimate, precision)
+
+    return {
+        "success": results.get("success", True),
+        "format": "columnar",
+        "units": results.get("units", len(passes)),
+        "dtype": dtype,
+        "byteorder": "little",
+        "columns": columns,
+        "lines": {name: group.pack(DTYPES[dtype]) for name, group in lines.items()},
+    }
@@ -0,0 +1,288 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+_cancel_flags = None
+_events = None
+_memory_limit = 0
+
+_JOB_DONE = "__job_done__"
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when all workers are busy and the wait queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"All simulation workers are busy, retry in {retry_after} s.")
+        self.retry_after = retry_after
+
+
+class SimulationCancelledError(RuntimeError):
+    """Raised inside a worker when the job was cancelled while solving."""
+
+
+class SimulationLimitError(RuntimeError):
+    """Raised inside a worker when the job needs more memory than allowed per job."""
+
+
+def _resident_bytes() -> Optional[int]:
+    # Linux only, elsewhere the memory limit is not enforced
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _init_worker(cancel_flags, events, warm_up, memory_limit):
+    global _cancel_flags, _events, _memory_limit
+    _cancel_flags = cancel_flags
+    _events = events
+    _memory_limit = memory_limit
+    started = {"type": "worker_started", "pid": os.getpid()}
+
+    # load pyroll.basic and all its plugins once per worker instead of once per job
+    start = time.perf_counter()
+    from . import pyroll_basic_runner  # noqa: F401
+    started["import_seconds"] = time.perf_counter() - start
+
+    if warm_up is not None:
+        start = time.perf_counter()
+        try:
+            warm_up()
+        except Exception as e:
+            # a worker is still usable if warming up failed, it is only slower on its first job
+            started["warmup_error"] = str(e)
+        started["warmup_seconds"] = time.perf_counter() - start
+
+    events.put((None, started))
+
+
+def _noop():
+    pass
+
+
+def _run_job(slot: int, job_id: int, fn: Callable[..., Any], kwargs: dict, emits: bool):
+    # memory the worker holds already, e.g. for snapshots, is not charged to the job
+    baseline = _resident_bytes() if _memory_limit > 0 else None
+
+    def check_cancelled(index, unit):
+        if _cancel_flags[slot]:
+            raise SimulationCancelledError(f"Simulation cancelled after solving unit {index + 1}.")
+        if baseline is not None and _resident_bytes() - baseline > _memory_limit:
+            raise SimulationLimitError(
+                f"Simulation stopped after unit {index + 1}, it needs more than the "
+                f"{_memory_limit / 1024 ** 2:.0f} MiB of memory allowed per request. "
+                f"Split the pass design into shorter sequences."
+            )
+
+    def emit(event: Dict[str, Any]):
+        _events.put((job_id, event))
+
+    try:
+        if not emits:
+            return fn(on_unit_solved=check_cancelled, **kwargs)
+        return fn(on_unit_solved=check_cancelled, emit=emit, **kwargs)
+
+    except Exception as e:
+        # pyroll wraps errors of units in errors of their sequence, the limit shall reach the caller as such
+        cause = e
+        while cause is not None and not isinstance(cause, SimulationLimitError):
+            cause = cause.__cause__
+        if cause is not None and cause is not e:
+            raise cause from None
+        raise
+
+    finally:
+        # events and results travel through different pipes, the marker tells the parent that no event is left
+        if emits:
+            _events.put((job_id, _JOB_DONE))
+
+
+class SimulationExecutor:
+    """
+    Runs CPU-bound simulations in a pool of worker processes.
+
+    The number of simultaneously accepted jobs is bounded by ``max_workers + queue_depth``.
+    Each job is assigned a slot with a shared cancellation flag, the submitted function gets an
+    ``on_unit_solved`` callback that aborts the solution once the flag is set.
+    Jobs run with an ``on_event`` listener additionally get an ``emit`` callback to send events
+    to the listener while solving. The same callback stops a job once the memory of its worker has grown by more
+    than ``memory_limit`` bytes since the job started, if the limit is positive.
+
+    All workers are started by :py:meth:`start`. Each imports pyroll and calls ``warm_up`` before taking jobs,
+    then ``on_worker_started`` is called in a background thread with the durations of both.
+    """
+
+    def __init__(self, max_workers: int, queue_depth: int, retry_after: int = 5, poll_interval: float = 0.5,
+                 warm_up: Optional[Callable[[], Any]] = None,
+                 on_worker_started: Optional[Callable[[Dict[str, Any]], None]] = None, memory_limit: int = 0):
+        self.max_workers = max(1, max_workers)
+        self.queue_depth = max(0, queue_depth)
+        self.retry_after = retry_after
+        self.poll_interval = poll_interval
+        self.warm_up = warm_up
+        self.on_worker_started = on_worker_started
+        self.memory_limit = memory_limit
+        self.workers_started = 0
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cancel_flags = None
+        self._events = None
+        self._event_reader: Optional[threading.Thread] = None
+        self._listeners: Dict[int, Callable[[Any], None]] = {}
+        self._job_ids = itertools.count()
+        self._free_slots = list(range(self.max_workers + self.queue_depth))
+
+    @property
+    def capacity(self) -> int:
+        """Maximum count of jobs running or waiting at the same time."""
+        return self.max_workers + self.queue_depth
+
+    @property
+    def available(self) -> int:
+        """Count of jobs that can be accepted right now."""
+        return len(self._free_slots)
+
+    @property
+    def ready(self) -> bool:
+        """Whether all workers have started and warmed up."""
+        return self.workers_started >= self.max_workers
+
+    @property
+    def in_flight(self) -> int:
+        """Count of jobs currently running or waiting."""
+        return self.capacity - len(self._free_slots)
+
+    def start(self):
+        if self._pool is not None:
+            return
+
+        self._cancel_flags = multiprocessing.Array("b", self.capacity, lock=False)
+        self._events = multiprocessing.Queue()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self._cancel_flags, self._events, self.warm_up, self.memory_limit),
+        )
+
+        self._event_reader = threading.Thread(target=self._read_events, name="simulation-events", daemon=True)
+        self._event_reader.start()
+
+        # the pool starts workers on demand, one per job submitted while none is idle
+        for _ in range(self.max_workers):
+            self._pool.submit(_noop)
+
+    def shutdown(self):
+        if self._pool is None:
+            return
+
+        for slot in range(self.capacity):
+            self._cancel_flags[slot] = 1
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        self.workers_started = 0
+
+        self._events.put(None)
+        self._event_reader.join()
+        self._event_reader = None
+
+    def _read_events(self):
+        while True:
+            message = self._events.get()
+            if message is None:
+                return
+
+            job_id, event = message
+            if job_id is None:
+                self.workers_started += 1
+                if self.on_worker_started is not None:
+                    self.on_worker_started(event)
+                continue
+
+            listener = self._listeners.get(job_id)
+            if listener is not None:
+                listener(event)
+
+    async def run(
+            self,
+            fn: Callable[..., Any],
+            is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+            on_event: Optional[Callable[[Any], None]] = None,
+            **kwargs
+    ):
+        """
+        Run ``fn(**kwargs)`` in a worker process and await its result.
+
+        Args:
+            fn: picklable module-level function accepting an ``on_unit_solved`` keyword argument
+            is_disconnected: coroutine function polled while waiting, the job is cancelled once it returns True
+            on_event: called in the event loop with each event the job emits, all events are delivered
+                before the result is returned; ``fn`` must accept an ``emit`` keyword argument if given
+            kwargs: picklable keyword arguments passed to ``fn``
+
+        Raises:
+            ExecutorSaturatedError: if no slot is free
+            SimulationCancelledError: if the client disconnected before the job finished
+            SimulationLimitError: if the job exceeded the memory limit
+        """
+        if not self._free_slots:
+            raise ExecutorSaturatedError(self.retry_after)
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        slot = self._free_slots.pop()
+        self._cancel_flags[slot] = 0
+        job_id = next(self._job_ids)
+        events_done = asyncio.Event()
+
+        if on_event is not None:
+            def dispatch(event):
+                if event == _JOB_DONE:
+                    loop.call_soon_threadsafe(events_done.set)
+                else:
+                    loop.call_soon_threadsafe(on_event, event)
+
+            self._listeners[job_id] = dispatch
+
+        try:
+            job = self._pool.submit(_run_job, slot, job_id, fn, kwargs, on_event is not None)
+        except Exception:
+            self._free_slots.append(slot)
+            self._listeners.pop(job_id, None)
+            raise
+
+        # the slot is released only when the worker is done with it, not when the client gives up,
+        # so a cancelled job still running cannot see the flag of its successor
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._free_slots.append, slot))
+        future = asyncio.wrap_future(job)
+
+        try:
+            while True:
+                done, _ = await asyncio.wait({future}, timeout=self.poll_interval)
+                if done:
+                    # a crashed worker could not send the end marker
+                    if on_event is not None and not job.cancelled() and \
+                            not isinstance(job.exception(), BrokenProcessPool):
+                        await events_done.wait()
+                    return future.result()
+
+                if is_disconnected is not None and await is_disconnected():
+                    self._cancel_flags[slot] = 1
+                    future.cancel()
+                    raise SimulationCancelledError("Client disconnected before the simulation finished.")
+
+        except asyncio.CancelledError:
+            if not job.done():
+                self._cancel_flags[slot] = 1
+                future.cancel()
+            raise
+
+        finally:
+            self._listeners.pop(job_id, None)
@@ -0,0 +1,193 @@
+"""
+Export of simulation results as tables with one row per variant and unit.
+
+Results are read one at a time through a loader function, so exports of large batches never hold more than one
+result in memory. CSV is produced as a stream of text chunks, Parquet and Arrow are written to a file.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+}
+"""Media type and file extension of each export format."""
+
+ResultLoader = Callable[[str], Optional[Dict[str, Any]]]
+
+_KINDS = ("bool", "int", "float", "string")
+
+
+class MissingResultError(LookupError):
+    """Raised if results to export are not available anymore."""
+
+    def __init__(self, result_ids: List[str]):
+        self.result_ids = result_ids
+        super().__init__(f"Results not found, they may have been evicted, simulate again: {', '.join(result_ids)}")
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "string"
+
+
+def _cell(value: Any) -> Any:
+    # nested values like per-roll lists and contours are kept as JSON text
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+class ResultTable:
+    """
+    Rows of the unit results of several simulation results.
+
+    The columns are ``variant``, the index of a result in ``result_ids``, followed by all fields of the unit
+    results in order of appearance, nested values encoded as JSON. Stored geometry is replaced by the
+    requested contour fields.
+
+    Args:
+        result_ids: results to export, None entries (failed variants) are skipped
+        load: returns the result of an id or None if it is not available
+        contour_fields: any of ``CONTOUR_FIELDS`` to include
+        tolerance: simplification tolerance of the contours
+        names: names of the results, in order of ``result_ids``
+    """
+
+    def __init__(self, result_ids: Sequence[Optional[str]], load: ResultLoader, contour_fields: Sequence[str] = (),
+                 tolerance: float = 0, names: Optional[Sequence[str]] = None):
+        self.result_ids = list(result_ids)
+        self.names = list(names) if names is not None else None
+        self.load = load
+        self.contour_fields = list(contour_fields)
+        self.tolerance = tolerance
+        self.columns: Dict[str, str] = {}
+        self.rows = 0
+
+    def scan(self):
+        """
+        Determine the columns and their kind (one of bool, int, float and string) from all results.
+
+        Raises:
+            MissingResultError: if any result is not available
+        """
+        columns = {"variant": "int"}
+        if self.names is not None:
+            columns["design"] = "string"
+        missing = []
+
+        for result_id in self.result_ids:
+            if result_id is None:
+                continue
+            result = self.load(result_id)
+            if result is None:
+                missing.append(result_id)
+                continue
+
+            for unit in result["passes"]:
+                self.rows += 1
+                for key, value in unit.items():
+                    if key == "geometry" or value is None:
+                        continue
+                    kind = _kind(value)
+                    known = columns.get(key)
+                    columns[key] = kind if known is None else _KINDS[max(_KINDS.index(known), _KINDS.index(kind))]
+
+                if "geometry" in unit:
+                    for field in self.contour_fields:
+                        columns[field] = "string"
+
+        if missing:
+            raise MissingResultError(missing)
+        self.columns = columns
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        resolve = None
+        if self.contour_fields:
+            # imported here, so tables without contours do not need pyroll
+            from .pyroll_basic_runner import resolve_contours
+            resolve = resolve_contours
+
+        for variant, result_id in enumerate(self.result_ids):
+            if result_id is None:
+                continue
+            result = self.load(result_id)
+            if result is None:
+                raise MissingResultError([result_id])
+
+            for unit in result["passes"]:
+                if resolve is not None:
+                    unit = resolve(unit, self.contour_fields, self.tolerance)
+                row = {k: _cell(v) for k, v in unit.items() if k != "geometry"}
+                row["variant"] = variant
+                if self.names is not None:
+                    row["design"] = self.names[variant]
+                yield row
+
+            # drop the result before loading the next one
+            del result
+
+
+def csv_chunks(table: ResultTable, rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """Encoded CSV text of a scanned table in chunks of ``rows_per_chunk`` rows, starting with the header."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(table.columns), extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+
+    for i, row in enumerate(table.iter_rows(), start=1):
+        writer.writerow(row)
+        if i % rows_per_chunk == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_columnar(table: ResultTable, path: str, file_format: str, rows_per_group: int = 10000):
+    """
+    Write a scanned table to a Parquet or Arrow IPC file in row groups of ``rows_per_group`` rows.
+
+    Raises:
+        ImportError: if pyarrow is not installed
+    """
+    import pyarrow as pa
+
+    types = {"bool": pa.bool_(), "int": pa.int64(), "float": pa.float64(), "string": pa.string()}
+    schema = pa.schema([(name, types[kind]) for name, kind in table.columns.items()])
+
+    def coerce(row: Dict[str, Any]) -> Dict[str, Any]:
+        # a column holding text for some units holds the text form of the others' values too
+        return {
+            name: (str(row[name]) if kind == "string" and not isinstance(row[name], str) else row[name])
+            if row.get(name) is not None else None
+            for name, kind in table.columns.items()
+        }
+
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        writer = pa.ipc.new_file(path, schema)
+
+    try:
+        rows = []
+        for row in table.iter_rows():
+            rows.append(coerce(row))
+            if len(rows) == rows_per_group:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                rows = []
+        if rows or table.rows == 0:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    finally:
+        writer.close()
@@ -0,0 +1,286 @@
+"""
+Simulation of designs from files without the HTTP server, for regression runs and large design studies.
+
+A design is an initial profile and a pass design. It is read from a JSON file in the form of the request body
+of ``/api/simulate``, or from the XML files saved by the in-profile and pass design tabs of the GUI.
+Designs are read, solved and written one after another through a process pool with a bounded count of
+designs in flight, so memory does not grow with the count of designs.
+"""
+
+import json
+import os
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, IO, Iterable, Iterator, List, Optional, Sequence, Union
+
+from pydantic import BaseModel, Field, ValidationError
+
+from .schema import InProfileData, PassDesignUnit
+
+PathLike = Union[str, os.PathLike]
+
+_FLOW_STRESS_PARAMETERS = {"A": "a", "BaseStrain": "baseStrain", "BaseStrainRate": "baseStrainRate"}
+
+_IN_PROFILE_FIELDS = {
+    "ProfileType": "shape",
+    "Temperature": "temperature",
+    "Strain": "strain",
+    "Material": "material",
+    "MaterialType": "materialType",
+    "FlowStress": "flow_stress",
+    "Density": "density",
+    "SpecificHeatCapacity": "specific_heat_capacity",
+    "ThermalConductivity": "thermal_conductivity",
+}
+
+_TEXT_FIELDS = ("ProfileType", "Material", "MaterialType")
+
+
+class Design(BaseModel):
+    """A design to simulate, validated like the body of ``/api/simulate``."""
+
+    name: str = ""
+    inProfile: InProfileData
+    passDesignData: List[PassDesignUnit]
+    solve_method: str = "solve"
+    solve_params: Dict[str, Any] = Field(default_factory=dict)
+
+
+def _parse_value(text: Optional[str]) -> Any:
+    # numbers like the loaders of the GUI do, everything else stays text
+    if text is None or text.strip() == "":
+        return None
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _snake_case(name: str) -> str:
+    return "".join("_" + c.lower() if c.isupper() else c for c in name).lstrip("_")
+
+
+def parse_in_profile_xml(root: ElementTree.Element) -> Dict[str, Any]:
+    """In-profile dictionary of the ``<InProfile>`` element written by the in-profile tab."""
+    profile: Dict[str, Any] = {"strain": 0}
+
+    for tag, key in _IN_PROFILE_FIELDS.items():
+        value = root.findtext(tag) if tag in _TEXT_FIELDS else _parse_value(root.findtext(tag))
+        if value is not None and value != "":
+            profile[key] = value
+
+    parameters = root.find("FlowStressParameters")
+    if parameters is not None:
+        profile["flowStressParams"] = {
+            _FLOW_STRESS_PARAMETERS.get(child.tag, child.tag.lower()): _parse_value(child.text)
+            for child in parameters if _parse_value(child.text) is not None
+        }
+
+    geometry = root.find("Geometry")
+    if geometry is not None:
+        for child in geometry:
+            value = _parse_value(child.text)
+            if value is not None:
+                profile[_snake_case(child.tag)] = value
+
+    return profile
+
+
+def parse_pass_design_xml(root: ElementTree.Element) -> List[Dict[str, Any]]:
+    """Rows of the pass design table of the ``<PassDesign>`` element written by the pass design tab."""
+    units = []
+
+    for element in root.iter("Unit"):
+        unit: Dict[str, Any] = {}
+        if element.get("id") is not None:
+            unit["id"] = _parse_value(element.get("id"))
+        if element.findtext("Type"):
+            unit["type"] = element.findtext("Type")
+        if element.findtext("GrooveType"):
+            unit["grooveType"] = element.findtext("GrooveType")
+
+        for parameter in element.iter("Parameter"):
+            value = _parse_value(parameter.text)
+            if parameter.get("name") and value is not None:
+                unit[parameter.get("name")] = value
+
+        groove = element.find("Groove")
+        if groove is not None:
+            unit["groove"] = {c.tag: _parse_value(c.text) for c in groove if _parse_value(c.text) is not None}
+
+        units.append(unit)
+
+    return units
+
+
+def _read_xml(path: Path) -> ElementTree.Element:
+    try:
+        return ElementTree.parse(path).getroot()
+    except ElementTree.ParseError as e:
+        raise ValueError(f"{path}: invalid XML: {e}")
+
+
+def find_designs(paths: Iterable[PathLike], in_profile: Optional[PathLike] = None) -> Iterator[Union[Design, Dict]]:
+    """
+    Designs in the given files and directories, searched recursively, in sorted order.
+
+    JSON files must hold a request body of ``/api/simulate``. XML files with a ``<PassDesign>`` root are
+    combined with the in-profile given, else with the only XML file with an ``<InProfile>`` root in their
+    directory. Other files are skipped.
+
+    Yields:
+        the valid designs and, for invalid ones, dictionaries with the ``design`` name and the ``error``
+    """
+    default_profile = parse_in_profile_xml(_read_xml(Path(in_profile))) if in_profile is not None else None
+    directory_profiles: Dict[Path, Optional[Dict[str, Any]]] = {}
+
+    def profile_of(directory: Path) -> Optional[Dict[str, Any]]:
+        if directory not in directory_profiles:
+            roots = [_read_xml(p) for p in sorted(directory.glob("*.xml"))]
+            profiles = [r for r in roots if r.tag == "InProfile"]
+            directory_profiles[directory] = parse_in_profile_xml(profiles[0]) if len(profiles) == 1 else None
+        return directory_profiles[directory]
+
+    for root_path in map(Path, paths):
+        files = sorted(p for p in root_path.rglob("*") if p.is_file()) if root_path.is_dir() else [root_path]
+
+        for path in files:
+            name = str(path)
+            try:
+                if path.suffix.lower() == ".json":
+                    yield Design.model_validate({**json.loads(path.read_text()), "name": name})
+
+                elif path.suffix.lower() == ".xml":
+                    root = _read_xml(path)
+                    if root.tag != "PassDesign":
+                        continue
+                    profile = default_profile if default_profile is not None else profile_of(path.parent)
+                    if profile is None:
+                        raise ValueError("no in-profile given and no single in-profile XML in its directory")
+                    yield Design(name=name, inProfile=profile, passDesignData=parse_pass_design_xml(root))
+
+            except ValidationError as e:
+                yield {"design": name, "success": False, "error": "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                )}
+            except (ValueError, OSError) as e:
+                yield {"design": name, "success": False, "error": str(e)}
+
+
+def simulate_design(design: Dict[str, Any], contour_fields: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Solve a design dumped from :py:class:`Design`.
+
+    Returns:
+        the ``design`` name and either the ``result`` with the requested contours or the ``error``
+    """
+    from .pyroll_basic_runner import run_pyroll_simulation, select_contours
+
+    try:
+        result = run_pyroll_simulation(
+            units=design["passDesignData"],
+            in_profile_data=design["inProfile"],
+            solve_method=design["solve_method"],
+            solve_params=design["solve_params"],
+        )
+        result.pop("timings", None)
+        return {"design": design["name"], "success": True, "result": select_contours(result, contour_fields)}
+
+    except Exception as e:
+        return {"design": design["name"], "success": False, "error": str(e)}
+
+
+def run_designs(designs: Iterable[Union[Design, Dict]], jobs: int = 1, contour_fields: Sequence[str] = ()
+                ) -> Iterator[Dict[str, Any]]:
+    """
+    Solve designs as found by :py:func:`find_designs`, yielding the outcomes in the order of the designs.
+
+    Args:
+        designs: designs and failures to pass through
+        jobs: count of worker processes, designs are solved in this process if 1
+        contour_fields: any of ``CONTOUR_FIELDS`` to include in the results
+    """
+    if jobs <= 1:
+        for design in designs:
+            yield simulate_design(design.model_dump(mode="json"), contour_fields) if isinstance(design, Design) \
+                else design
+        return
+
+    # at most two designs per worker are in flight, the outcomes wait for their predecessors only
+    in_flight: Deque[Union[Future, Dict]] = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for design in designs:
+            if isinstance(design, Design):
+                in_flight.append(pool.submit(simulate_design, design.model_dump(mode="json"), contour_fields))
+            else:
+                in_flight.append(design)
+
+            while len(in_flight) > 2 * jobs:
+                yield _outcome(in_flight.popleft())
+
+        while in_flight:
+            yield _outcome(in_flight.popleft())
+
+
+def _outcome(entry: Union[Future, Dict]) -> Dict[str, Any]:
+    return entry.result() if isinstance(entry, Future) else entry
+
+
+def write_jsonl(outcomes: Iterable[Dict[str, Any]], file: IO[str]) -> Dict[str, int]:
+    """Write each outcome as a line of JSON, returns the counts of ``succeeded`` and ``failed`` designs."""
+    from .cache import encode_result
+
+    counts = {"succeeded": 0, "failed": 0}
+    for outcome in outcomes:
+        file.write(encode_result(outcome).decode("utf-8") + "\n")
+        file.flush()
+        counts["succeeded" if outcome["success"] else "failed"] += 1
+    return counts
+
+
+def write_table(outcomes: Iterable[Dict[str, Any]], path: PathLike, file_format: str = "parquet",
+                errors: Optional[IO[str]] = None) -> Dict[str, int]:
+    """
+    Write the results as Parquet or Arrow table with one row per design and unit, see :py:mod:`export`.
+
+    The outcomes are spooled to a temporary file first, as the columns are only known after the last design.
+    Failed designs are written to ``errors`` as JSON lines, if given.
+
+    Returns:
+        the counts of ``succeeded`` and ``failed`` designs
+    """
+    from .export import ResultTable, write_columnar
+
+    with tempfile.TemporaryFile("w+b") as spool:
+        offsets: List[int] = []
+        names: List[str] = []
+        counts = {"succeeded": 0, "failed": 0}
+
+        for outcome in outcomes:
+            if outcome["success"]:
+                offsets.append(spool.tell())
+                names.append(outcome["design"])
+                spool.write(json.dumps(outcome["result"]).encode("utf-8") + b"\n")
+                counts["succeeded"] += 1
+            else:
+                if errors is not None:
+                    errors.write(json.dumps(outcome) + "\n")
+                counts["failed"] += 1
+
+        def load(index: str) -> Dict[str, Any]:
+            spool.seek(offsets[int(index)])
+            return json.loads(spool.readline())
+
+        table = ResultTable([str(i) for i in range(len(offsets))], load, names=names)
+        table.scan()
+        write_columnar(table, str(path), file_format)
+
+    return counts
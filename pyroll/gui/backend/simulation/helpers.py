@@ -1,9 +1,67 @@
-from typing import Dict, Any, Union
+import base64
+import copy
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Union
+
+import numpy as np
+import shapely
 
 from pyroll.core import Profile, Roll, RollPass, Transport, CoolingPipe, ThreeRollPass, TwoRollPass, PassSequence
 from pyroll.core import grooves
 from pyroll.freiberg_flow_stress import FreibergFlowStressCoefficients
 
+from . import settings
+
+PROFILE_GEOMETRY = {
+    'round': ('diameter',),
+    'square': ('side', 'corner_radius'),
+    'box': ('height', 'width', 'corner_radius'),
+    'hexagon': ('side', 'corner_radius'),
+}
+"""Parameters of the initial profile shapes determining their cross-section."""
+
+PROFILE_STATE = ('temperature', 'strain', 'material', 'density', 'specific_heat_capacity', 'thermal_conductivity')
+"""Parameters of the initial profile set as hook values on each instance."""
+
+
+def _freeze(value: Any):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@lru_cache(maxsize=settings.TEMPLATE_CACHE_SIZE)
+def profile_template(shape: str, geometry: Tuple[Tuple[str, Any], ...]) -> Profile:
+    """
+    Profile of the given shape and cross-section without any state, built once per distinct geometry.
+
+    Must not be modified, use :py:func:`instantiate_profile` to get a profile to work with.
+
+    Args:
+        shape: one of the keys of ``PROFILE_GEOMETRY``
+        geometry: pairs of the parameters in ``PROFILE_GEOMETRY[shape]`` and their values
+    """
+    factory = getattr(Profile, shape)
+    return factory(**{k: v for k, v in geometry if v is not None})
+
+
+def instantiate_profile(template: Profile, **state) -> Profile:
+    """
+    New profile sharing the immutable cross-section of a template, with ``state`` set as hook values.
+
+    Equivalent to calling the factory of the template shape with ``state`` as additional keyword arguments,
+    but without generating the geometry again.
+    """
+    profile = copy.copy(template)
+    # explicit hook values are plain instance attributes, only the mutable ones must not be shared
+    profile.__cache__ = {}
+    profile.classifiers = set(template.classifiers)
+    profile.__dict__.update(state)
+    return profile
+
+
 def create_initial_profile(in_profile_data: Dict[str, Any]):
     shape = in_profile_data.get('shape')
     material_type = in_profile_data.get('materialType')
@@ -11,57 +69,12 @@ def create_initial_profile(in_profile_data: Dict[str, Any]):
     if not shape:
         raise ValueError("Profile shape is required but was not provided")
 
-    if shape == 'round':
-        in_profile = Profile.round(
-            diameter=in_profile_data.get('diameter'),
-            temperature=in_profile_data.get('temperature'),
-            strain=in_profile_data.get('strain'),
-            material=in_profile_data.get('material'),
-            density=in_profile_data.get('density'),
-            specific_heat_capacity=in_profile_data.get('specific_heat_capacity'),
-            thermal_conductivity=in_profile_data.get('thermal_conductivity'),
-        )
-
-    elif shape == 'square':
-        in_profile = Profile.square(
-            side=in_profile_data.get('side'),
-            corner_radius=in_profile_data.get('corner_radius'),
-            temperature=in_profile_data.get('temperature'),
-            strain=in_profile_data.get('strain'),
-            material=in_profile_data.get('material'),
-            density=in_profile_data.get('density'),
-            specific_heat_capacity=in_profile_data.get('specific_heat_capacity'),
-            thermal_conductivity=in_profile_data.get('thermal_conductivity'),
-        )
-
-    elif shape == 'box':
-        in_profile = Profile.box(
-            height=in_profile_data.get('height'),
-            width=in_profile_data.get('width'),
-            corner_radius=in_profile_data.get('corner_radius'),
-            temperature=in_profile_data.get('temperature'),
-            strain=in_profile_data.get('strain'),
-            material=in_profile_data.get('material'),
-            density=in_profile_data.get('density'),
-            specific_heat_capacity=in_profile_data.get('specific_heat_capacity'),
-            thermal_conductivity=in_profile_data.get('thermal_conductivity'),
-        )
-
-    elif shape == 'hexagon':
-        in_profile = Profile.hexagon(
-            side=in_profile_data.get('side'),
-            corner_radius=in_profile_data.get('corner_radius'),
-            temperature=in_profile_data.get('temperature'),
-            strain=in_profile_data.get('strain'),
-            material=in_profile_data.get('material'),
-            density=in_profile_data.get('density'),
-            specific_heat_capacity=in_profile_data.get('specific_heat_capacity'),
-            thermal_conductivity=in_profile_data.get('thermal_conductivity'),
-        )
-
-    else:
+    if shape not in PROFILE_GEOMETRY:
         raise ValueError(f"Unknown profile shape: '{shape}'. Must be one of: round, square, box, hexagon")
 
+    template = profile_template(shape, tuple((k, in_profile_data.get(k)) for k in PROFILE_GEOMETRY[shape]))
+    in_profile = instantiate_profile(template, **{k: in_profile_data.get(k) for k in PROFILE_STATE})
+
     if material_type:
         flow_stress_params = in_profile_data.get('flowStressParams')
         if flow_stress_params:
@@ -72,63 +85,64 @@ def create_initial_profile(in_profile_data: Dict[str, Any]):
 
 
 def create_groove(groove_type: str, groove_params: Dict[str, Any]):
+    """
+    Groove of the given type, interned: equal definitions yield the same instance.
+
+    Grooves compute their contour on construction and are not modified afterward,
+    so the roll passes of a sequence and of later requests can share them.
+    """
+    clean_params = {k: v for k, v in groove_params.items() if v is not None}
+    key = _freeze(clean_params)
+
+    try:
+        hash(key)
+    except TypeError:
+        # unhashable parameter values, nothing sensible to intern
+        return _new_groove(groove_type, clean_params)
+
+    return _interned_groove(groove_type, key)
+
+
+def groove_cache_stats() -> Dict[str, Any]:
+    info = _interned_groove.cache_info()
+    return {"entries": info.currsize, "max_entries": info.maxsize, "hits": info.hits, "misses": info.misses}
+
+
+@lru_cache(maxsize=settings.TEMPLATE_CACHE_SIZE)
+def _interned_groove(groove_type: str, groove_params: Tuple[Tuple[str, Any], ...]):
+    return _new_groove(groove_type, dict(groove_params))
+
+
+def _new_groove(groove_type: str, groove_params: Dict[str, Any]):
     try:
         groove_class = getattr(grooves, groove_type)
     except AttributeError:
         raise ValueError(f"Unknown groove type: {groove_type}")
 
-    clean_params = {k: v for k, v in groove_params.items() if v is not None}
-
     try:
-        groove = groove_class(**clean_params)
+        groove = groove_class(**groove_params)
         return groove
     except Exception as e:
         raise ValueError(f"Error creating {groove_type}: {str(e)}")
 
 
-def create_roll_pass_contour(roll_pass: Union[RollPass, ThreeRollPass]):
+def create_roll_pass_contour_info(roll_pass: Union[RollPass, ThreeRollPass]) -> Dict[str, Any]:
+    """Scalar data accompanying the contour lines of a roll pass."""
     groove_type = roll_pass.roll.groove.__class__.__name__
-    contours = roll_pass.technologically_orientated_contour_lines.geoms
 
     if isinstance(roll_pass, ThreeRollPass):
-        contour_data = []
-        for i, contour in enumerate(contours):
-            x_coords = [p[0] for p in contour.coords]
-            y_coords = [p[1] for p in contour.coords]
-            contour_data.append({
-                "x": x_coords,
-                "y": y_coords
-            })
-
         return {
             "success": True,
             "pass_type": "ThreeRollPass",
-            "contours": contour_data,
             "inscribed_circle_diameter": roll_pass.inscribed_circle_diameter,
             "groove_type": groove_type,
             "usable_width": float(roll_pass.usable_width) if hasattr(roll_pass, 'usable_width') else None,
             "depth": float(roll_pass.roll.groove.depth) if hasattr(roll_pass.roll.groove, 'depth') else None
         }
     else:
-        upper_contour = contours[0]
-        upper_x = [p[0] for p in upper_contour.coords]
-        upper_y = [p[1] for p in upper_contour.coords]
-
-        lower_contour = contours[1]
-        lower_x = [p[0] for p in lower_contour.coords]
-        lower_y = [p[1] for p in lower_contour.coords]
-
         return {
             "success": True,
             "pass_type": "TwoRollPass",
-            "upper": {
-                "x": upper_x,
-                "y": upper_y
-            },
-            "lower": {
-                "x": lower_x,
-                "y": lower_y
-            },
             "gap": roll_pass.gap,
             "groove_type": groove_type,
             "usable_width": float(roll_pass.roll.groove.usable_width) if hasattr(roll_pass.roll.groove,
@@ -137,6 +151,58 @@ def create_roll_pass_contour(roll_pass: Union[RollPass, ThreeRollPass]):
         }
 
 
+def combine_roll_pass_contour(info: Dict[str, Any], contours, tolerance: float = 0) -> Dict[str, Any]:
+    """Build the roll pass contour response from :py:func:`create_roll_pass_contour_info` and the contour lines."""
+    result = dict(info)
+
+    if info["pass_type"] == "ThreeRollPass":
+        result["contours"] = [line_coordinates(contour, tolerance) for contour in contours]
+    else:
+        result["upper"] = line_coordinates(contours[0], tolerance)
+        result["lower"] = line_coordinates(contours[1], tolerance)
+
+    return result
+
+
+def create_roll_pass_contour(roll_pass: Union[RollPass, ThreeRollPass], tolerance: float = 0):
+    return combine_roll_pass_contour(
+        create_roll_pass_contour_info(roll_pass),
+        roll_pass.technologically_orientated_contour_lines.geoms,
+        tolerance
+    )
+
+
+def coordinate_arrays(line, tolerance: float = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Coordinates of a line or ring as NumPy arrays, read in one call.
+
+    Args:
+        line: shapely LineString or LinearRing
+        tolerance: if positive, simplify the line first with the Douglas-Peucker algorithm,
+            so that no point deviates more than this from the original (in model units)
+    """
+    if tolerance > 0:
+        line = shapely.simplify(line, tolerance, preserve_topology=False)
+
+    coords = shapely.get_coordinates(line)
+    return coords[:, 0], coords[:, 1]
+
+
+def line_coordinates(line, tolerance: float = 0) -> Dict[str, List[float]]:
+    """Coordinates of a line or ring in the ``{"x": [...], "y": [...]}`` form of the API responses."""
+    x, y = coordinate_arrays(line, tolerance)
+    return {"x": x.tolist(), "y": y.tolist()}
+
+
+def encode_geometry(geometry) -> str:
+    """Compact, lossless text form of a shapely geometry (base64 WKB) for storing along the results."""
+    return base64.b64encode(shapely.to_wkb(geometry)).decode("ascii")
+
+
+def decode_geometry(encoded: str):
+    return shapely.from_wkb(base64.b64decode(encoded))
+
+
 def create_roll_pass(unit: Dict[str, Any]) -> RollPass:
     groove = create_groove(
         unit.get('grooveType'),
@@ -243,10 +309,5 @@ def create_cooling_pipe(unit: Dict[str, Any]) -> CoolingPipe:
     return cooling
 
 
-def extract_profile_contour(cross_section):
-    x_coords, y_coords = cross_section.boundary.xy
-
-    return {
-        'x': [float(x) for x in x_coords],
-        'y': [float(y) for y in y_coords]
-    }
\ No newline at end of file
+def extract_profile_contour(cross_section, tolerance: float = 0) -> Dict[str, List[float]]:
+    return line_coordinates(cross_section.exterior, tolerance)
\ No newline at end of file
@@ -1,5 +1,8 @@
+import logging
 from typing import Dict, Any
-from pyroll.core import Profile
+from .helpers import PROFILE_GEOMETRY, extract_profile_contour, profile_template
+
+logger = logging.getLogger(__name__)
 
 
 def get_in_profile_contour(profile_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -13,6 +16,7 @@ def get_in_profile_contour(profile_data: Dict[str, Any]) -> Dict[str, Any]:
             - side_length: for square profiles
             - width, height: for box profiles
             - diameter: for hexagon profiles
+            - tolerance: optional simplification tolerance of the contour
 
     Returns:
         Dictionary with success status and contour coordinates
@@ -20,56 +24,15 @@ def get_in_profile_contour(profile_data: Dict[str, Any]) -> Dict[str, Any]:
     try:
         shape = profile_data.get('shape', 'round').lower()
 
-        if shape == 'round':
-            diameter = profile_data.get('diameter', 0)
-            profile = Profile.round(
-                diameter=diameter,
-                temperature=profile_data.get('temperature', 1200),
-                material=profile_data.get('material'),
-                flow_stress=profile_data.get('flow_stress')
-            )
-
-        elif shape == 'square':
-            side_length = profile_data.get('side', 0)  # Changed from 'side_length' to 'side'
-            corner_radius = profile_data.get('corner_radius', 0)
-            profile = Profile.square(
-                side=side_length,
-                corner_radius=corner_radius,
-                temperature=profile_data.get('temperature', 1200),
-                material=profile_data.get('material'),
-                flow_stress=profile_data.get('flow_stress')
-            )
-
-        elif shape == 'box':
-            width = profile_data.get('width', 0)
-            height = profile_data.get('height', 0)
-            corner_radius = profile_data.get('corner_radius', 0)
-            profile = Profile.box(
-                width=width,
-                height=height,
-                corner_radius=corner_radius,
-                temperature=profile_data.get('temperature', 1200),
-                material=profile_data.get('material'),
-                flow_stress=profile_data.get('flow_stress')
-            )
-
-        elif shape == 'hexagon':
-            side_length = profile_data.get('side', 0)  # Changed to use 'side' parameter
-            corner_radius = profile_data.get('corner_radius', 0)
-            profile = Profile.hexagon(
-                side=side_length,  # Hexagon uses side, not diameter
-                corner_radius=corner_radius,
-                temperature=profile_data.get('temperature', 1200),
-                material=profile_data.get('material'),
-                flow_stress=profile_data.get('flow_stress')
-            )
-
-        else:
+        if shape not in PROFILE_GEOMETRY:
             return {
                 "success": False,
                 "error": f"Unknown shape type: {shape}"
             }
 
+        # only the cross-section is plotted, the profile is shared with all requests of the same geometry
+        profile = profile_template(shape, tuple((k, profile_data.get(k, 0)) for k in PROFILE_GEOMETRY[shape]))
+
         # Get contour from profile
         if not hasattr(profile, 'cross_section') or not hasattr(profile.cross_section, 'boundary'):
             return {
@@ -77,24 +40,18 @@ def get_in_profile_contour(profile_data: Dict[str, Any]) -> Dict[str, Any]:
                 "error": "Profile has no cross_section boundary"
             }
 
-        contour = profile.cross_section.boundary
-        x_coords = [p[0] for p in contour.coords]
-        y_coords = [p[1] for p in contour.coords]
+        contour = extract_profile_contour(profile.cross_section, profile_data.get('tolerance') or 0)
 
         return {
             "success": True,
-            "contour": {
-                "x": x_coords,
-                "y": y_coords
-            },
+            "contour": contour,
             "shape": shape,
             "area": float(profile.cross_section.area) if hasattr(profile.cross_section, 'area') else None
         }
 
     except Exception as e:
-        import traceback
+        logger.exception("In-profile contour failed")
         return {
             "success": False,
-            "error": str(e),
-            "traceback": traceback.format_exc()
+            "error": str(e)
         }
\ No newline at end of file
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .cache import connect, decode_result, encode_result
+from .executor import ExecutorSaturatedError
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    SQLite table of simulation jobs holding their request, state, progress and result.
+
+    Use ``":memory:"`` as ``db_path`` to keep jobs only for the lifetime of the process.
+    Several server processes may share the database, each job is owned by the process running it.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.owner = os.getpid()
+        self._lock = threading.RLock()
+        self._db = connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, "
+            "units_total INTEGER NOT NULL, units_solved INTEGER NOT NULL DEFAULT 0, "
+            "result_id TEXT, result BLOB, error TEXT, created REAL NOT NULL, updated REAL NOT NULL, owner INTEGER)"
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(jobs)")]
+        if "owner" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+        self._db.commit()
+
+    def create(self, request: Dict[str, Any], units_total: int) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, request, units_total, created, updated, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request), units_total, now, now, self.owner)
+            )
+            self._db.commit()
+
+        return job_id
+
+    def get(self, job_id: str, with_result: bool = True) -> Optional[Dict[str, Any]]:
+        columns = ["id", "status", "request", "units_total", "units_solved", "result_id", "error", "created", "updated"]
+        if with_result:
+            columns.append("result")
+
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(columns)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        job = dict(zip(columns, row))
+        job["request"] = json.loads(job["request"])
+        if with_result:
+            job["result"] = decode_result(job["result"]) if job["result"] is not None else None
+        return job
+
+    def update(self, job_id: str, only_if: Tuple[str, ...] = (), **fields) -> bool:
+        """
+        Set the given columns of a job.
+
+        Args:
+            only_if: statuses the job must have for the update to happen, any if empty
+
+        Returns:
+            whether the job was updated
+        """
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = encode_result(fields["result"])
+        fields["updated"] = time.time()
+
+        query = f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?"
+        params = list(fields.values()) + [job_id]
+        if only_if:
+            query += f" AND status IN ({', '.join('?' * len(only_if))})"
+            params += list(only_if)
+
+        with self._lock:
+            updated = self._db.execute(query, params).rowcount
+            self._db.commit()
+
+        return updated > 0
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount
+            self._db.commit()
+
+        return deleted > 0
+
+    def adopt_unfinished(self) -> List[str]:
+        """
+        Queue the jobs not finished whose owner process is gone again, owned by this process.
+
+        Returns:
+            ids of the adopted jobs, oldest first
+        """
+        with self._lock:
+            # the immediate transaction keeps processes starting at the same time from adopting the same job
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    f"SELECT id, owner FROM jobs WHERE status NOT IN ({', '.join('?' * len(FINISHED))}) "
+                    "ORDER BY created",
+                    FINISHED
+                ).fetchall()
+                adopted = [job_id for job_id, owner in rows if owner == self.owner or not _process_alive(owner)]
+                self._db.executemany(
+                    "UPDATE jobs SET status = ?, units_solved = 0, owner = ?, updated = ? WHERE id = ?",
+                    [(QUEUED, self.owner, time.time(), job_id) for job_id in adopted]
+                )
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+        return adopted
+
+    def prune(self, max_age: float) -> int:
+        """Delete finished jobs not updated for ``max_age`` seconds, returns the count of deleted jobs."""
+        with self._lock:
+            deleted = self._db.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) AND updated < ?",
+                FINISHED + (time.time() - max_age,)
+            ).rowcount
+            self._db.commit()
+
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+JobFunction = Callable[[Dict[str, Any], Callable[[], None]], Awaitable[Tuple[str, Dict[str, Any]]]]
+
+
+class JobManager:
+    """
+    Runs the jobs of a :py:class:`JobStore` in the background.
+
+    ``concurrency`` tasks take jobs from a queue and await ``solve(request, on_unit_solved)``, which must return
+    the result id and the result. Jobs found unfinished on start, e.g. because the server was stopped,
+    are queued again, unless another server process sharing the store is still running them.
+    While the executor is saturated, jobs wait instead of failing. The progress of a running job is written
+    to the store at most every ``progress_interval`` seconds. A job cancelled in the store by another process
+    is stopped by its owner once it finds the job not running anymore on the next progress write.
+
+    :py:meth:`start` must be awaited in the event loop running the jobs, :py:meth:`submit` and :py:meth:`cancel`
+    may be called from any thread, they access the store directly and are meant for the threadpool.
+    """
+
+    def __init__(self, store: JobStore, solve: JobFunction, concurrency: int, retry_after: float = 5,
+                 retention: Optional[float] = None, progress_interval: float = 1.0):
+        self.store = store
+        self.solve = solve
+        self.concurrency = max(1, concurrency)
+        self.retry_after = retry_after
+        self.retention = retention
+        self.progress_interval = progress_interval
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+
+    async def start(self):
+        if self._workers:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        # the store may wait for other processes sharing it, never on the event loop
+        if self.retention:
+            await self._loop.run_in_executor(None, self.store.prune, self.retention)
+
+        for job_id in await self._loop.run_in_executor(None, self.store.adopt_unfinished):
+            self._queue.put_nowait(job_id)
+
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def shutdown(self):
+        # running jobs stay marked as running and are started again with the next start
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, request: Dict[str, Any], units_total: int) -> str:
+        if self.retention:
+            self.store.prune(self.retention)
+
+        job_id = self.store.create(request, units_total)
+        # asyncio objects are not thread-safe
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job_id)
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job, returns False if it is unknown or already finished.
+
+        Jobs run by another process sharing the store are stopped by that process on their next progress write.
+        """
+        if not self.store.update(job_id, only_if=(QUEUED, RUNNING), status=CANCELLED):
+            return False
+
+        self._loop.call_soon_threadsafe(self._cancel_task, job_id)
+        return True
+
+    def _cancel_task(self, job_id: str):
+        # queued jobs are skipped when taken from the queue, their status is not queued anymore
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id = await self._queue.get()
+            if not await loop.run_in_executor(
+                    None, lambda: self.store.update(job_id, only_if=(QUEUED,), status=RUNNING)
+            ):
+                continue
+
+            task = asyncio.create_task(self._run(job_id))
+            self._running[job_id] = task
+            try:
+                # wait does not raise if the job task was cancelled, only if this worker is
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise
+            finally:
+                self._running.pop(job_id, None)
+
+    async def _run(self, job_id: str):
+        loop = asyncio.get_running_loop()
+        job = await loop.run_in_executor(None, lambda: self.store.get(job_id, with_result=False))
+        solved = 0
+        reported = time.monotonic()
+        progress: Optional[asyncio.Future] = None
+
+        async def report(units_solved: int):
+            # the job may have been cancelled through another server process sharing the store
+            if not await loop.run_in_executor(
+                    None, lambda: self.store.update(job_id, only_if=(RUNNING,), units_solved=units_solved)
+            ):
+                self._cancel_task(job_id)
+
+        def on_unit_solved():
+            nonlocal solved, reported, progress
+            solved += 1
+            # called in the event loop, the write runs as a task, skipped while the previous one is pending
+            if time.monotonic() - reported >= self.progress_interval and (progress is None or progress.done()):
+                reported = time.monotonic()
+                progress = asyncio.ensure_future(report(solved))
+
+        try:
+            while True:
+                try:
+                    result_id, result = await self.solve(job["request"], on_unit_solved)
+                    break
+                except ExecutorSaturatedError as e:
+                    await asyncio.sleep(e.retry_after or self.retry_after)
+                    if not await loop.run_in_executor(None, lambda: self.store.update(job_id, only_if=(RUNNING,))):
+                        return
+
+            # encoding and writing the result may take a while
+            await loop.run_in_executor(None, lambda: self.store.update(
+                job_id, only_if=(RUNNING,),
+                status=SUCCEEDED, units_solved=result["units"], result_id=result_id, result=result
+            ))
+
+        except Exception as e:
+            await loop.run_in_executor(
+                None, lambda: self.store.update(job_id, only_if=(RUNNING,), status=FAILED, error=str(e))
+            )
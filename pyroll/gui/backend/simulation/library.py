@@ -0,0 +1,249 @@
+"""
+Library of pass designs shared by all users of the server.
+
+Each design holds the in-profile and the pass design of a simulation request and, once solved, its result.
+Designs are indexed by the groove types of their roll passes, by their materials, by the cross-section of the
+final profile and by date, so they are found without reading the stored requests and results.
+"""
+
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import connect, decode_result, encode_result
+
+_SUMMARY_COLUMNS = [
+    "id", "name", "description", "created", "updated", "shape", "units", "solve_method", "result_id",
+    "final_cross_section_area", "final_width", "final_height",
+]
+
+
+def design_materials(in_profile: Dict[str, Any]) -> List[str]:
+    """Material names of an in-profile, given as list or as comma separated text."""
+    material = in_profile.get("material")
+    if material is None:
+        return []
+    names = material if isinstance(material, list) else str(material).split(",")
+    return sorted({str(name).strip() for name in names if str(name).strip()})
+
+
+def design_grooves(units: List[Dict[str, Any]]) -> List[str]:
+    """Groove types of the roll passes of a pass design."""
+    return sorted({unit["grooveType"] for unit in units if unit.get("grooveType")})
+
+
+def _final_section(result: Optional[Dict[str, Any]]) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    if not result or not result.get("passes"):
+        return None, None, None
+    final = result["passes"][-1]
+    return (
+        final.get("out_profile_cross_section_area"), final.get("out_profile_width"), final.get("out_profile_height")
+    )
+
+
+class DesignLibrary:
+    """
+    SQLite store of named pass designs with their results.
+
+    Use ``":memory:"`` as ``db_path`` to keep designs only for the lifetime of the process.
+    Several server processes may share the database.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._db = connect(db_path)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS designs ("
+            "id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT NOT NULL DEFAULT '', "
+            "created REAL NOT NULL, updated REAL NOT NULL, shape TEXT, units INTEGER NOT NULL, "
+            "solve_method TEXT NOT NULL, request TEXT NOT NULL, result_id TEXT NOT NULL, result BLOB, "
+            "final_cross_section_area REAL, final_width REAL, final_height REAL);"
+            "CREATE TABLE IF NOT EXISTS design_grooves ("
+            "design_id TEXT NOT NULL REFERENCES designs (id) ON DELETE CASCADE, groove_type TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS design_materials ("
+            "design_id TEXT NOT NULL REFERENCES designs (id) ON DELETE CASCADE, "
+            "material TEXT NOT NULL COLLATE NOCASE);"
+            "CREATE INDEX IF NOT EXISTS designs_created ON designs (created);"
+            "CREATE INDEX IF NOT EXISTS designs_result_id ON designs (result_id);"
+            "CREATE INDEX IF NOT EXISTS designs_final_cross_section_area ON designs (final_cross_section_area);"
+            "CREATE INDEX IF NOT EXISTS design_grooves_groove_type ON design_grooves (groove_type, design_id);"
+            "CREATE INDEX IF NOT EXISTS design_grooves_design_id ON design_grooves (design_id);"
+            "CREATE INDEX IF NOT EXISTS design_materials_material ON design_materials (material, design_id);"
+            "CREATE INDEX IF NOT EXISTS design_materials_design_id ON design_materials (design_id);"
+        )
+        self._db.commit()
+
+    def save(self, name: str, request: Dict[str, Any], result_id: str, result: Optional[Dict[str, Any]] = None,
+             description: str = "") -> str:
+        """
+        Add a design to the library.
+
+        Args:
+            name: name to find the design by
+            request: the simulation request, a dump of ``SimulationRequest``
+            result_id: cache key of the request
+            result: the result of the request, None if it could not be solved
+            description: free text
+
+        Returns:
+            the id of the design
+        """
+        design_id = uuid.uuid4().hex
+        now = time.time()
+        units = request["passDesignData"]
+        area, width, height = _final_section(result)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO designs (id, name, description, created, updated, shape, units, solve_method, result_id, "
+                "final_cross_section_area, final_width, final_height, request, result) "
+                f"VALUES ({', '.join('?' * 14)})",
+                (
+                    design_id, name, description, now, now, request["inProfile"].get("shape"), len(units),
+                    request.get("solve_method", "solve"), result_id, area, width, height, json.dumps(request),
+                    encode_result(result) if result is not None else None
+                )
+            )
+            self._db.executemany(
+                "INSERT INTO design_grooves (design_id, groove_type) VALUES (?, ?)",
+                [(design_id, groove) for groove in design_grooves(units)]
+            )
+            self._db.executemany(
+                "INSERT INTO design_materials (design_id, material) VALUES (?, ?)",
+                [(design_id, material) for material in design_materials(request["inProfile"])]
+            )
+            self._db.commit()
+
+        return design_id
+
+    def get(self, design_id: str, with_result: bool = True) -> Optional[Dict[str, Any]]:
+        """The summary of a design as in :py:meth:`search` with its ``request`` and, if asked for, ``result``."""
+        columns = _SUMMARY_COLUMNS + ["result IS NOT NULL", "request"] + (["result"] if with_result else [])
+
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(columns)} FROM designs WHERE id = ?", (design_id,)).fetchone()
+            if row is None:
+                return None
+            design = self._summaries([row])[0]
+
+        design["request"] = json.loads(row[len(_SUMMARY_COLUMNS) + 1])
+        if with_result:
+            payload = row[len(_SUMMARY_COLUMNS) + 2]
+            design["result"] = decode_result(payload) if payload is not None else None
+        return design
+
+    def result(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """The stored result of any design of the request with the given cache key, if solved."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM designs WHERE result_id = ? AND result IS NOT NULL LIMIT 1", (result_id,)
+            ).fetchone()
+
+        return decode_result(row[0]) if row is not None else None
+
+    def search(
+            self,
+            name: Optional[str] = None,
+            groove_type: Optional[str] = None,
+            material: Optional[str] = None,
+            shape: Optional[str] = None,
+            min_cross_section_area: Optional[float] = None,
+            max_cross_section_area: Optional[float] = None,
+            created_after: Optional[float] = None,
+            created_before: Optional[float] = None,
+            offset: int = 0,
+            limit: int = 50
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Designs matching all given criteria, newest first.
+
+        Args:
+            name: part of the name, case-insensitive
+            groove_type: groove type used by any roll pass
+            material: material of the in-profile, case-insensitive
+            shape: shape of the in-profile
+            min_cross_section_area: lower bound of the cross-section area of the final profile
+            max_cross_section_area: upper bound of the cross-section area of the final profile
+            created_after: lower bound of the creation time as UNIX timestamp
+            created_before: upper bound of the creation time as UNIX timestamp
+            offset: count of matching designs to skip
+            limit: maximum count of designs to return
+
+        Returns:
+            the count of all matching designs and the summaries of the requested page, each with ``id``, ``name``,
+            ``description``, ``created``, ``updated``, ``shape``, ``units``, ``solve_method``, ``result_id``,
+            ``solved``, ``final_cross_section_area``, ``final_width``, ``final_height``, ``grooves`` and
+            ``materials``
+        """
+        conditions = []
+        params: List[Any] = []
+
+        if name:
+            conditions.append("name LIKE ? ESCAPE '\\'")
+            params.append("%" + name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if groove_type:
+            conditions.append("id IN (SELECT design_id FROM design_grooves WHERE groove_type = ?)")
+            params.append(groove_type)
+        if material:
+            conditions.append("id IN (SELECT design_id FROM design_materials WHERE material = ?)")
+            params.append(material)
+        for column, operator, value in (
+                ("shape", "=", shape),
+                ("final_cross_section_area", ">=", min_cross_section_area),
+                ("final_cross_section_area", "<=", max_cross_section_area),
+                ("created", ">=", created_after),
+                ("created", "<=", created_before),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            total = self._db.execute(f"SELECT COUNT(*) FROM designs{where}", params).fetchone()[0]
+            rows = self._db.execute(
+                f"SELECT {', '.join(_SUMMARY_COLUMNS)}, result IS NOT NULL FROM designs{where} "
+                "ORDER BY created DESC, id LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+            summaries = self._summaries(rows)
+
+        return total, summaries
+
+    def _summaries(self, rows: List[tuple]) -> List[Dict[str, Any]]:
+        # rows hold the summary columns followed by whether the design has a result
+        summaries = [
+            dict(zip(_SUMMARY_COLUMNS, row), solved=bool(row[len(_SUMMARY_COLUMNS)]), grooves=[], materials=[])
+            for row in rows
+        ]
+        if not summaries:
+            return summaries
+
+        by_id = {summary["id"]: summary for summary in summaries}
+
+        placeholders = ", ".join("?" * len(by_id))
+        for table, column, key in (("design_grooves", "groove_type", "grooves"),
+                                   ("design_materials", "material", "materials")):
+            for design_id, value in self._db.execute(
+                    f"SELECT design_id, {column} FROM {table} WHERE design_id IN ({placeholders}) ORDER BY {column}",
+                    list(by_id)
+            ):
+                by_id[design_id][key].append(value)
+
+        return summaries
+
+    def delete(self, design_id: str) -> bool:
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM designs WHERE id = ?", (design_id,)).rowcount
+            self._db.commit()
+
+        return deleted > 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,240 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+"""Upper bounds in seconds of the histogram buckets of request and stage durations."""
+
+UNIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+"""Upper bounds in seconds of the histogram buckets of unit solve durations."""
+
+
+class StageTimer:
+    """
+    Collects the durations of named stages and of the solves of single units.
+
+    Filled in the worker process, its :py:meth:`report` is returned together with the result.
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        self.stages: Dict[str, float] = {}
+        self.units: Dict[int, List[float]] = {}
+        self._started = time.perf_counter() if started is None else started
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def record_unit(self, index: int, seconds: float):
+        # units are solved several times by the iteration of the pass sequence, each call is kept
+        self.units.setdefault(index, []).append(seconds)
+
+    def report(self, units: Sequence[Dict[str, Any]] = ()) -> Dict[str, Any]:
+        """
+        The collected timings as JSON-serializable dictionary.
+
+        Args:
+            units: unit definitions as sent by the frontend, used to label the units by index
+        """
+        report = {
+            "total": time.perf_counter() - self._started,
+            "stages": dict(self.stages),
+        }
+        if self.units:
+            report["units"] = [
+                {
+                    "unit": i,
+                    "type": units[i].get("type") if i < len(units) else None,
+                    "label": units[i].get("label") if i < len(units) else None,
+                    "seconds": sum(durations),
+                    "solves": len(durations),
+                }
+                for i, durations in sorted(self.units.items())
+            ]
+        return report
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Gauge(_Metric):
+    """
+    Metric reading its current value from a function at collection time.
+
+    With ``kind="counter"`` it exposes a count maintained elsewhere, like the hits of a cache.
+    """
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float], kind: str = "gauge"):
+        super().__init__(name, documentation)
+        self.function = function
+        self.kind = kind
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.function())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, counts in sorted(self._counts.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, function: Callable[[], float], kind: str = "gauge") -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, function, kind))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware observing the time from receiving a request to sending the response headers.
+
+    Stores the receipt time as ``request.state.received``. Endpoints returning models may set
+    ``request.state.handler_done``, the time from then to the response headers is observed
+    as stage ``response_encoding``.
+    Unlike an ``@app.middleware("http")`` function it leaves ``Request.is_disconnected`` working.
+    """
+
+    def __init__(self, app, request_duration: Histogram, stage_duration: Histogram):
+        self.app = app
+        self.request_duration = request_duration
+        self.stage_duration = stage_duration
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        state["received"] = time.perf_counter()
+
+        async def observing_send(message):
+            if message["type"] == "http.response.start":
+                finished = time.perf_counter()
+                route = scope.get("route")
+                self.request_duration.observe(
+                    finished - state["received"],
+                    method=scope["method"],
+                    route=getattr(route, "path", "unmatched"),
+                    status=message["status"]
+                )
+
+                handler_done = state.get("handler_done")
+                if handler_done is not None:
+                    self.stage_duration.observe(finished - handler_done, stage="response_encoding")
+
+            await send(message)
+
+        await self.app(scope, receive, observing_send)
@@ -0,0 +1,164 @@
+"""
+Monte-Carlo tolerance analysis of a simulation request.
+
+Parameters of the request are drawn from independent distributions and each sample is simulated.
+Of the results only the requested scalar outputs of each unit are kept, in an array allocated once for all
+samples, so memory grows with samples times units times outputs and not with the size of the results.
+Sensitivities are the standardized regression coefficients of a linear fit of each output to the parameters,
+their squares approximate the first-order sensitivity indices if the fit is good (``r2`` close to 1).
+"""
+
+import copy
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .sweep import apply_override
+
+DISTRIBUTIONS = ("normal", "uniform", "triangular")
+"""Distributions parameters can be drawn from."""
+
+OUTPUTS = ("roll_force", "roll_torque", "power", "out_profile_filling_error")
+"""Unit results analysed if not specified otherwise."""
+
+
+def sample_parameters(distributions: Sequence[Dict[str, Any]], samples: int, seed: Optional[int] = None
+                      ) -> np.ndarray:
+    """
+    Draw parameter values, one row per sample and one column per parameter.
+
+    Args:
+        distributions: per parameter the ``distribution`` (one of ``DISTRIBUTIONS``) and its arguments,
+            ``mean`` and ``std`` and optionally ``lower`` and ``upper`` to clip for normal,
+            ``lower`` and ``upper`` for uniform, ``lower``, ``mode`` and ``upper`` for triangular
+        samples: count of samples
+        seed: seed of the random generator, for reproducible samples
+    """
+    rng = np.random.default_rng(seed)
+    columns = []
+
+    for d in distributions:
+        if d["distribution"] == "normal":
+            values = rng.normal(d["mean"], d["std"], samples)
+            values = np.clip(
+                values,
+                d["lower"] if d.get("lower") is not None else -np.inf,
+                d["upper"] if d.get("upper") is not None else np.inf
+            )
+        elif d["distribution"] == "uniform":
+            values = rng.uniform(d["lower"], d["upper"], samples)
+        elif d["distribution"] == "triangular":
+            values = rng.triangular(d["lower"], d["mode"], d["upper"], samples)
+        else:
+            raise ValueError(f"Unknown distribution '{d['distribution']}', must be one of {', '.join(DISTRIBUTIONS)}")
+        columns.append(values)
+
+    return np.column_stack(columns) if columns else np.empty((samples, 0))
+
+
+def sample_requests(base: Dict[str, Any], paths: Sequence[str], values: np.ndarray) -> Iterator[Dict[str, Any]]:
+    """Copies of the base request with the values of each row set at ``paths``."""
+    for row in values:
+        request = copy.deepcopy(base)
+        for path, value in zip(paths, row):
+            apply_override(request, path, float(value))
+        yield request
+
+
+def _scalar(value: Any) -> Optional[float]:
+    # some values are reported per roll, the first one is analysed like in the plots
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+class OutputStatistics:
+    """
+    Scalar outputs of the units of all samples and their statistics.
+
+    Args:
+        samples: count of samples
+        units: count of units of the sequence
+        outputs: unit result fields to collect
+    """
+
+    def __init__(self, samples: int, units: int, outputs: Sequence[str]):
+        self.outputs = list(outputs)
+        self.values = np.full((samples, units, len(self.outputs)), np.nan)
+        self.solved = np.zeros(samples, dtype=bool)
+        self.failed = 0
+        self.units: List[Dict[str, Any]] = []
+
+    def add(self, sample: int, result: Dict[str, Any]):
+        """Keep the outputs of the result of a sample, the result itself is not referenced afterward."""
+        passes = result["passes"]
+        if not self.units:
+            self.units = [{"pass": u.get("pass"), "label": u.get("label"), "type": u.get("type")} for u in passes]
+
+        for i, unit in enumerate(passes[:self.values.shape[1]]):
+            for k, name in enumerate(self.outputs):
+                value = _scalar(unit.get(name))
+                if value is not None:
+                    self.values[sample, i, k] = value
+        self.solved[sample] = True
+
+    def add_failure(self):
+        self.failed += 1
+
+    def summary(self, inputs: np.ndarray, paths: Sequence[str], percentiles: Sequence[float]) -> List[Dict[str, Any]]:
+        """
+        Statistics of each output of each unit over the solved samples.
+
+        Args:
+            inputs: parameter values of all samples as drawn by :py:func:`sample_parameters`
+            paths: parameter paths, the columns of ``inputs``
+            percentiles: percentiles to report, between 0 and 100
+
+        Returns:
+            per unit its ``pass``, ``label`` and ``type`` and per output with values the ``mean``, ``std``,
+            ``min``, ``max``, ``percentiles`` and the ``sensitivity`` to each parameter with the ``r2`` of the fit
+        """
+        inputs = inputs[self.solved]
+        values = self.values[self.solved]
+        units = []
+
+        for i, unit in enumerate(self.units):
+            outputs = {}
+            for k, name in enumerate(self.outputs):
+                y = values[:, i, k]
+                valid = ~np.isnan(y)
+                if valid.sum() < 2:
+                    continue
+
+                y = y[valid]
+                sensitivity, r2 = _standardized_regression(inputs[valid], y)
+                outputs[name] = {
+                    "mean": float(y.mean()),
+                    "std": float(y.std(ddof=1)),
+                    "min": float(y.min()),
+                    "max": float(y.max()),
+                    "percentiles": {f"{p:g}": float(v) for p, v in zip(percentiles, np.percentile(y, percentiles))},
+                    "sensitivity": dict(zip(paths, sensitivity)),
+                    "r2": r2,
+                }
+            units.append({**unit, "outputs": outputs})
+
+        return units
+
+
+def _standardized_regression(x: np.ndarray, y: np.ndarray):
+    x_std = x.std(axis=0)
+    y_std = y.std()
+    sensitivity = [0.0] * x.shape[1]
+    varying = np.flatnonzero(x_std > 0)
+    if y_std == 0 or len(varying) == 0:
+        return sensitivity, None
+
+    z = (x[:, varying] - x[:, varying].mean(axis=0)) / x_std[varying]
+    target = (y - y.mean()) / y_std
+    coefficients, *_ = np.linalg.lstsq(z, target, rcond=None)
+    residual = target - z @ coefficients
+
+    for j, c in zip(varying, coefficients):
+        sensitivity[j] = float(c)
+    return sensitivity, float(1 - residual @ residual / (target @ target))
@@ -0,0 +1,173 @@
+"""
+Derivative-free optimization of free roll pass parameters towards targets of the final profile.
+
+A bounded compass search is used: each iteration polls the best point so far by one step up and down along each
+parameter, a step relative to the parameter range. All polled candidates are independent of each other,
+so they are solved in parallel. The best candidate replaces the center if it improves the objective,
+otherwise the step is halved, until it falls below the minimum step.
+Failed simulations count as infinitely bad, so the search steps away from infeasible designs.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .sweep import apply_override
+
+FREE_PARAMETERS = {
+    "gap": ("TwoRollPass",),
+    "inscribed_circle_diameter": ("ThreeRollPass",),
+    "nominal_radius": ("TwoRollPass", "ThreeRollPass"),
+}
+"""Parameters of roll passes that can be optimized and the unit types having them."""
+
+TARGETS = ("cross_section_area", "width", "height")
+"""Values of the final profile that can be targeted."""
+
+PENALTY = 1e3
+"""Weight of the squared relative constraint violations against the squared relative target deviations."""
+
+
+def parameter_path(unit: int, name: str) -> str:
+    return f"passDesignData[{unit}].{name}"
+
+
+def _values(value: Any) -> List[float]:
+    # some results are reported per roll
+    if isinstance(value, list):
+        return [float(v) for v in value if isinstance(v, (int, float))]
+    return [float(value)] if isinstance(value, (int, float)) else []
+
+
+def score(result: Dict[str, Any], targets: Dict[str, float], constraints: Dict[str, Optional[float]]
+          ) -> Dict[str, Any]:
+    """
+    Objective of a simulation result, lower is better.
+
+    Args:
+        result: simulation result
+        targets: values of ``TARGETS`` the final profile shall have
+        constraints: any of ``filling_ratio_min``, ``filling_ratio_max``, ``max_roll_force`` and ``max_power``
+            applying to all roll passes, None for unconstrained
+
+    Returns:
+        the ``objective``, its parts ``deviation`` (sum of squared relative deviations from the targets)
+        and ``violation`` (sum of squared relative constraint violations), whether the design is ``feasible``
+        and the ``final`` values of the targeted quantities
+    """
+    passes = result["passes"]
+    final = passes[-1]
+
+    deviation = 0.0
+    final_values = {}
+    for name, target in targets.items():
+        value = _values(final.get(f"out_profile_{name}"))
+        if not value:
+            raise ValueError(f"The result has no final {name}")
+        final_values[name] = value[0]
+        deviation += ((value[0] - target) / target) ** 2
+
+    violation = 0.0
+    bounds = [
+        ("filling_ratio", constraints.get("filling_ratio_min"), constraints.get("filling_ratio_max")),
+        ("roll_force", None, constraints.get("max_roll_force")),
+        ("power", None, constraints.get("max_power")),
+    ]
+    for unit in passes:
+        if unit.get("type") not in ("TwoRollPass", "ThreeRollPass"):
+            continue
+        for field, lower, upper in bounds:
+            for value in _values(unit.get(field)):
+                if lower is not None and value < lower:
+                    violation += ((lower - value) / lower) ** 2
+                if upper is not None and value > upper:
+                    violation += ((value - upper) / upper) ** 2
+
+    return {
+        "objective": deviation + PENALTY * violation,
+        "deviation": deviation,
+        "violation": violation,
+        "feasible": violation == 0,
+        "final": final_values,
+    }
+
+
+class PatternSearch:
+    """
+    Bounded compass search on parameters scaled to the unit interval.
+
+    Args:
+        lower: lower bounds of the parameters
+        upper: upper bounds of the parameters
+        initial: start point, clipped to the bounds
+        step: first step as fraction of each parameter range
+        min_step: step below which the search has converged
+    """
+
+    def __init__(self, lower: Sequence[float], upper: Sequence[float], initial: Sequence[float],
+                 step: float = 0.25, min_step: float = 1e-3):
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.step = step
+        self.min_step = min_step
+
+        self.best = np.clip((np.asarray(initial, dtype=float) - self.lower) / (self.upper - self.lower), 0, 1)
+        self.best_value = math.inf
+        self._seen = set()
+
+    @property
+    def converged(self) -> bool:
+        return self.step < self.min_step
+
+    def values(self, point: np.ndarray) -> List[float]:
+        """Parameter values of a scaled point."""
+        return (self.lower + point * (self.upper - self.lower)).tolist()
+
+    def poll(self) -> List[np.ndarray]:
+        """
+        Points to evaluate next, the start point first, then the neighbours of the best point not evaluated yet.
+
+        Halves the step while no new neighbour remains, e.g. at the bounds.
+        """
+        if not self._seen:
+            return [self.best]
+
+        while not self.converged:
+            points = []
+            for j in range(len(self.best)):
+                for sign in (1, -1):
+                    point = self.best.copy()
+                    point[j] = min(1.0, max(0.0, point[j] + sign * self.step))
+                    if tuple(point) not in self._seen:
+                        points.append(point)
+            if points:
+                return points
+            self.step /= 2
+
+        return []
+
+    def tell(self, points: Iterable[np.ndarray], objectives: Iterable[float]):
+        """Report the objectives of the polled points, moves to the best one or shrinks the step."""
+        improved = False
+        for point, objective in zip(points, objectives):
+            self._seen.add(tuple(point))
+            if objective < self.best_value:
+                self.best, self.best_value = point, objective
+                improved = True
+
+        if not improved and len(self._seen) > 1:
+            self.step /= 2
+
+
+def candidate_requests(base: Dict[str, Any], paths: Sequence[str], points: Sequence[List[float]]
+                       ) -> List[Tuple[Dict[str, float], Dict[str, Any]]]:
+    """Copies of the base request with the parameter values of each point, as overrides and request."""
+    candidates = []
+    for values in points:
+        overrides = dict(zip(paths, values))
+        request = {**base, "passDesignData": [dict(u) for u in base["passDesignData"]]}
+        for path, value in overrides.items():
+            apply_override(request, path, value)
+        candidates.append((overrides, request))
+    return candidates
@@ -0,0 +1,135 @@
+import cProfile
+import os
+import pstats
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from .pyroll_basic_runner import run_pyroll_simulation
+
+FunctionKey = Tuple[str, int, str]
+
+
+def _short_filename(filename: str) -> str:
+    # strip the longest import path prefix, so the location reads like a module path
+    prefixes = [p for p in sys.path if p and filename.startswith(os.path.join(p, ""))]
+    if not prefixes:
+        return filename
+    return os.path.relpath(filename, max(prefixes, key=len))
+
+
+def _function_name(key: FunctionKey) -> str:
+    filename, line, name = key
+    if filename == "~":
+        return name
+    return f"{_short_filename(filename)}:{line}({name})"
+
+
+class HookTimer:
+    """
+    Measures the evaluation of pyroll hooks by hook name while active.
+
+    Wraps :py:meth:`pyroll.core.hooks.Hook.get_result`, which runs the hook functions when a hook value is
+    neither set explicitly nor cached. The own time of a hook excludes the evaluation of other hooks it needs,
+    so the own times of all hooks do not overlap. The cumulative time includes them,
+    but counts recursive evaluations of the same hook only once.
+    """
+
+    def __init__(self):
+        self.hooks: Dict[str, Dict[str, Any]] = {}
+        self._nested: List[float] = []
+        self._active: Dict[str, int] = {}
+        self._original = None
+
+    def __enter__(self):
+        from pyroll.core.hooks import Hook
+
+        original = self._original = Hook.get_result
+        timer = self
+
+        def get_result(hook, instance):
+            name = f"{hook.owner.__qualname__}.{hook.name}"
+            timer._active[name] = timer._active.get(name, 0) + 1
+            timer._nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original(hook, instance)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = timer._nested.pop()
+                if timer._nested:
+                    timer._nested[-1] += elapsed
+                timer._active[name] -= 1
+
+                entry = timer.hooks.setdefault(name, {"hook": name, "calls": 0, "tottime": 0.0, "cumtime": 0.0})
+                entry["calls"] += 1
+                entry["tottime"] += elapsed - nested
+                if timer._active[name] == 0:
+                    entry["cumtime"] += elapsed
+
+        Hook.get_result = get_result
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        from pyroll.core.hooks import Hook
+
+        Hook.get_result = self._original
+
+    def report(self, limit: int) -> List[Dict[str, Any]]:
+        return sorted(self.hooks.values(), key=lambda h: h["cumtime"], reverse=True)[:limit]
+
+
+def _function_row(key: FunctionKey, stat) -> Dict[str, Any]:
+    primitive_calls, calls, own_time, cumulative_time, _ = stat
+    return {
+        "function": _function_name(key),
+        "calls": calls,
+        "primitive_calls": primitive_calls,
+        "tottime": own_time,
+        "cumtime": cumulative_time,
+    }
+
+
+def profile_report(stats: pstats.Stats, limit: int = 30) -> Dict[str, Any]:
+    """The ``limit`` functions with the highest cumulative and with the highest own time of a profiler run."""
+    entries = stats.stats
+    by_cumulative = sorted(entries.items(), key=lambda e: e[1][3], reverse=True)[:limit]
+    by_own = sorted(entries.items(), key=lambda e: e[1][2], reverse=True)[:limit]
+
+    return {
+        "profiler": "cProfile",
+        "total_seconds": stats.total_tt,
+        "top_functions": [_function_row(k, s) for k, s in by_cumulative],
+        "top_functions_by_own_time": [_function_row(k, s) for k, s in by_own],
+    }
+
+
+def run_profiled_simulation(limit: int = 30, **kwargs) -> Dict[str, Any]:
+    """
+    Run :py:func:`run_pyroll_simulation` under the deterministic profiler.
+
+    Prefix snapshots are not used, so every unit is solved and shows up in the report.
+    All times are inflated by the overhead of the profiler, compare them only among each other.
+
+    Args:
+        limit: count of functions and hooks to list
+        kwargs: passed to :py:func:`run_pyroll_simulation`
+
+    Returns:
+        the results with an additional ``profile`` entry as built by :py:func:`profile_report`,
+        extended by the ``limit`` hooks with the highest cumulative time (see :py:class:`HookTimer`)
+        and the solve times of the units
+    """
+    profiler = cProfile.Profile()
+    with HookTimer() as hook_timer:
+        profiler.enable()
+        try:
+            results = run_pyroll_simulation(use_snapshots=False, **kwargs)
+        finally:
+            profiler.disable()
+
+    report = profile_report(pstats.Stats(profiler), limit)
+    report["hooks"] = hook_timer.report(limit)
+    report["units"] = results["timings"].get("units", [])
+    results["profile"] = report
+    return results
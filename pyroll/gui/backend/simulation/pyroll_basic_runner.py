@@ -1,127 +1,324 @@
 import pyroll.basic
 from pyroll.basic import PassSequence, ThreeRollPass, RollPass
 
-from typing import Dict, List, Any, Union
+import time
+from types import MethodType, SimpleNamespace
+from typing import Dict, List, Any, Union, Callable, Optional
 
-from pyroll.core import TwoRollPass
+from pyroll.core import HookHost, TwoRollPass, Unit
 
+from . import settings
+from .constants import UNIT_TYPES, CONTOUR_FIELDS
+from .metrics import StageTimer
 from .helpers import create_roll_pass, create_transport, create_cooling_pipe, create_initial_profile, \
-    create_roll_pass_contour, extract_profile_contour
+    create_roll_pass_contour_info, combine_roll_pass_contour, extract_profile_contour, encode_geometry, \
+    decode_geometry
+from .snapshots import PrefixSnapshotCache, prefix_keys
 
+prefix_snapshots = PrefixSnapshotCache(settings.SNAPSHOT_MAX_ENTRIES)
 
-def extract_results(pass_sequence: PassSequence) -> Dict[str, Any]:
+
+def extract_results(
+        pass_sequence: PassSequence,
+        previous_passes: List[Dict[str, Any]] = (),
+        on_extracted: Optional[Callable[[int, Unit, Dict[str, Any]], None]] = None,
+        release: bool = False
+) -> Dict[str, Any]:
+    """
+    Collect the results of all units of a solved sequence.
+
+    Args:
+        pass_sequence: the solved sequence
+        previous_passes: results of units solved before and not contained in ``pass_sequence``,
+            the units of ``pass_sequence`` are numbered after them
+        on_extracted: called with index, unit and its results right after the results of a unit are extracted
+        release: whether to drop the solved state of each unit right after, see :py:func:`release_unit`,
+            the sequence is unusable afterward
+    """
     results = {
         "success": True,
-        "units": len(pass_sequence),
-        "passes": []
+        "units": len(previous_passes) + len(pass_sequence),
+        "passes": list(previous_passes)
     }
 
-    for i, unit in enumerate(pass_sequence):
-
-        unit_type = type(unit).__name__
-
-        pass_result = {"pass": i + 1,
-                       "label": unit.label if hasattr(unit, 'label') else f"Pass {i + 1}",
-                       "type": unit_type,
-                       'in_profile_strain': unit.in_profile.strain,
-                       'out_profile_strain': unit.out_profile.strain,
-                       'in_profile_temperature': unit.in_profile.temperature,
-                       'out_profile_temperature': unit.out_profile.temperature,
-                       'in_profile_height': unit.in_profile.height,
-                       'out_profile_height': unit.out_profile.height,
-                       'in_profile_width': unit.in_profile.width,
-                       'out_profile_width': unit.out_profile.width,
-                       'in_profile_cross_section_area': unit.in_profile.cross_section.area,
-                       'out_profile_cross_section_area': unit.out_profile.cross_section.area}
-
-        if isinstance(unit, RollPass) or isinstance(unit, ThreeRollPass):
-
-            reduction = (pass_result['in_profile_cross_section_area'] - pass_result['out_profile_cross_section_area']) / \
-                        pass_result['in_profile_cross_section_area']
-            pass_result['roll_force'] = unit.roll_force
-            pass_result['roll_torque'] = unit.roll.roll_torque
-            pass_result['elongation_efficiency'] = unit.elongation_efficiency
-            pass_result['power'] = unit.power
-            pass_result['out_profile_filling_error'] = unit.out_profile.filling_error
-            pass_result['in_profile_velocity'] = unit.in_profile.velocity
-            pass_result['out_profile_velocity'] = unit.out_profile.velocity
-            pass_result['filling_ratio'] = unit.out_profile.filling_ratio
-            pass_result['nominal_radius'] = unit.roll.nominal_radius
-            pass_result['working_radius'] = unit.roll.working_radius
-            pass_result['velocity'] = unit.velocity
-            pass_result['bite_angle'] = unit.bite_angle
-            pass_result['reduction'] = reduction
-            pass_result['in_profile_flow_stress'] = unit.in_profile.flow_stress
-            pass_result['out_profile_flow_stress'] = unit.out_profile.flow_stress
-            pass_result['in_profile_contour'] = extract_profile_contour(unit.in_profile.technologically_orientated_cross_section)
-            pass_result['out_profile_contour'] = extract_profile_contour(unit.out_profile.technologically_orientated_cross_section)
-
-            roll_contour_data = create_roll_pass_contour(unit)
-            pass_result['roll_contour'] = roll_contour_data
-
-        if isinstance(unit, ThreeRollPass):
-            pass_result['inscribed_circle_diameter'] = unit.inscribed_circle_diameter
-        elif isinstance(unit, TwoRollPass):
-            pass_result['gap'] = unit.gap
-
-
-        results['passes'].append(pass_result)
+    for i, unit in enumerate(pass_sequence, start=len(previous_passes)):
+        unit_results = extract_unit_results(i, unit)
+        results['passes'].append(unit_results)
+        if on_extracted is not None:
+            on_extracted(i, unit, unit_results)
+        if release:
+            release_unit(unit)
 
     return results
 
 
+def release_unit(unit: Unit):
+    """
+    Drop the solved state of a unit, i.e. its profiles, rolls, subunits and cached hook values.
+
+    Units, their profiles and rolls reference each other, so they would otherwise stay in memory until
+    the next run of the garbage collector, with all their cross-sections and contours.
+    """
+    for subunit in unit.subunits:
+        release_unit(subunit)
+    for value in vars(unit).values():
+        if isinstance(value, HookHost) and value is not unit:
+            vars(value).clear()
+    vars(unit).clear()
+
+
+def extract_unit_results(i: int, unit: Unit) -> Dict[str, Any]:
+    unit_type = type(unit).__name__
+
+    pass_result = {"pass": i + 1,
+                   "label": unit.label if hasattr(unit, 'label') else f"Pass {i + 1}",
+                   "type": unit_type,
+                   'in_profile_strain': unit.in_profile.strain,
+                   'out_profile_strain': unit.out_profile.strain,
+                   'in_profile_temperature': unit.in_profile.temperature,
+                   'out_profile_temperature': unit.out_profile.temperature,
+                   'in_profile_height': unit.in_profile.height,
+                   'out_profile_height': unit.out_profile.height,
+                   'in_profile_width': unit.in_profile.width,
+                   'out_profile_width': unit.out_profile.width,
+                   'in_profile_cross_section_area': unit.in_profile.cross_section.area,
+                   'out_profile_cross_section_area': unit.out_profile.cross_section.area}
+
+    if isinstance(unit, RollPass) or isinstance(unit, ThreeRollPass):
+
+        reduction = (pass_result['in_profile_cross_section_area'] - pass_result['out_profile_cross_section_area']) / \
+                    pass_result['in_profile_cross_section_area']
+        pass_result['roll_force'] = unit.roll_force
+        pass_result['roll_torque'] = unit.roll.roll_torque
+        pass_result['elongation_efficiency'] = unit.elongation_efficiency
+        pass_result['power'] = unit.power
+        pass_result['out_profile_filling_error'] = unit.out_profile.filling_error
+        pass_result['in_profile_velocity'] = unit.in_profile.velocity
+        pass_result['out_profile_velocity'] = unit.out_profile.velocity
+        pass_result['filling_ratio'] = unit.out_profile.filling_ratio
+        pass_result['nominal_radius'] = unit.roll.nominal_radius
+        pass_result['working_radius'] = unit.roll.working_radius
+        pass_result['velocity'] = unit.velocity
+        pass_result['bite_angle'] = unit.bite_angle
+        pass_result['reduction'] = reduction
+        pass_result['in_profile_flow_stress'] = unit.in_profile.flow_stress
+        pass_result['out_profile_flow_stress'] = unit.out_profile.flow_stress
+
+        # contours are only built on request, see resolve_contours
+        pass_result['geometry'] = {
+            'in_profile': encode_geometry(unit.in_profile.technologically_orientated_cross_section),
+            'out_profile': encode_geometry(unit.out_profile.technologically_orientated_cross_section),
+            'roll': encode_geometry(unit.technologically_orientated_contour_lines),
+            'roll_info': create_roll_pass_contour_info(unit),
+        }
+
+    if isinstance(unit, ThreeRollPass):
+        pass_result['inscribed_circle_diameter'] = unit.inscribed_circle_diameter
+    elif isinstance(unit, TwoRollPass):
+        pass_result['gap'] = unit.gap
+
+    return pass_result
+
+
+def resolve_contours(unit_results: Dict[str, Any], fields=CONTOUR_FIELDS, tolerance: float = 0) -> Dict[str, Any]:
+    """
+    Replace the stored geometry of a unit result by the requested contour fields.
+
+    Args:
+        unit_results: result of :py:func:`extract_unit_results`
+        fields: any of ``CONTOUR_FIELDS``
+        tolerance: simplification tolerance of the contours, see :py:func:`helpers.coordinate_arrays`
+    """
+    resolved = {k: v for k, v in unit_results.items() if k != 'geometry'}
+    geometry = unit_results.get('geometry')
+    if geometry is None:
+        return resolved
+
+    if 'in_profile_contour' in fields:
+        resolved['in_profile_contour'] = extract_profile_contour(decode_geometry(geometry['in_profile']), tolerance)
+    if 'out_profile_contour' in fields:
+        resolved['out_profile_contour'] = extract_profile_contour(decode_geometry(geometry['out_profile']), tolerance)
+    if 'roll_contour' in fields:
+        resolved['roll_contour'] = combine_roll_pass_contour(
+            geometry['roll_info'], decode_geometry(geometry['roll']).geoms, tolerance
+        )
+
+    return resolved
+
+
+def select_contours(results: Dict[str, Any], fields=(), tolerance: float = 0) -> Dict[str, Any]:
+    """Copy of the results with the contour fields given resolved for all units and all stored geometry removed."""
+    return dict(results, passes=[resolve_contours(p, fields, tolerance) for p in results['passes']])
+
+
+def _observed_solve(unit: Unit, in_profile):
+    start = time.perf_counter()
+    out_profile = type(unit).solve(unit, in_profile)
+    if unit._solve_timer is not None:
+        unit._solve_timer(unit._sequence_index, time.perf_counter() - start)
+    if unit._solve_observer is not None:
+        unit._solve_observer(unit._sequence_index, unit)
+    return out_profile
+
+
+def observe_unit_solves(
+        sequence: PassSequence,
+        observer: Optional[Callable[[int, Unit], None]],
+        first_index: int = 0,
+        timer: Optional[Callable[[int, float], None]] = None
+):
+    """
+    Call ``observer(index, unit)`` each time a unit of the sequence has finished solving.
+
+    The wrapper is bound to the unit instances, so it survives the deep copies made by the
+    forward and backward velocity solvers. The observer is therefore called for those
+    intermediate solutions as well, it should be a plain function and not a bound method.
+    The same holds for ``timer``, which is called with the index and the duration of each solve.
+    """
+    for i, unit in enumerate(sequence, start=first_index):
+        unit._sequence_index = i
+        unit._solve_observer = observer
+        unit._solve_timer = timer
+        unit.solve = MethodType(_observed_solve, unit)
+
+
+def create_unit(unit: Dict[str, Any]) -> Optional[Unit]:
+    unit_type = unit.get('type')
+    if unit_type == 'TwoRollPass':
+        return create_roll_pass(unit)
+    elif unit_type == 'ThreeRollPass':
+        return create_roll_pass(unit)
+    elif unit_type == 'Transport':
+        return create_transport(unit)
+    elif unit_type == 'CoolingPipe':
+        return create_cooling_pipe(unit)
+    return None
+
+
 def run_pyroll_simulation(
         units: List[Dict[str, Any]],
         in_profile_data: Dict[str, Any],
         solve_method: str = "solve",
-        solve_params: Union[Dict, Any] = None
+        solve_params: Union[Dict, Any] = None,
+        on_unit_solved: Optional[Callable[[int, Unit], None]] = None,
+        use_snapshots: bool = True,
+        emit: Optional[Callable[[Dict[str, Any]], None]] = None,
+        progress_only: bool = False
 ):
+    """
+    Build and solve the pass sequence and extract the results of all units.
+
+    Args:
+        units: unit definitions as sent by the frontend
+        in_profile_data: definition of the initial profile
+        solve_method: one of "solve", "solve_forward" and "solve_backward"
+        solve_params: parameters of the solve method as attributes or dictionary
+        on_unit_solved: called with index and unit each time a unit has finished solving
+        use_snapshots: whether to restart from the longest already solved prefix of the sequence
+        emit: if given, called with ``{"type": "unit", "data": unit_results}`` as soon as a unit of the
+            final solution is first solved, including reused units right at the beginning; the solver iterates
+            over the sequence until it converges, so each solved unit is emitted again with its final results
+            once the solve is done
+        progress_only: emit ``{"type": "progress", "index": index, "units": count}`` instead, only when a unit
+            is first solved and without extracting the results of the unit
+
+    Returns:
+        the results as built by :py:func:`extract_results` and a ``timings`` entry with the durations
+        of the stages and of the unit solves in seconds
+    """
     try:
-        sequence_list = []
-        for unit in units:
-            unit_type = unit.get('type')
-            if unit_type == 'TwoRollPass':
-                sequence_list.append(create_roll_pass(unit))
-            elif unit_type == 'ThreeRollPass':
-                sequence_list.append(create_roll_pass(unit))
-            elif unit_type == 'Transport':
-                sequence_list.append(create_transport(unit))
-            elif unit_type == 'CoolingPipe':
-                sequence_list.append(create_cooling_pipe(unit))
-        sequence = PassSequence(sequence_list)
-
-        print("in_profile_data:", in_profile_data)  # ← Hier
-        initial_profile = create_initial_profile(in_profile_data)
-
-        if solve_method == "solve":
-            sequence.solve(in_profile=initial_profile)
-
-
-        elif solve_method == "solve_forward":
-            if not solve_params or not hasattr(solve_params, 'in_velocity'):
-                raise ValueError("Method requires incoming profile velocity.")
-
-            in_velocity = solve_params.in_velocity
-            sequence.solve_velocities_forward(in_profile=initial_profile,
-                                              initial_speed=in_velocity)
-
-        elif solve_method == "solve_backward":
-            if not solve_params or not hasattr(solve_params, 'out_cross_section') or not hasattr(solve_params,
-                                                                                                 'out_velocity'):
-                raise ValueError("Method requires final profile cross-section area and velocity.")
-
-            out_cross_section = solve_params.out_cross_section
-            out_velocity = solve_params.out_velocity
-            sequence.solve_velocities_backward(in_profile=initial_profile,
-                                               final_cross_section_area=out_cross_section,
-                                               final_speed=out_velocity
-                                               )
+        timer = StageTimer()
+
+        if isinstance(solve_params, dict):
+            solve_params = SimpleNamespace(**solve_params)
+
+        units = [unit for unit in units if unit.get('type') in UNIT_TYPES]
+
+        # only the standard solution keeps units independent of their successors,
+        # the velocity solvers couple all roll passes of the sequence
+        use_snapshots = use_snapshots and solve_method == "solve"
+        with timer.span("restore_snapshots"):
+            keys = prefix_keys(in_profile_data, units) if use_snapshots else []
+            reused, initial_profile, previous_passes = \
+                prefix_snapshots.restore(keys) if use_snapshots else (0, None, [])
+
+        with timer.span("create_units"):
+            sequence = PassSequence([create_unit(unit) for unit in units[reused:]])
+
+            if initial_profile is None:
+                initial_profile = create_initial_profile(in_profile_data)
+
+        def record_unit(index: int, seconds: float):
+            timer.record_unit(index, seconds)
+
+        if emit is not None:
+            def progress(index: int) -> Dict[str, Any]:
+                return {"type": "progress", "index": index, "units": len(units)}
+
+            for index, unit_results in enumerate(previous_passes):
+                emit(progress(index) if progress_only else {"type": "unit", "data": unit_results})
+
+            emitted = set()
+
+            def observer(index: int, unit: Unit):
+                if on_unit_solved is not None:
+                    on_unit_solved(index, unit)
+
+                # the velocity solvers work on copies first, only the units of this sequence hold the final state
+                if index not in emitted and unit is sequence[index - reused]:
+                    emitted.add(index)
+                    if progress_only:
+                        emit(progress(index))
+                    else:
+                        emit({"type": "unit", "data": extract_unit_results(index, unit)})
+
+            observe_unit_solves(sequence, observer, first_index=reused, timer=record_unit)
 
         else:
-            raise ValueError(f"Unknown solve method: {solve_method}")
+            observe_unit_solves(sequence, on_unit_solved, first_index=reused, timer=record_unit)
+
+        with timer.span("solve"):
+            if solve_method == "solve":
+                if len(sequence) > 0:
+                    sequence.solve(in_profile=initial_profile)
+
+            elif solve_method == "solve_forward":
+                if not solve_params or not hasattr(solve_params, 'in_velocity'):
+                    raise ValueError("Method requires incoming profile velocity.")
+
+                in_velocity = solve_params.in_velocity
+                sequence.solve_velocities_forward(in_profile=initial_profile,
+                                                  initial_speed=in_velocity)
+
+            elif solve_method == "solve_backward":
+                if not solve_params or not hasattr(solve_params, 'out_cross_section') or not hasattr(solve_params,
+                                                                                                     'out_velocity'):
+                    raise ValueError("Method requires final profile cross-section area and velocity.")
+
+                out_cross_section = solve_params.out_cross_section
+                out_velocity = solve_params.out_velocity
+                sequence.solve_velocities_backward(in_profile=initial_profile,
+                                                   final_cross_section_area=out_cross_section,
+                                                   final_speed=out_velocity
+                                                   )
+
+            else:
+                raise ValueError(f"Unknown solve method: {solve_method}")
+
+        def on_extracted(index: int, unit: Unit, unit_results: Dict[str, Any]):
+            if index < len(keys):
+                prefix_snapshots.put(keys[index], unit, unit_results)
+            # the first solution of a unit was emitted already, later iterations of the solver have refined it
+            if emit is not None and not progress_only:
+                emit({"type": "unit", "data": unit_results})
 
-        results = extract_results(sequence)
+        # snapshots copy what they need, each unit is released as soon as it is done with
+        with timer.span("extract_results"):
+            results = extract_results(sequence, previous_passes, on_extracted=on_extracted, release=True)
+        del sequence, initial_profile
 
+        # not part of the result itself, taken off by the caller before caching
+        results['timings'] = dict(timer.report(units), reused_units=reused)
         return results
 
     except Exception as e:
@@ -1,9 +1,80 @@
-from typing import Dict, Any
+import logging
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from pyroll.core import RollPass, Roll, ThreeRollPass
-from .helpers import create_groove
+from . import settings
+from .helpers import create_groove, combine_roll_pass_contour, _freeze
+
+logger = logging.getLogger(__name__)
+
+
+def roll_pass_contour_key(pass_data: Dict[str, Any]) -> tuple:
+    """Everything the contour of a roll pass depends on, in hashable form."""
+    pass_type = pass_data.get('type')
+    groove_params = pass_data.get('groove') or {}
+
+    return (
+        pass_type,
+        pass_data.get('grooveType'),
+        _freeze({k: v for k, v in groove_params.items() if v is not None}),
+        _freeze(pass_data.get('orientation')),
+        pass_data.get('inscribed_circle_diameter') if pass_type == 'ThreeRollPass' else pass_data.get('gap'),
+        pass_data.get('tolerance') or 0,
+    )
 
 
 def roll_pass_contour(pass_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Contour lines of a roll pass, memoized by :py:func:`roll_pass_contour_key`."""
+    try:
+        key = roll_pass_contour_key(pass_data)
+        hash(key)
+    except TypeError:
+        # unhashable parameter values, nothing sensible to cache
+        return _roll_pass_contour(pass_data)
+
+    try:
+        return _cached_roll_pass_contour(key)
+    except Exception as e:
+        logger.exception("Roll pass contour failed")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+def roll_pass_contours(rows: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Contours of all roll passes of a pass design table, None for rows not being roll passes."""
+    return [
+        roll_pass_contour(row) if row.get('type') in ('TwoRollPass', 'ThreeRollPass') else None
+        for row in rows
+    ]
+
+
+def contour_cache_stats() -> Dict[str, Any]:
+    info = _cached_roll_pass_contour.cache_info()
+    return {"entries": info.currsize, "max_entries": info.maxsize, "hits": info.hits, "misses": info.misses}
+
+
+@lru_cache(maxsize=settings.CONTOUR_CACHE_SIZE)
+def _cached_roll_pass_contour(key: tuple) -> Dict[str, Any]:
+    pass_type, groove_type, groove_params, orientation, size, tolerance = key
+    pass_data = {
+        'type': pass_type,
+        'grooveType': groove_type,
+        'groove': dict(groove_params),
+        'orientation': orientation,
+        'inscribed_circle_diameter' if pass_type == 'ThreeRollPass' else 'gap': size,
+        'tolerance': tolerance,
+    }
+
+    result = _roll_pass_contour(pass_data)
+    if not result["success"]:
+        # failures are not memoized, lru_cache skips calls raising an exception
+        raise ValueError(result["error"])
+    return result
+
+
+def _roll_pass_contour(pass_data: Dict[str, Any]) -> Dict[str, Any]:
     try:
         groove_type = pass_data.get('grooveType')
         groove_params = pass_data.get('groove', {})
@@ -15,7 +86,6 @@ def roll_pass_contour(pass_data: Dict[str, Any]) -> Dict[str, Any]:
 
         if pass_type == 'ThreeRollPass':
             inscribed_circle_diameter = pass_data.get('inscribed_circle_diameter')
-            print(pass_data)
             roll_pass = ThreeRollPass(
                 orientation=orientation,
                 roll=Roll(
@@ -44,56 +114,32 @@ def roll_pass_contour(pass_data: Dict[str, Any]) -> Dict[str, Any]:
             return {"success": False, "error": "Groove has no contour_line"}
 
         contours = roll_pass.technologically_orientated_contour_lines.geoms
+        tolerance = pass_data.get('tolerance') or 0
 
         if pass_type == 'ThreeRollPass':
-            contour_data = []
-            for i, contour in enumerate(contours):
-                x_coords = [p[0] for p in contour.coords]
-                y_coords = [p[1] for p in contour.coords]
-                contour_data.append({
-                    "x": x_coords,
-                    "y": y_coords
-                })
-
-            return {
+            info = {
                 "success": True,
                 "pass_type": "ThreeRollPass",
-                "contours": contour_data,
                 "inscribed_circle_diameter": inscribed_circle_diameter,
-                "groove_type": groove_type,
-                "usable_width": float(groove.usable_width) if hasattr(groove, 'usable_width') else None,
-                "depth": float(groove.depth) if hasattr(groove, 'depth') else None
             }
         else:
-            upper_contour = contours[0]
-            upper_x = [p[0] for p in upper_contour.coords]
-            upper_y = [p[1] for p in upper_contour.coords]
-
-            lower_contour = contours[1]
-            lower_x = [p[0] for p in lower_contour.coords]
-            lower_y = [p[1] for p in lower_contour.coords]
-
-            return {
+            info = {
                 "success": True,
                 "pass_type": "TwoRollPass",
-                "upper": {
-                    "x": upper_x,
-                    "y": upper_y
-                },
-                "lower": {
-                    "x": lower_x,
-                    "y": lower_y
-                },
                 "gap": gap,
-                "groove_type": groove_type,
-                "usable_width": float(groove.usable_width) if hasattr(groove, 'usable_width') else None,
-                "depth": float(groove.depth) if hasattr(groove, 'depth') else None
             }
 
+        info.update({
+            "groove_type": groove_type,
+            "usable_width": float(groove.usable_width) if hasattr(groove, 'usable_width') else None,
+            "depth": float(groove.depth) if hasattr(groove, 'depth') else None
+        })
+
+        return combine_roll_pass_contour(info, contours, tolerance)
+
     except Exception as e:
-        import traceback
+        logger.exception("Roll pass contour failed")
         return {
             "success": False,
-            "error": str(e),
-            "traceback": traceback.format_exc()
+            "error": str(e)
         }
@@ -0,0 +1,328 @@
+"""
+Typed models of the pass design table and the initial profile.
+
+The requests keep carrying plain dictionaries, so the rest of the backend, the cache keys and the prefix
+snapshots are unchanged. The models validate them up front: :py:data:`PassDesignUnit` and
+:py:data:`InProfileData` check each dictionary against the model of its unit type or profile shape and
+yield the dictionary again, with values coerced, but without defaults added.
+Rows of types not in :py:data:`constants.UNIT_TYPES` are passed through unchecked, as they are ignored by the
+simulation anyway.
+"""
+
+from typing import Annotated, Any, ClassVar, Dict, List, Literal, Optional, Tuple, Type, Union
+
+from pydantic import AfterValidator, BaseModel, ConfigDict, Discriminator, Field, PlainSerializer, Tag, \
+    TypeAdapter, ValidationInfo, field_validator, model_validator
+
+from .constants import UNIT_TYPES
+
+Length = Annotated[float, Field(ge=0)]
+PositiveLength = Annotated[float, Field(gt=0)]
+Angle = Annotated[float, Field(gt=0)]
+
+ORIENTATIONS = ("horizontal", "h", "vertical", "v", "y", "antiy", "ay")
+"""Orientations of roll passes understood by pyroll, case-insensitive, besides angles in degrees."""
+
+
+class GrooveParameters(BaseModel):
+    """
+    Base of the parameters of a groove type.
+
+    Parameters set to ``None`` count as not given, as for :py:func:`helpers.create_groove`.
+    ``choices`` lists groups of optional parameters of which exactly the given count must be given.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    choices: ClassVar[Tuple[Tuple[Tuple[str, ...], int], ...]] = ()
+
+    pad_angle: float = Field(0, description="Angle between z-axis and roll face padding in degrees")
+
+    @model_validator(mode="after")
+    def check_choices(self):
+        for names, count in self.choices:
+            given = [n for n in names if getattr(self, n) is not None]
+            if len(given) != count:
+                raise ValueError(
+                    f"Exactly {count} of {', '.join(names)} must be given, got {len(given)}"
+                    + (f" ({', '.join(given)})" if given else "")
+                )
+        return self
+
+
+class BoxGrooveParameters(GrooveParameters):
+    r1: Length
+    r2: Length
+    depth: PositiveLength
+    ground_width: Optional[Length] = None
+    even_ground_width: Optional[Length] = None
+    usable_width: Optional[PositiveLength] = None
+    flank_angle: Optional[Angle] = None
+
+
+class ConstrictedBoxGrooveParameters(BoxGrooveParameters):
+    r4: Length
+    indent: Length
+
+
+class SwedishOvalGrooveParameters(BoxGrooveParameters):
+    pass
+
+
+class ConstrictedSwedishOvalGrooveParameters(ConstrictedBoxGrooveParameters):
+    pass
+
+
+class DiamondGrooveParameters(GrooveParameters):
+    choices = ((("usable_width", "tip_depth", "tip_angle"), 2),)
+
+    r1: Length
+    r2: Length
+    usable_width: Optional[PositiveLength] = None
+    tip_depth: Optional[PositiveLength] = None
+    tip_angle: Optional[Angle] = None
+
+
+class SquareGrooveParameters(DiamondGrooveParameters):
+    pass
+
+
+class GothicGrooveParameters(GrooveParameters):
+    r1: Length
+    r2: Length
+    r3: Length
+    depth: PositiveLength
+    usable_width: PositiveLength
+
+
+class CircularOvalGrooveParameters(GrooveParameters):
+    choices = ((("r2", "depth", "usable_width"), 2),)
+
+    r1: Length
+    r2: Optional[Length] = None
+    depth: Optional[PositiveLength] = None
+    usable_width: Optional[PositiveLength] = None
+
+
+class RoundGrooveParameters(CircularOvalGrooveParameters):
+    pass
+
+
+class ConstrictedCircularOvalGrooveParameters(GrooveParameters):
+    r1: Length
+    r2: Length
+    r3: Length
+    r4: Length
+    depth: PositiveLength
+    usable_width: PositiveLength
+    indent: Length
+    even_ground_width: Length = 0
+
+
+class FlatOvalGrooveParameters(GrooveParameters):
+    choices = ((("usable_width", "even_ground_width"), 1),)
+
+    r1: Length
+    r2: Length
+    depth: PositiveLength
+    usable_width: Optional[PositiveLength] = None
+    even_ground_width: Optional[Length] = None
+
+
+class Oval3RadiiGrooveParameters(GrooveParameters):
+    r1: Length
+    r2: Length
+    r3: Length
+    depth: PositiveLength
+    usable_width: PositiveLength
+
+
+class UpsetOvalGrooveParameters(Oval3RadiiGrooveParameters):
+    pass
+
+
+class Oval3RadiiFlankedGrooveParameters(Oval3RadiiGrooveParameters):
+    flank_angle: Optional[Angle] = None
+    flank_width: Optional[Length] = None
+    flank_height: Optional[Length] = None
+    flank_length: Optional[Length] = None
+
+
+class FalseRoundGrooveParameters(CircularOvalGrooveParameters):
+    flank_angle: Optional[Angle] = None
+    flank_width: Optional[Length] = None
+    flank_height: Optional[Length] = None
+    flank_length: Optional[Length] = None
+
+
+class FlatGrooveParameters(GrooveParameters):
+    usable_width: PositiveLength
+    r1: Length = 0
+
+
+GROOVE_TYPES: Dict[str, Type[GrooveParameters]] = {
+    "BoxGroove": BoxGrooveParameters,
+    "ConstrictedBoxGroove": ConstrictedBoxGrooveParameters,
+    "DiamondGroove": DiamondGrooveParameters,
+    "GothicGroove": GothicGrooveParameters,
+    "SquareGroove": SquareGrooveParameters,
+    "CircularOvalGroove": CircularOvalGrooveParameters,
+    "ConstrictedCircularOvalGroove": ConstrictedCircularOvalGrooveParameters,
+    "ConstrictedSwedishOvalGroove": ConstrictedSwedishOvalGrooveParameters,
+    "FlatOvalGroove": FlatOvalGrooveParameters,
+    "Oval3RadiiGroove": Oval3RadiiGrooveParameters,
+    "Oval3RadiiFlankedGroove": Oval3RadiiFlankedGrooveParameters,
+    "SwedishOvalGroove": SwedishOvalGrooveParameters,
+    "UpsetOvalGroove": UpsetOvalGrooveParameters,
+    "RoundGroove": RoundGrooveParameters,
+    "FalseRoundGroove": FalseRoundGrooveParameters,
+    "FlatGroove": FlatGrooveParameters,
+}
+"""Parameter models of the groove types offered by the pass design table."""
+
+GrooveType = Literal[tuple(GROOVE_TYPES)]
+
+
+class _Unit(BaseModel):
+    # the frontend sends bookkeeping fields like the row id along
+    model_config = ConfigDict(extra="allow")
+
+    label: str = ""
+
+
+class _RollPassUnit(_Unit):
+    grooveType: GrooveType
+    groove: Dict[str, Any] = Field(..., description="Parameters of the groove type, see /api/schema")
+    nominal_radius: PositiveLength
+    velocityDefineBy: str = Field("velocity", description="'velocity', else velocityValue is the rotational frequency")
+    velocityValue: float = Field(..., gt=0, description="Roll velocity or rotational frequency")
+    coulomb_friction_coefficient: Optional[float] = Field(None, ge=0)
+    orientation: Optional[Union[float, str]] = Field(
+        None, description="Angle in degrees or one of " + ", ".join(ORIENTATIONS)
+    )
+
+    @field_validator("groove")
+    @classmethod
+    def check_groove(cls, groove: Dict[str, Any], info: ValidationInfo) -> Dict[str, Any]:
+        groove_type = info.data.get("grooveType")
+        if groove_type is None:
+            # the groove type itself is invalid and reported already
+            return groove
+        return GROOVE_TYPES[groove_type].model_validate(groove).model_dump(exclude_unset=True)
+
+    @field_validator("orientation")
+    @classmethod
+    def check_orientation(cls, orientation):
+        if isinstance(orientation, str) and orientation.lower() not in ORIENTATIONS:
+            raise ValueError(
+                f"Unknown orientation '{orientation}', must be an angle or one of {', '.join(ORIENTATIONS)}"
+            )
+        return orientation
+
+
+class TwoRollPassUnit(_RollPassUnit):
+    type: Literal["TwoRollPass"]
+    gap: Length
+
+
+class ThreeRollPassUnit(_RollPassUnit):
+    type: Literal["ThreeRollPass"]
+    inscribed_circle_diameter: PositiveLength
+
+
+class TransportUnit(_Unit):
+    type: Literal["Transport"]
+    transportDefineBy: Literal["length", "duration"] = "length"
+    transportValue: float = Field(..., ge=0, description="Length or duration depending on transportDefineBy")
+    environment_temperature: PositiveLength = 293.15
+    heat_transfer_coefficient: Length = 15
+
+
+class CoolingPipeUnit(_Unit):
+    type: Literal["CoolingPipe"]
+    coolingDefineBy: Literal["length", "duration"] = "length"
+    coolingValue: Length = Field(0, description="Length or duration depending on coolingDefineBy")
+    inner_radius: PositiveLength
+    coolant_temperature: PositiveLength
+    coolant_volume_flux: Length
+
+
+def _unit_tag(unit: Any) -> str:
+    unit_type = unit.get("type") if isinstance(unit, dict) else getattr(unit, "type", None)
+    return unit_type if unit_type in UNIT_TYPES else "other"
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    return value.model_dump(exclude_unset=True) if isinstance(value, BaseModel) else value
+
+
+PassDesignUnit = Annotated[
+    Union[
+        Annotated[TwoRollPassUnit, Tag("TwoRollPass")],
+        Annotated[ThreeRollPassUnit, Tag("ThreeRollPass")],
+        Annotated[TransportUnit, Tag("Transport")],
+        Annotated[CoolingPipeUnit, Tag("CoolingPipe")],
+        Annotated[Dict[str, Any], Tag("other")],
+    ],
+    Discriminator(_unit_tag),
+    AfterValidator(_as_dict),
+    PlainSerializer(_as_dict, return_type=Dict[str, Any]),
+]
+"""A row of the pass design table, validated by the model of its type and kept as dictionary."""
+
+
+class _InProfile(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    temperature: PositiveLength
+    strain: Length = 0
+    material: Optional[Union[str, List[str]]] = None
+    density: Optional[PositiveLength] = None
+    specific_heat_capacity: Optional[PositiveLength] = None
+    thermal_conductivity: Optional[PositiveLength] = None
+    materialType: Optional[str] = None
+    flowStressParams: Optional[Dict[str, float]] = Field(
+        None, description="Coefficients of the Freiberg flow stress model, used if materialType is set"
+    )
+
+
+class RoundInProfile(_InProfile):
+    shape: Literal["round"]
+    diameter: PositiveLength
+
+
+class SquareInProfile(_InProfile):
+    shape: Literal["square"]
+    side: PositiveLength
+    corner_radius: Length = 0
+
+
+class BoxInProfile(_InProfile):
+    shape: Literal["box"]
+    height: PositiveLength
+    width: PositiveLength
+    corner_radius: Length = 0
+
+
+class HexagonInProfile(_InProfile):
+    shape: Literal["hexagon"]
+    side: PositiveLength
+    corner_radius: Length = 0
+
+
+InProfileData = Annotated[
+    Union[RoundInProfile, SquareInProfile, BoxInProfile, HexagonInProfile],
+    Field(discriminator="shape"),
+    AfterValidator(_as_dict),
+    PlainSerializer(_as_dict, return_type=Dict[str, Any]),
+]
+"""The initial profile, validated by the model of its shape and kept as dictionary."""
+
+
+def json_schemas() -> Dict[str, Any]:
+    """JSON schemas of a pass design row, of the initial profile and of the parameters of each groove type."""
+    return {
+        "pass_design_unit": TypeAdapter(PassDesignUnit).json_schema(),
+        "in_profile": TypeAdapter(InProfileData).json_schema(),
+        "grooves": {name: model.model_json_schema() for name, model in GROOVE_TYPES.items()},
+    }
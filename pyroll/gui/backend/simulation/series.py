@@ -0,0 +1,154 @@
+"""
+Plot series of simulation results, reduced to a point budget on the server.
+
+The scalar series are reduced with the Largest-Triangle-Three-Buckets algorithm, which keeps the visual shape
+of a line, contours are simplified with the Douglas-Peucker algorithm at the smallest tolerance meeting the budget.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import shapely
+
+from .encoding import decimate_line, is_line
+
+SERIES = {
+    "temperature": "out_profile_temperature",
+    "strain": "out_profile_strain",
+    "cross_section_area": "out_profile_cross_section_area",
+    "width": "out_profile_width",
+    "height": "out_profile_height",
+    "roll_force": "roll_force",
+    "roll_torque": "roll_torque",
+    "filling_ratio": "filling_ratio",
+}
+"""Plot series offered and the unit result values they show."""
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of at most ``max_points`` points of a line chosen by Largest-Triangle-Three-Buckets.
+
+    The first and the last point are always kept, each bucket of the points between contributes the point
+    spanning the largest triangle with the point kept before and the mean of the next bucket.
+
+    Args:
+        x: ascending x values
+        y: y values
+        max_points: point budget, at least 3
+    """
+    size = len(x)
+    if size <= max_points:
+        return np.arange(size)
+
+    edges = np.linspace(1, size - 1, max_points - 1).astype(int)
+    indices = np.empty(max_points, dtype=int)
+    indices[0] = 0
+    indices[-1] = size - 1
+
+    a = 0
+    for i in range(max_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        following = slice(stop, edges[i + 2]) if i + 2 < len(edges) else slice(size - 1, size)
+        mean_x, mean_y = x[following].mean(), y[following].mean()
+
+        areas = np.abs((x[a] - mean_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (mean_y - y[a]))
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+
+def _value(value: Any) -> Optional[float]:
+    # some values are reported per roll, the plots show the first
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def result_series(results: Dict[str, Any], names: List[str], max_points: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Series of unit result values along the pass sequence, ready to plot.
+
+    Units are placed at ``x = index + 0.5``, values of the profile state start with the initial profile at
+    ``x = -0.5``. Units without the value, like the roll force of transports, are left out.
+
+    Args:
+        results: simulation results with the ``passes`` list
+        names: keys of ``SERIES``
+        max_points: point budget of each series, see :py:func:`lttb`
+
+    Returns:
+        per name the ``x`` and ``y`` values and the ``pass`` numbers and ``labels`` of the points kept,
+        and the count of ``points`` before reduction
+    """
+    passes = results["passes"]
+    series = {}
+
+    for name in names:
+        key = SERIES[name]
+        points = []
+
+        if key.startswith("out_profile_") and passes:
+            initial = _value(passes[0].get("in_profile_" + key[len("out_profile_"):]))
+            if initial is not None:
+                points.append((-0.5, initial, 0, "Input"))
+
+        for i, unit in enumerate(passes):
+            value = _value(unit.get(key))
+            if value is not None:
+                points.append((i + 0.5, value, unit.get("pass"), unit.get("label")))
+
+        x = np.array([p[0] for p in points], dtype=float)
+        y = np.array([p[1] for p in points], dtype=float)
+        kept = [points[i] for i in lttb(x, y, max_points)]
+        series[name] = {
+            "x": [p[0] for p in kept],
+            "y": [p[1] for p in kept],
+            "pass": [p[2] for p in kept],
+            "labels": [p[3] for p in kept],
+            "points": len(points),
+        }
+
+    return series
+
+
+def _simplify(x: List[float], y: List[float], max_points: int) -> Dict[str, List[float]]:
+    line = shapely.LineString(np.column_stack([x, y]))
+
+    def count(tolerance: float) -> int:
+        return shapely.get_num_coordinates(shapely.simplify(line, tolerance, preserve_topology=False))
+
+    # double the tolerance until the budget is met, then narrow it down to the smallest one meeting it
+    low, high = 0.0, line.length * 1e-4
+    while count(high) > max_points and high < line.length:
+        low, high = high, high * 2
+    for _ in range(8):
+        middle = (low + high) / 2
+        if count(middle) > max_points:
+            low = middle
+        else:
+            high = middle
+
+    coords = shapely.get_coordinates(shapely.simplify(line, high, preserve_topology=False))
+    xs, ys = coords[:, 0], coords[:, 1]
+    if len(xs) > max_points:
+        xs, ys = decimate_line(xs, ys, -(-(len(xs) - 1) // (max_points - 1)))
+    return {"x": xs.tolist(), "y": ys.tolist()}
+
+
+def reduce_lines(value: Any, max_points: int) -> Any:
+    """
+    Copy of a contour field of the results with each line of more than ``max_points`` points simplified.
+
+    Lines are found at any depth of nested dictionaries and lists, as in the roll contours.
+    """
+    if is_line(value):
+        if len(value["x"]) <= max_points:
+            return value
+        return _simplify(value["x"], value["y"], max_points)
+    if isinstance(value, dict):
+        return {k: reduce_lines(v, max_points) for k, v in value.items()}
+    if isinstance(value, list):
+        return [reduce_lines(v, max_points) for v in value]
+    return value
@@ -0,0 +1,112 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Environment variable {name} must be an integer, got '{value}'")
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Environment variable {name} must be a number, got '{value}'")
+
+
+def _default_data_dir() -> str:
+    if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        return os.path.join(os.environ["LOCALAPPDATA"], "pyroll-gui")
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "pyroll-gui")
+
+
+HOST = os.environ.get("PYROLL_GUI_HOST") or "0.0.0.0"
+"""Address the server listens on when started by serve.py."""
+
+PORT = _env_int("PYROLL_GUI_PORT", 8000)
+"""Port the server listens on when started by serve.py."""
+
+HTTP_WORKERS = _env_int("PYROLL_GUI_HTTP_WORKERS", 1)
+"""Number of server processes started by serve.py, each with its own pool of simulation workers."""
+
+SIMULATION_WORKERS = _env_int("PYROLL_GUI_WORKERS", os.cpu_count() or 1)
+"""Number of worker processes solving pass sequences."""
+
+SIMULATION_QUEUE_DEPTH = _env_int("PYROLL_GUI_QUEUE_DEPTH", 2 * SIMULATION_WORKERS)
+"""Number of simulations allowed to wait for a free worker before requests are rejected."""
+
+SIMULATION_RETRY_AFTER = _env_int("PYROLL_GUI_RETRY_AFTER", 5)
+"""Seconds a client is asked to wait before retrying when all workers and queue slots are taken."""
+
+DISCONNECT_POLL_INTERVAL = _env_float("PYROLL_GUI_DISCONNECT_POLL_INTERVAL", 0.5)
+"""Seconds between checks whether the client of a running simulation is still connected."""
+
+MAX_UNITS = _env_int("PYROLL_GUI_MAX_UNITS", 1000)
+"""Maximum count of units in the pass design of a single simulation request."""
+
+MAX_REQUEST_MEMORY = _env_int("PYROLL_GUI_MAX_REQUEST_MEMORY", 2 * 1024 ** 3)
+"""Bytes of memory a worker may allocate for a single simulation before it is stopped, 0 for no limit (Linux only)."""
+
+RESULT_CACHE_MAX_BYTES = _env_int("PYROLL_GUI_CACHE_MAX_BYTES", 256 * 1024 ** 2)
+"""Memory limit of the in-process simulation result cache."""
+
+RESULT_CACHE_DB = os.environ.get("PYROLL_GUI_CACHE_DB") or None
+"""Path of a SQLite database used as second cache tier, disabled if not set."""
+
+RESULT_CACHE_DB_MAX_BYTES = _env_int("PYROLL_GUI_CACHE_DB_MAX_BYTES", 4 * 1024 ** 3)
+"""Size limit of the results stored in the cache database."""
+
+SNAPSHOT_MAX_ENTRIES = _env_int("PYROLL_GUI_SNAPSHOT_MAX_ENTRIES", 2000)
+"""Count of solved unit states each worker keeps for restarting changed sequences from the first modified unit."""
+
+BATCH_MAX_VARIANTS = _env_int("PYROLL_GUI_BATCH_MAX_VARIANTS", 1000)
+"""Maximum count of variants of a single batch simulation request."""
+
+OPTIMIZATION_MAX_EVALUATIONS = _env_int("PYROLL_GUI_OPTIMIZATION_MAX_EVALUATIONS", 1000)
+"""Maximum count of candidate designs a single optimization request may simulate."""
+
+MONTE_CARLO_MAX_SAMPLES = _env_int("PYROLL_GUI_MONTE_CARLO_MAX_SAMPLES", 10000)
+"""Maximum count of samples of a single Monte-Carlo request."""
+
+CONTOUR_CACHE_SIZE = _env_int("PYROLL_GUI_CONTOUR_CACHE_SIZE", 1024)
+"""Count of roll pass contours kept for the pass design plots."""
+
+TEMPLATE_CACHE_SIZE = _env_int("PYROLL_GUI_TEMPLATE_CACHE_SIZE", 512)
+"""Count of distinct groove and initial profile definitions each process keeps constructed for reuse."""
+
+EXPORT_DIR = os.environ.get("PYROLL_GUI_EXPORT_DIR") or None
+"""Directory of the Parquet and Arrow files written by /api/export until sent, the system default if not set."""
+
+PROFILING_ENABLED = _env_int("PYROLL_GUI_PROFILING", 0) != 0
+"""Whether simulations may be run under the profiler on request, never enable this on a public server."""
+
+DATA_DIR = os.environ.get("PYROLL_GUI_DATA_DIR") or _default_data_dir()
+"""Directory of the databases not configured explicitly, by default in the data directory of the user."""
+
+JOB_DB = os.environ.get("PYROLL_GUI_JOB_DB") or os.path.join(DATA_DIR, "pyroll-gui-jobs.sqlite3")
+"""Path of the SQLite database holding the jobs of /api/jobs, ':memory:' to not keep them across restarts."""
+
+LIBRARY_DB = os.environ.get("PYROLL_GUI_LIBRARY_DB") or os.path.join(DATA_DIR, "pyroll-gui-library.sqlite3")
+"""Path of the SQLite database holding the designs of /api/library."""
+
+JOB_CONCURRENCY = _env_int("PYROLL_GUI_JOB_CONCURRENCY", SIMULATION_WORKERS)
+"""Number of jobs of /api/jobs solved at the same time."""
+
+JOB_RETENTION = _env_float("PYROLL_GUI_JOB_RETENTION", 7 * 24 * 3600)
+"""Seconds finished jobs are kept after their last update, 0 to keep them forever."""
+
+PRELOAD = _env_int("PYROLL_GUI_PRELOAD", 1) != 0
+"""Whether the server imports pyroll in the background right after startup instead of on the first request."""
+
+WORKER_WARMUP = _env_int("PYROLL_GUI_WORKER_WARMUP", 1) != 0
+"""Whether each worker solves a tiny reference sequence before taking jobs."""
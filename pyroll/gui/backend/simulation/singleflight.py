@@ -0,0 +1,88 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+IsDisconnected = Callable[[], Awaitable[bool]]
+
+
+class _Flight:
+    def __init__(self):
+        self.task: Optional[asyncio.Future] = None
+        self.waiters: List[Optional[IsDisconnected]] = []
+
+    async def all_disconnected(self) -> bool:
+        # a waiter without a disconnect check counts as always connected
+        for is_disconnected in list(self.waiters):
+            if is_disconnected is None or not await is_disconnected():
+                return False
+        return True
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one computation.
+
+    The first caller of :py:meth:`run` for a key starts the computation, callers arriving while it is in flight
+    await the same result or exception. The computation is cancelled only when all its callers are gone.
+    Results are shared and must not be modified by the callers.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def run(
+            self,
+            key: str,
+            fn: Callable[[IsDisconnected], Awaitable[Any]],
+            is_disconnected: Optional[IsDisconnected] = None
+    ) -> Any:
+        """
+        Await ``fn(all_disconnected)`` or join the running computation for ``key``.
+
+        Args:
+            key: identity of the computation
+            fn: coroutine function started if nothing for ``key`` is in flight; it gets a coroutine function
+                that returns True once every caller waiting for the result has disconnected
+            is_disconnected: disconnect check of this caller
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.ensure_future(fn(flight.all_disconnected))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters.append(is_disconnected)
+        try:
+            return await asyncio.shield(flight.task)
+
+        except asyncio.CancelledError:
+            flight.waiters.remove(is_disconnected)
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+            raise
+
+        finally:
+            if is_disconnected in flight.waiters and flight.task.done():
+                flight.waiters.remove(is_disconnected)
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+        # mark the exception as retrieved, the callers may all be gone
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": self.in_flight, "started": self.started, "coalesced": self.coalesced}
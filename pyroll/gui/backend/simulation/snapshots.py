@@ -0,0 +1,95 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from pyroll.core import Profile, Unit
+
+from .cache import canonical_hash
+
+
+def prefix_keys(in_profile_data: Dict[str, Any], units: List[Dict[str, Any]]) -> List[str]:
+    """
+    Chained hashes of the sequence prefixes.
+
+    Element ``i`` identifies the in-profile together with ``units[:i + 1]``,
+    so two requests share element ``i`` exactly if their first ``i + 1`` units are identical.
+    """
+    keys = []
+    key = canonical_hash(in_profile_data)
+
+    for unit in units:
+        key = hashlib.sha256((key + canonical_hash(unit)).encode("utf-8")).hexdigest()
+        keys.append(key)
+
+    return keys
+
+
+def copy_profile(profile: Profile) -> Profile:
+    """Detached copy of a profile holding its explicit and computed values, as passed between units."""
+    return Profile(**{k: v for k, v in profile.__dict__.items() if not k.startswith("_")})
+
+
+class PrefixSnapshotCache:
+    """
+    LRU store of the outgoing profile and the extracted results of solved units, keyed by :py:func:`prefix_keys`.
+
+    Lives inside a worker process, the profiles are pyroll objects and are not serialized.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Profile, Dict[str, Any]]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.reused_units = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, key: str, unit: Unit, unit_results: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+
+        self._entries[key] = (copy_profile(unit.out_profile), unit_results)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def restore(self, keys: List[str]) -> Tuple[int, Optional[Profile], List[Dict[str, Any]]]:
+        """
+        Find the longest cached prefix of ``keys``.
+
+        Returns:
+            count of reusable units, the outgoing profile of the last one (None if nothing is reusable)
+            and the results of the reusable units
+        """
+        count = 0
+        for key in keys:
+            if key not in self._entries:
+                break
+            count += 1
+
+        if count == 0:
+            self.misses += 1
+            return 0, None, []
+
+        self.hits += 1
+        self.reused_units += count
+
+        unit_results = []
+        for key in keys[:count]:
+            self._entries.move_to_end(key)
+            unit_results.append(dict(self._entries[key][1]))
+
+        return count, copy_profile(self._entries[keys[count - 1]][0]), unit_results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reused_units": self.reused_units,
+        }
@@ -0,0 +1,208 @@
+import copy
+import itertools
+import math
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .executor import SimulationCancelledError, SimulationLimitError
+
+_PATH_TOKEN = re.compile(r"\.?([A-Za-z_][A-Za-z0-9_]*)|\[(\d+)\]")
+
+
+def parse_path(path: str) -> List[Any]:
+    """Split a path like ``passDesignData[3].groove.r1`` into ``["passDesignData", 3, "groove", "r1"]``."""
+    tokens = []
+    position = 0
+
+    while position < len(path):
+        match = _PATH_TOKEN.match(path, position)
+        if match is None or (position == 0 and match.group(0).startswith(".")):
+            raise ValueError(f"Invalid parameter path '{path}' at position {position}")
+
+        name, index = match.groups()
+        tokens.append(int(index) if index is not None else name)
+        position = match.end()
+
+    if not tokens or tokens[0] not in ("inProfile", "passDesignData"):
+        raise ValueError(f"Parameter path '{path}' must start with 'inProfile' or 'passDesignData'")
+
+    return tokens
+
+
+def apply_override(request: Dict[str, Any], path: str, value: Any):
+    """Set the value at ``path`` in the request dictionary in place, creating missing dictionary levels."""
+    tokens = parse_path(path)
+    target = request
+
+    for token, next_token in zip(tokens[:-1], tokens[1:]):
+        if isinstance(token, int):
+            if not isinstance(target, list) or token >= len(target):
+                raise ValueError(f"Index {token} in parameter path '{path}' is out of range")
+            target = target[token]
+        else:
+            if target.get(token) is None:
+                target[token] = {} if not isinstance(next_token, int) else []
+            target = target[token]
+
+    last = tokens[-1]
+    if isinstance(last, int):
+        if not isinstance(target, list) or last >= len(target):
+            raise ValueError(f"Index {last} in parameter path '{path}' is out of range")
+    target[last] = value
+
+
+def lookup_value(request: Dict[str, Any], path: str) -> Any:
+    """Value at ``path`` in the request dictionary, None if it is not set."""
+    target = request
+    for token in parse_path(path):
+        if isinstance(token, int):
+            if not isinstance(target, list) or token >= len(target):
+                raise ValueError(f"Index {token} in parameter path '{path}' is out of range")
+            target = target[token]
+        else:
+            if not isinstance(target, dict):
+                return None
+            target = target.get(token)
+        if target is None:
+            return None
+    return target
+
+
+def path_position(path: str) -> Tuple[int, str]:
+    """Sort key placing in-profile parameters first and unit parameters in sequence order."""
+    tokens = parse_path(path)
+    if tokens[0] == "inProfile":
+        return -1, path
+    return (tokens[1] if len(tokens) > 1 and isinstance(tokens[1], int) else -1), path
+
+
+def parameter_values(values: Optional[List[Any]], start: Optional[float], stop: Optional[float],
+                     step: Optional[float], max_count: Optional[int] = None) -> List[Any]:
+    """
+    Explicit values or the inclusive range ``start..stop`` with the given step.
+
+    Raises:
+        ValueError: if the range is empty or has more than ``max_count`` values
+    """
+    if values is not None:
+        return list(values)
+
+    if start is None or stop is None or not step:
+        raise ValueError("Either 'values' or 'start', 'stop' and a non-zero 'step' must be given")
+
+    # counted before anything is allocated, a tiny step would make a huge range
+    steps = math.floor((stop - start) / step + 1e-9)
+    if not math.isfinite(steps) or steps < 0:
+        raise ValueError(f"Range from {start} to {stop} with step {step} is empty")
+    count = int(steps) + 1
+    if max_count is not None and count > max_count:
+        raise ValueError(f"Range from {start} to {stop} with step {step} has {count} values, the limit is {max_count}")
+
+    return [float(v) for v in start + step * np.arange(count)]
+
+
+def variant_count(grid: Dict[str, List[Any]], variants: Optional[List[Dict[str, Any]]] = None) -> int:
+    """Count of the requests :py:func:`expand_variants` builds, without building them."""
+    return len(variants or [{}]) * math.prod(len(values) for values in grid.values())
+
+
+def expand_variants(
+        base: Dict[str, Any],
+        grid: Dict[str, List[Any]],
+        variants: Optional[List[Dict[str, Any]]] = None
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Build the requests of a parameter study one after another, check :py:func:`variant_count` first.
+
+    Every explicit variant is combined with every point of the cartesian product of ``grid``.
+    Grid parameters are ordered along the sequence, so neighbouring variants share the longest possible
+    unchanged prefix of units.
+
+    Yields:
+        tuples of the applied overrides and the resulting request dictionary
+    """
+    paths = sorted(grid.keys(), key=path_position)
+
+    for variant in (variants or [{}]):
+        for point in itertools.product(*(grid[p] for p in paths)):
+            overrides = dict(variant)
+            overrides.update(zip(paths, point))
+
+            request = copy.deepcopy(base)
+            for path, value in overrides.items():
+                apply_override(request, path, value)
+
+            yield overrides, request
+
+
+def run_simulation_batch(
+        requests: List[Dict[str, Any]],
+        on_unit_solved: Optional[Callable] = None,
+        use_snapshots: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Solve several requests one after another in the current process, so consecutive requests
+    can restart from the solved prefix of their predecessor.
+
+    Without ``use_snapshots``, prefixes are neither restored nor stored, for one-off requests that would only
+    displace the snapshots of others.
+
+    Returns:
+        per request a dictionary with either ``result`` or ``error`` set
+    """
+    # imported here, so the server process can plan batches without loading pyroll
+    from .pyroll_basic_runner import run_pyroll_simulation
+
+    outcomes = []
+    for request in requests:
+        try:
+            result = run_pyroll_simulation(
+                units=request["passDesignData"],
+                in_profile_data=request["inProfile"],
+                solve_method=request.get("solve_method", "solve"),
+                solve_params=request.get("solve_params"),
+                on_unit_solved=on_unit_solved,
+                use_snapshots=use_snapshots,
+            )
+            outcomes.append({"result": result, "error": None})
+        except Exception as e:
+            # the memory of a variant over the limit is not freed in time for the next one, stop the whole batch
+            if isinstance(e, (SimulationCancelledError, SimulationLimitError)) or \
+                    isinstance(e.__cause__, (SimulationCancelledError, SimulationLimitError)):
+                raise
+            outcomes.append({"result": None, "error": str(e)})
+
+    return outcomes
+
+
+def results_table(overrides: List[Dict[str, Any]], results: List[Optional[Dict[str, Any]]]) -> Dict[str, List[Any]]:
+    """
+    Columnar table of the scalar unit results of all variants, one row per variant and unit.
+
+    Contours and other nested values are left out, columns missing for a unit type are filled with None.
+    """
+    parameter_columns = []
+    for o in overrides:
+        for path in o:
+            if path not in parameter_columns:
+                parameter_columns.append(path)
+
+    rows = []
+    result_columns = []
+    for variant, (o, result) in enumerate(zip(overrides, results)):
+        if result is None:
+            continue
+
+        for unit_results in result["passes"]:
+            row = {k: v for k, v in unit_results.items() if not isinstance(v, (dict, list))}
+            for k in row:
+                if k not in result_columns:
+                    result_columns.append(k)
+            row["variant"] = variant
+            row.update({path: o.get(path) for path in parameter_columns})
+            rows.append(row)
+
+    columns = ["variant"] + parameter_columns + [c for c in result_columns if c not in parameter_columns]
+    return {c: [row.get(c) for row in rows] for c in columns}
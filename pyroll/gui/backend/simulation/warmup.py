@@ -0,0 +1,39 @@
+from typing import Any, Dict, List
+
+from .constants import CONTOUR_FIELDS
+
+REFERENCE_IN_PROFILE: Dict[str, Any] = {
+    "shape": "round", "diameter": 0.03, "temperature": 1473.15, "strain": 0,
+    "material": ["C45", "steel"], "density": 7.5e3, "specific_heat_capacity": 690, "thermal_conductivity": 23,
+    "materialType": "freiberg",
+    "flowStressParams": {"a": 3268.49e6, "m1": -0.00267855, "m2": 0.34446, "m3": 0, "m4": 0.000551814,
+                         "m5": -0.00132042, "m6": 0, "m7": 0.0166334, "m8": 0.000149907,
+                         "m9": 0, "baseStrain": 0.1, "baseStrainRate": 0.1},
+}
+"""Initial profile of the warm-up sequence."""
+
+REFERENCE_UNITS: List[Dict[str, Any]] = [
+    {"type": "TwoRollPass", "label": "Oval", "orientation": "h", "grooveType": "CircularOvalGroove",
+     "groove": {"depth": 8e-3, "r1": 6e-3, "r2": 40e-3}, "nominal_radius": 160e-3,
+     "velocityValue": 1, "gap": 2e-3, "coulomb_friction_coefficient": 0.4},
+    {"type": "Transport", "label": "Transport", "transportValue": 1},
+]
+"""Units of the warm-up sequence, a single pass and a transport."""
+
+
+def warm_up():
+    """
+    Solve a tiny reference sequence and resolve its contours.
+
+    Runs the code paths of a simulation request once, so lazily built state of pyroll, its plugins,
+    NumPy and Shapely is initialized before the first real request arrives.
+    The prefix snapshots are not touched.
+    """
+    from .pyroll_basic_runner import run_pyroll_simulation, select_contours
+
+    result = run_pyroll_simulation(
+        units=REFERENCE_UNITS,
+        in_profile_data=REFERENCE_IN_PROFILE,
+        use_snapshots=False
+    )
+    select_contours(result, CONTOUR_FIELDS)
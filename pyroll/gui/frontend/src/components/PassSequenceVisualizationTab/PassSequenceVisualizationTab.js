@@ -1,10 +1,12 @@
-import React, {useState, useEffect} from 'react';
+import React, {useState, useEffect, useMemo} from 'react';
 import PassSequenceVisualizer from './PassSequenceVisualizer';
+import {getSimulationContours} from '../../utils/api';
 
 const PassSequenceVisualizationTab = ({passSequence, simulationResults}) => {
     const [selectedPassIndex, setSelectedPassIndex] = useState(0);
+    // contours of the passes of the current result shown so far, fetched one pass at a time
+    const [contours, setContours] = useState({resultId: null, passes: {}});
 
- ;
     const availablePasses = passSequence?.filter(item =>
         item.type === 'TwoRollPass' || item.type === 'ThreeRollPass'
     ) || [];
@@ -15,6 +17,39 @@ const PassSequenceVisualizationTab = ({passSequence, simulationResults}) => {
         }
     }, [availablePasses.length, selectedPassIndex]);
 
+    const currentPass = availablePasses[selectedPassIndex];
+    const currentResults = simulationResults?.passes?.find(p => currentPass && p.label === currentPass.label && (p.type === 'TwoRollPass' || p.type === 'ThreeRollPass'));
+    const resultId = simulationResults?.result_id;
+    const passNumber = currentResults?.pass;
+
+    const passContours = contours.resultId === resultId ? contours.passes[passNumber] : undefined;
+
+    useEffect(() => {
+        if (!resultId || passNumber === undefined || passContours) return;
+
+        let cancelled = false;
+        getSimulationContours(resultId, [passNumber]).then(data => {
+            if (cancelled) return;
+            if (!data.success) {
+                console.error('Contours of pass', passNumber, 'not available:', data.error);
+                return;
+            }
+            setContours(previous => ({
+                resultId,
+                passes: {...(previous.resultId === resultId ? previous.passes : {}), [passNumber]: data.passes[0] || {}}
+            }));
+        });
+
+        return () => {
+            cancelled = true;
+        };
+    }, [resultId, passNumber, passContours]);
+
+    const shownResults = useMemo(
+        () => currentResults && {...currentResults, ...passContours},
+        [currentResults, passContours]
+    );
+
     if (!simulationResults) {
         return (
             <div className="pass-sequence-visualization-tab">
@@ -37,9 +72,6 @@ const PassSequenceVisualizationTab = ({passSequence, simulationResults}) => {
         );
     }
 
-    const currentPass = availablePasses[selectedPassIndex];
-    const currentResults = simulationResults?.passes?.find(p => p.label === currentPass.label && (p.type === 'TwoRollPass' || p.type === 'ThreeRollPass'));
-
     console.log('currentPass:', currentPass);
     console.log('currentResults:', currentResults);
 
@@ -64,7 +96,7 @@ const PassSequenceVisualizationTab = ({passSequence, simulationResults}) => {
 
             <PassSequenceVisualizer
                 pass={currentPass}
-                results={currentResults}
+                results={shownResults}
             />
         </div>
     );
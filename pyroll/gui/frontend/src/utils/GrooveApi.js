@@ -18,4 +18,4 @@ export const getRollPassContour = async (passData) => {
     console.error('RollPass Contour API Error:', error);
     return { success: false, error: error.message };
   }
-};
\ No newline at end of file
+};
@@ -5,6 +5,7 @@ export const runSimulation = async (inProfile, passDesignData, solveConfig = nul
     const preparedProfile = prepareProfileForBackend(inProfile);
     const preparedUnits = prepareUnitsForBackend(passDesignData);
 
+    // contours are fetched per pass when shown, see getSimulationContours
     const requestBody = {
       inProfile: preparedProfile,
       passDesignData: preparedUnits
@@ -35,7 +36,7 @@ export const runSimulation = async (inProfile, passDesignData, solveConfig = nul
     if (result.success) {
       return {
         success: true,
-        data: result.pyroll_results
+        data: {...result.pyroll_results, result_id: result.result_id}
       };
     } else {
       return {
@@ -51,4 +52,25 @@ export const runSimulation = async (inProfile, passDesignData, solveConfig = nul
       error: error.message || 'Network error - Check if backend is running'
     };
   }
-};
\ No newline at end of file
+};
+export const getSimulationContours = async (resultId, passes) => {
+  try {
+    const response = await fetch('http://localhost:8000/api/simulate/contours', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({result_id: resultId, passes})
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error('Simulation Contours API Error:', error);
+    return { success: false, error: error.message };
+  }
+};
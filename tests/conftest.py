@@ -0,0 +1,11 @@
+from typing import Any, Dict
+
+import pytest
+
+from pyroll.gui.backend.benchmark import load_fixtures
+
+
+@pytest.fixture
+def designs() -> Dict[str, Dict[str, Any]]:
+    """The pass designs of the benchmark fixtures as request bodies of ``/api/simulate``, by name."""
+    return load_fixtures()
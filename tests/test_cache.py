@@ -0,0 +1,103 @@
+from pyroll.gui.backend.simulation.cache import ResultCache, canonical_hash, encode_result, simulation_key
+
+UNITS = [{"type": "RollPass", "grooveType": "RoundGroove", "gap": 2, "groove": {"r1": 1, "r2": 11}}]
+IN_PROFILE = {"shape": "round", "diameter": 30, "temperature": 1200}
+
+
+def result(size: int):
+    return {"units": 1, "passes": [{"pass": 1, "data": "x" * size}]}
+
+
+def test_canonical_hash_ignores_number_notation():
+    assert canonical_hash({"gap": 1}) == canonical_hash({"gap": 1.0})
+    assert canonical_hash([1, 2.5]) == canonical_hash([1.0, 2.5])
+    assert canonical_hash({"gap": 1}) != canonical_hash({"gap": 1.5})
+
+
+def test_canonical_hash_ignores_key_order():
+    assert canonical_hash({"a": 1, "b": {"c": 2, "d": 3}}) == canonical_hash({"b": {"d": 3, "c": 2}, "a": 1})
+
+
+def test_simulation_key():
+    key = simulation_key(UNITS, IN_PROFILE, "solve", None)
+
+    reordered = [{"groove": {"r2": 11.0, "r1": 1.0}, "gap": 2.0, "grooveType": "RoundGroove", "type": "RollPass"}]
+    assert simulation_key(reordered, dict(reversed(IN_PROFILE.items())), "solve", {}) == key
+    assert simulation_key(UNITS, IN_PROFILE, "solve_forward", {"in_velocity": 1}) != key
+    assert simulation_key(UNITS, {**IN_PROFILE, "temperature": 1100}, "solve", None) != key
+
+
+def test_memory_lru_eviction():
+    size = len(encode_result(result(100)))
+    cache = ResultCache(max_bytes=2 * size)
+
+    cache.put("a", result(100))
+    cache.put("b", result(100))
+    assert cache.get("a") == result(100)  # b is the least recently used now
+    cache.put("c", result(100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == result(100)
+    assert cache.get("c") == result(100)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 2 * size
+    assert stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+
+
+def test_oversized_result_not_held_in_memory():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", result(100))
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_tier_shared(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    first = ResultCache(max_bytes=1024 ** 2, db_path=db_path)
+    second = ResultCache(max_bytes=1024 ** 2, db_path=db_path)
+
+    first.put("a", result(100))
+
+    assert second.get("a") == result(100)
+    assert second.stats()["disk_hits"] == 1
+    assert second.get("a") == result(100)
+    assert second.stats()["hits"] == 1
+
+
+def test_disk_eviction(tmp_path):
+    size = len(encode_result(result(100)))
+    cache = ResultCache(max_bytes=1, db_path=str(tmp_path / "cache.sqlite3"), db_max_bytes=2 * size)
+
+    cache.put("a", result(100))
+    cache.put("b", result(100))
+    cache.get("a")  # b is the least recently used now
+    cache.put("c", result(100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == result(100)
+    assert cache.get("c") == result(100)
+
+    stats = cache.stats()
+    assert stats["disk_entries"] == 2
+    assert stats["disk_bytes"] == 2 * size
+
+
+def test_disk_totals_follow_replace_and_clear(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(max_bytes=1, db_path=db_path)
+
+    cache.put("a", result(100))
+    cache.put("a", result(300))
+    stats = cache.stats()
+    assert (stats["disk_entries"], stats["disk_bytes"]) == (1, len(encode_result(result(300))))
+
+    # a second process opening the database sees the same totals
+    assert ResultCache(max_bytes=1, db_path=db_path).stats()["disk_bytes"] == stats["disk_bytes"]
+
+    cache.clear()
+    stats = cache.stats()
+    assert (stats["disk_entries"], stats["disk_bytes"]) == (0, 0)
@@ -0,0 +1,105 @@
+import base64
+
+import numpy as np
+import pytest
+
+from pyroll.gui.backend.simulation.encoding import decimate_line, encode_columnar, is_line
+
+
+def unpack(group, dtype):
+    x = np.frombuffer(base64.b64decode(group["x"]), dtype=dtype)
+    y = np.frombuffer(base64.b64decode(group["y"]), dtype=dtype)
+    lines, start = [], 0
+    for count in group["counts"]:
+        lines.append((x[start:start + count], y[start:start + count]))
+        start += count
+    assert start == len(x) == len(y)
+    return lines
+
+
+def line(points, offset=0.0):
+    angles = np.linspace(0, 2 * np.pi, points)
+    return {"x": (np.cos(angles) / 3 + offset).tolist(), "y": (np.sin(angles) / 7).tolist()}
+
+
+RESULTS = {
+    "success": True,
+    "units": 3,
+    "passes": [
+        {"pass": 1, "label": "Oval", "roll_force": [1e5, 1e5], "roll": {"contour_lines": [line(9), line(5, 1)]},
+         "out_profile_contour": line(7)},
+        {"pass": 2, "label": "Transport", "duration": 2.5},
+        {"pass": 3, "label": "Round", "roll": {"contour_lines": [line(4, 2)], "nominal_radius": 0.16},
+         "out_profile_contour": line(3)},
+    ],
+}
+
+
+@pytest.mark.parametrize("dtype, numpy_dtype, tolerance", [("float32", "<f4", 1e-7), ("float64", "<f8", 0)])
+def test_roundtrip(dtype, numpy_dtype, tolerance):
+    encoded = encode_columnar(RESULTS, dtype=dtype)
+
+    assert encoded["dtype"] == dtype
+    assert encoded["byteorder"] == "little"
+    assert encoded["units"] == 3
+    roll = encoded["lines"]["roll.contour_lines"]
+    assert roll["unit_lines"] == [2, 0, 1]
+    assert roll["counts"] == [9, 5, 4]
+    assert encoded["lines"]["out_profile_contour"]["unit_lines"] == [1, 0, 1]
+
+    expected = [RESULTS["passes"][0]["roll"]["contour_lines"][0], RESULTS["passes"][0]["roll"]["contour_lines"][1],
+                RESULTS["passes"][2]["roll"]["contour_lines"][0]]
+    for (x, y), original in zip(unpack(roll, numpy_dtype), expected):
+        np.testing.assert_allclose(x, original["x"], rtol=tolerance, atol=tolerance)
+        np.testing.assert_allclose(y, original["y"], rtol=tolerance, atol=tolerance)
+
+
+def test_columns():
+    columns = encode_columnar(RESULTS)["columns"]
+
+    assert columns["pass"] == [1, 2, 3]
+    assert columns["label"] == ["Oval", "Transport", "Round"]
+    assert columns["roll_force"] == [[1e5, 1e5], None, None]
+    assert columns["duration"] == [None, 2.5, None]
+    assert columns["roll.nominal_radius"] == [None, None, 0.16]
+
+
+def test_decimate_and_round():
+    encoded = encode_columnar(RESULTS, dtype="float64", decimate=3, precision=2)
+    roll = encoded["lines"]["roll.contour_lines"]
+
+    # every third point and the last one
+    assert roll["counts"] == [4, 3, 2]
+    (x, y), *_ = unpack(roll, "<f8")
+    original = RESULTS["passes"][0]["roll"]["contour_lines"][0]
+    np.testing.assert_array_equal(x, np.round(np.asarray(original["x"])[[0, 3, 6, 8]], 2))
+    np.testing.assert_array_equal(y, np.round(np.asarray(original["y"])[[0, 3, 6, 8]], 2))
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError, match="float16"):
+        encode_columnar(RESULTS, dtype="float16")
+    with pytest.raises(ValueError, match="decimate"):
+        encode_columnar(RESULTS, decimate=0)
+
+
+@pytest.mark.parametrize("size, decimate, kept", [
+    (10, 3, [0, 3, 6, 9]),
+    (11, 3, [0, 3, 6, 9, 10]),
+    (5, 1, [0, 1, 2, 3, 4]),
+    (5, 10, [0, 4]),
+    (2, 5, [0, 1]),
+])
+def test_decimate_line(size, decimate, kept):
+    x = np.arange(size, dtype=float)
+
+    decimated_x, decimated_y = decimate_line(x, -x, decimate)
+
+    assert decimated_x.tolist() == kept
+    assert decimated_y.tolist() == [-k for k in kept]
+
+
+def test_is_line():
+    assert is_line({"x": [], "y": []})
+    assert not is_line({"x": [1.0]})
+    assert not is_line({"x": (1.0,), "y": (2.0,)})
+    assert not is_line([1.0, 2.0])
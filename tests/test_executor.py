@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+
+from pyroll.gui.backend.simulation.executor import ExecutorSaturatedError, SimulationCancelledError, SimulationExecutor
+
+
+def solve_units(units, seconds=0.0, on_unit_solved=None, emit=None):
+    for i in range(units):
+        time.sleep(seconds)
+        if emit is not None:
+            emit({"index": i})
+        on_unit_solved(i, None)
+    return units
+
+
+@pytest.fixture
+def executor():
+    created = []
+
+    def create(**kwargs):
+        executor = SimulationExecutor(**{"max_workers": 1, "queue_depth": 1, "poll_interval": 0.02, **kwargs})
+        created.append(executor)
+        return executor
+
+    yield create
+    for executor in created:
+        executor.shutdown()
+
+
+def test_result_and_events(executor):
+    pool = executor()
+    events = []
+
+    result = asyncio.run(pool.run(solve_units, on_event=events.append, units=5))
+
+    assert result == 5
+    assert events == [{"index": i} for i in range(5)]
+    assert pool.available == pool.capacity
+
+
+def test_saturated(executor):
+    pool = executor(retry_after=7)
+
+    async def run():
+        jobs = [asyncio.ensure_future(pool.run(solve_units, units=5, seconds=0.05)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.available == 0
+        with pytest.raises(ExecutorSaturatedError) as e:
+            await pool.run(solve_units, units=1)
+        results = await asyncio.gather(*jobs)
+        return e.value, results
+
+    error, results = asyncio.run(run())
+
+    assert error.retry_after == 7
+    assert results == [5, 5]
+    assert pool.available == pool.capacity
+
+
+def test_cancel_on_disconnect(executor):
+    pool = executor()
+
+    async def run():
+        disconnected = time.monotonic() + 0.3
+
+        async def is_disconnected():
+            return time.monotonic() > disconnected
+
+        start = time.monotonic()
+        with pytest.raises(SimulationCancelledError):
+            await pool.run(solve_units, is_disconnected=is_disconnected, units=1000, seconds=0.01)
+        # the worker stops at the next unit and releases the slot
+        while pool.available < pool.capacity:
+            await asyncio.sleep(0.01)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) < 5
+
+    # the slot of the cancelled job is usable again
+    assert asyncio.run(pool.run(solve_units, units=2)) == 2
+
+
+def test_cancel_task(executor):
+    pool = executor()
+
+    async def run():
+        job = asyncio.ensure_future(pool.run(solve_units, units=1000, seconds=0.01))
+        await asyncio.sleep(0.3)
+        job.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await job
+        while pool.available < pool.capacity:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+
+import pytest
+
+from pyroll.gui.backend.simulation.export import MissingResultError, ResultTable, csv_chunks, write_columnar
+
+RESULTS = {
+    "a": {"passes": [
+        {"label": "Box", "roll_force": [1.5e5, 1.5e5], "out_profile_width": 0.09, "pass": 1, "geometry": {}},
+        {"label": "Transport", "out_profile_width": 0.09, "duration": 2},
+    ]},
+    "b": {"passes": [
+        {"label": "Oval, wide", "roll_force": [2e5, 2e5], "out_profile_width": 0.08, "pass": 1, "duration": 2.5},
+    ]},
+}
+
+
+def load(result_id):
+    return RESULTS.get(result_id)
+
+
+def read_csv(table, rows_per_chunk=500):
+    text = b"".join(csv_chunks(table, rows_per_chunk)).decode("utf-8")
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+@pytest.mark.parametrize("rows_per_chunk", [1, 2, 500])
+def test_csv_roundtrip(rows_per_chunk):
+    table = ResultTable(["a", None, "b"], load, names=["first", "failed", "second"])
+    table.scan()
+
+    rows = read_csv(table, rows_per_chunk)
+
+    assert list(rows[0]) == ["variant", "design", "label", "roll_force", "out_profile_width", "pass", "duration"]
+    assert [(row["variant"], row["design"], row["label"]) for row in rows] == [
+        ("0", "first", "Box"), ("0", "first", "Transport"), ("2", "second", "Oval, wide")
+    ]
+    assert json.loads(rows[0]["roll_force"]) == [1.5e5, 1.5e5]
+    assert rows[1]["roll_force"] == ""
+    assert [float(row["out_profile_width"]) for row in rows] == [0.09, 0.09, 0.08]
+    assert table.rows == 3
+
+
+def test_column_kinds():
+    table = ResultTable(["a", "b"], load)
+    table.scan()
+
+    assert table.columns == {
+        "variant": "int", "label": "string", "roll_force": "string", "out_profile_width": "float", "pass": "int",
+        "duration": "float",
+    }
+
+
+def test_missing_results():
+    table = ResultTable(["a", "gone", "b"], load)
+
+    with pytest.raises(MissingResultError) as e:
+        table.scan()
+    assert e.value.result_ids == ["gone"]
+
+
+def test_write_columnar(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = ResultTable(["a", "b"], load)
+    table.scan()
+
+    write_columnar(table, str(tmp_path / "results.parquet"), "parquet", rows_per_group=2)
+    written = pq.read_table(str(tmp_path / "results.parquet")).to_pylist()
+
+    assert [row["label"] for row in written] == ["Box", "Transport", "Oval, wide"]
+    assert [row["duration"] for row in written] == [None, 2.0, 2.5]
@@ -0,0 +1,153 @@
+import json
+import xml.etree.ElementTree as ElementTree
+from xml.sax.saxutils import escape
+
+import pytest
+
+from pyroll.gui.backend.simulation.headless import (
+    Design, find_designs, parse_in_profile_xml, parse_pass_design_xml
+)
+
+METADATA = (
+    "  <Metadata>\n"
+    "    <Version>1.0</Version>\n"
+    "    <CreatedDate>2026-01-01T00:00:00.000Z</CreatedDate>\n"
+    "    <Application>PyRolL-Basic WebGUI</Application>\n"
+    "  </Metadata>\n"
+)
+
+
+def js_string(value) -> str:
+    # String() of JavaScript, lists are joined by commas
+    if isinstance(value, list):
+        return ",".join(js_string(v) for v in value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def text(value) -> str:
+    return escape(js_string(value), {'"': "&quot;", "'": "&apos;"})
+
+
+def pass_design_xml(rows) -> str:
+    """XML as written by PassDesignSaver.js."""
+    xml = '<?xml version="1.0" encoding="UTF-8"?>\n<PassDesign>\n' + METADATA + "  <Units>\n"
+    for index, row in enumerate(rows):
+        xml += f'    <Unit id="{row["id"]}">\n      <Index>{index}</Index>\n      <Type>{text(row["type"])}</Type>\n'
+        xml += "      <Parameters>\n"
+        for key, value in row.items():
+            if key not in ("id", "type", "grooveType", "groove") and value not in (None, ""):
+                xml += f'        <Parameter name="{text(key)}">{text(value)}</Parameter>\n'
+        xml += "      </Parameters>\n"
+        if row.get("grooveType"):
+            xml += f'      <GrooveType>{text(row["grooveType"])}</GrooveType>\n'
+        if row.get("groove"):
+            xml += "      <Groove>\n"
+            for key, value in row["groove"].items():
+                xml += f"        <{key}>{text(value)}</{key}>\n"
+            xml += "      </Groove>\n"
+        xml += "    </Unit>\n"
+    return xml + "  </Units>\n</PassDesign>"
+
+
+def in_profile_xml(profile) -> str:
+    """XML as written by InProfileSaver.js."""
+    xml = '<?xml version="1.0" encoding="UTF-8"?>\n<InProfile>\n' + METADATA
+    for key, tag in (("shape", "ProfileType"), ("temperature", "Temperature"), ("strain", "Strain"),
+                     ("material", "Material"), ("materialType", "MaterialType"), ("flow_stress", "FlowStress")):
+        if profile.get(key) not in (None, ""):
+            xml += f"  <{tag}>{text(profile[key])}</{tag}>\n"
+    if profile.get("flowStressParams"):
+        xml += "  <FlowStressParameters>\n"
+        for key, value in profile["flowStressParams"].items():
+            tag = {"a": "A", "baseStrain": "BaseStrain", "baseStrainRate": "BaseStrainRate"}.get(key, key.upper())
+            xml += f"    <{tag}>{text(value)}</{tag}>\n"
+        xml += "  </FlowStressParameters>\n"
+    for key, tag in (("density", "Density"), ("specific_heat_capacity", "SpecificHeatCapacity"),
+                     ("thermal_conductivity", "ThermalConductivity")):
+        if profile.get(key) not in (None, ""):
+            xml += f"  <{tag}>{text(profile[key])}</{tag}>\n"
+    geometry = [(k, profile[k]) for k in ("width", "height", "diameter", "corner_radius") if k in profile]
+    if geometry:
+        xml += "  <Geometry>\n"
+        for key, value in geometry:
+            tag = "".join(word.capitalize() for word in key.split("_"))
+            xml += f"    <{tag}>{text(value)}</{tag}>\n"
+        xml += "  </Geometry>\n"
+    return xml + "</InProfile>"
+
+
+@pytest.fixture
+def design(designs):
+    design = designs["bar_mill_short"]
+    rows = [{"id": i + 1, **row} for i, row in enumerate(design["passDesignData"])]
+    return design["inProfile"], rows
+
+
+def test_parse_pass_design(design):
+    _, rows = design
+
+    assert parse_pass_design_xml(ElementTree.fromstring(pass_design_xml(rows))) == rows
+
+
+def test_parse_in_profile(design):
+    profile, _ = design
+
+    parsed = parse_in_profile_xml(ElementTree.fromstring(in_profile_xml(profile)))
+
+    assert parsed == {**profile, "material": "C45,steel"}
+
+
+def test_parse_escaped_text():
+    rows = [{"id": 7, "type": "Transport", "label": "I => II & <cooling>", "transportValue": 2}]
+
+    assert parse_pass_design_xml(ElementTree.fromstring(pass_design_xml(rows))) == rows
+
+
+def test_parse_in_profile_defaults():
+    root = ElementTree.fromstring(in_profile_xml({"shape": "square", "temperature": 1200, "width": 0.05,
+                                                  "corner_radius": 0.003}))
+
+    assert parse_in_profile_xml(root) == {
+        "shape": "square", "temperature": 1200, "strain": 0, "width": 0.05, "corner_radius": 0.003
+    }
+
+
+def test_find_designs(tmp_path, design):
+    profile, rows = design
+    (tmp_path / "mill" / "nested").mkdir(parents=True)
+    (tmp_path / "mill" / "profile.xml").write_text(in_profile_xml(profile))
+    (tmp_path / "mill" / "passes.xml").write_text(pass_design_xml(rows))
+    (tmp_path / "mill" / "nested" / "orphan.xml").write_text(pass_design_xml(rows))
+    (tmp_path / "mill" / "nested" / "notes.txt").write_text("not a design")
+    (tmp_path / "request.json").write_text(json.dumps({"inProfile": profile, "passDesignData": rows}))
+    broken = {"inProfile": profile, "passDesignData": [{**rows[0], "gap": -1}]}
+    (tmp_path / "broken.json").write_text(json.dumps(broken))
+
+    found = list(find_designs([tmp_path]))
+
+    assert [d.name if isinstance(d, Design) else d["design"] for d in found] == [
+        str(tmp_path / "broken.json"),
+        str(tmp_path / "mill" / "nested" / "orphan.xml"),
+        str(tmp_path / "mill" / "passes.xml"),
+        str(tmp_path / "request.json"),
+    ]
+    broken, orphan, passes, request = found
+    assert "gap" in broken["error"]
+    assert "no in-profile" in orphan["error"]
+    assert passes.passDesignData == rows
+    assert passes.inProfile["material"] == "C45,steel"
+    assert request.inProfile == profile
+
+
+def test_find_designs_with_given_profile(tmp_path, design):
+    profile, rows = design
+    (tmp_path / "profile.xml").write_text(in_profile_xml(profile))
+    (tmp_path / "designs").mkdir()
+    (tmp_path / "designs" / "passes.xml").write_text(pass_design_xml(rows))
+
+    found, = find_designs([tmp_path / "designs"], in_profile=tmp_path / "profile.xml")
+
+    assert found.passDesignData == rows
+    assert found.inProfile["diameter"] == profile["diameter"]
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+from pyroll.gui.backend.simulation.jobs import (
+    CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobManager, JobStore
+)
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_adopt_unfinished(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+
+    own = store.create({}, 3)
+    orphaned = store.create({}, 3)
+    foreign = store.create({}, 3)
+    finished = store.create({}, 3)
+
+    store.update(own, status=RUNNING, units_solved=2)
+    store.update(orphaned, status=RUNNING, units_solved=1, owner=dead_pid())
+    # the parent of the test process is alive, so its jobs are left alone
+    store.update(foreign, status=RUNNING, units_solved=1, owner=os.getppid())
+    store.update(finished, status=SUCCEEDED, owner=dead_pid())
+
+    assert store.adopt_unfinished() == [own, orphaned]
+
+    for job_id in (own, orphaned):
+        job = store.get(job_id)
+        assert job["status"] == QUEUED
+        assert job["units_solved"] == 0
+    assert store.get(foreign)["status"] == RUNNING
+    assert store.get(finished)["status"] == SUCCEEDED
+
+    # another process sharing the store adopts nothing owned by this one while it is alive
+    other = JobStore(str(tmp_path / "jobs.sqlite3"))
+    other.owner = os.getppid()
+    assert other.adopt_unfinished() == [foreign]
+
+
+def test_job_lifecycle(tmp_path):
+    async def solve(request, on_unit_solved):
+        for _ in range(request["units"]):
+            on_unit_solved()
+        if request.get("fail"):
+            raise ValueError("Groove too deep.")
+        return "key", {"units": request["units"]}
+
+    async def run():
+        manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), solve, concurrency=2, progress_interval=0)
+        await manager.start()
+        succeeding = manager.submit({"units": 3}, 3)
+        failing = manager.submit({"units": 1, "fail": True}, 1)
+        while manager.store.get(succeeding)["status"] not in (SUCCEEDED, FAILED) or \
+                manager.store.get(failing)["status"] not in (SUCCEEDED, FAILED):
+            await asyncio.sleep(0.01)
+        await manager.shutdown()
+        return manager.store.get(succeeding), manager.store.get(failing)
+
+    succeeded, failed = asyncio.run(run())
+
+    assert succeeded["status"] == SUCCEEDED
+    assert succeeded["units_solved"] == 3
+    assert succeeded["result_id"] == "key"
+    assert succeeded["result"] == {"units": 3}
+    assert failed["status"] == FAILED
+    assert failed["error"] == "Groove too deep."
+
+
+def test_cancel_through_other_process(tmp_path):
+    stopped = []
+
+    async def solve(request, on_unit_solved):
+        try:
+            while True:
+                on_unit_solved()
+                await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            stopped.append(True)
+            raise
+
+    async def run():
+        manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), solve, concurrency=1, progress_interval=0)
+        await manager.start()
+        job_id = manager.submit({}, 10)
+        while manager.running == 0:
+            await asyncio.sleep(0.01)
+
+        # a request served by another process only reaches the shared store
+        JobStore(str(tmp_path / "jobs.sqlite3")).update(job_id, only_if=(QUEUED, RUNNING), status=CANCELLED)
+        for _ in range(100):
+            if manager.running == 0:
+                break
+            await asyncio.sleep(0.01)
+
+        running = manager.running
+        await manager.shutdown()
+        return running, manager.store.get(job_id)
+
+    running, job = asyncio.run(run())
+
+    assert running == 0
+    assert stopped
+    assert job["status"] == CANCELLED
+
+
+def test_store_waits_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    store.create({"units": 1}, 1)
+
+    async def solve(request, on_unit_solved):
+        on_unit_solved()
+        return "key", {"units": 1}
+
+    async def run():
+        # another process holds the database while this one starts
+        other = sqlite3.connect(path)
+        other.execute("BEGIN EXCLUSIVE")
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        asyncio.get_running_loop().call_later(0.3, other.rollback)
+        manager = JobManager(store, solve, concurrency=1, retention=3600)
+        await manager.start()
+        ticker.cancel()
+        await manager.shutdown()
+        other.close()
+        return ticks
+
+    assert len(asyncio.run(run())) > 10
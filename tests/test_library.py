@@ -0,0 +1,142 @@
+import types
+
+import pytest
+
+from pyroll.gui.backend.simulation import library
+from pyroll.gui.backend.simulation.library import DesignLibrary, design_grooves, design_materials
+
+
+def request(shape="round", material=["C45", "steel"], grooves=("RoundGroove",)):
+    return {
+        "inProfile": {"shape": shape, "diameter": 0.03, "temperature": 1473.15, "material": material},
+        "passDesignData": [{"type": "TwoRollPass", "grooveType": g} for g in grooves] + [{"type": "Transport"}],
+        "solve_method": "solve",
+    }
+
+
+def result(area):
+    return {"passes": [{"out_profile_cross_section_area": area * 2},
+                       {"out_profile_cross_section_area": area, "out_profile_width": 0.02, "out_profile_height": 0.01}]}
+
+
+@pytest.fixture
+def stored(tmp_path, monkeypatch):
+    # designs created one day apart, starting with day 1
+    clock = iter(range(86400, 100 * 86400, 86400))
+    monkeypatch.setattr(library, "time", types.SimpleNamespace(time=lambda: next(clock)))
+
+    store = DesignLibrary(str(tmp_path / "library.sqlite3"))
+    ids = {
+        "oval": store.save("Oval 100%", request(grooves=("CircularOvalGroove", "RoundGroove")), "k1", result(4e-4)),
+        "box": store.save("Box_1", request(shape="square", material=["S355"], grooves=("BoxGroove",)), "k2",
+                          result(9e-4), description="square start"),
+        "round": store.save("round 10", request(material="c45, Tool steel"), "k3", result(1e-4)),
+        "failed": store.save("broken", request(), "k4"),
+    }
+    yield store, ids
+    store.close()
+
+
+def names(page):
+    return [design["name"] for design in page[1]]
+
+
+def test_helpers():
+    assert design_materials({"material": "C45, steel ,"}) == ["C45", "steel"]
+    assert design_materials({"material": ["steel", "C45", "steel"]}) == ["C45", "steel"]
+    assert design_materials({}) == []
+    assert design_grooves([{"grooveType": "RoundGroove"}, {"type": "Transport"}, {"grooveType": "RoundGroove"}]) == \
+        ["RoundGroove"]
+
+
+def test_save_and_get(stored):
+    store, ids = stored
+
+    design = store.get(ids["box"])
+    assert design["name"] == "Box_1"
+    assert design["description"] == "square start"
+    assert design["shape"] == "square"
+    assert design["units"] == 2
+    assert design["solved"] is True
+    assert design["grooves"] == ["BoxGroove"]
+    assert design["materials"] == ["S355"]
+    assert (design["final_cross_section_area"], design["final_width"], design["final_height"]) == (9e-4, 0.02, 0.01)
+    assert design["request"] == request(shape="square", material=["S355"], grooves=("BoxGroove",))
+    assert design["result"] == result(9e-4)
+
+    assert "result" not in store.get(ids["box"], with_result=False)
+    failed = store.get(ids["failed"])
+    assert failed["solved"] is False
+    assert failed["result"] is None
+    assert failed["final_cross_section_area"] is None
+    assert store.get("unknown") is None
+
+
+def test_result_by_cache_key(stored):
+    store, _ = stored
+
+    assert store.result("k3") == result(1e-4)
+    assert store.result("k4") is None
+    assert store.result("unknown") is None
+
+
+def test_search_all_newest_first(stored):
+    store, _ = stored
+
+    assert store.search() == (4, store.search()[1])
+    assert names(store.search()) == ["broken", "round 10", "Box_1", "Oval 100%"]
+
+
+def test_search_filters(stored):
+    store, _ = stored
+
+    assert names(store.search(name="OVAL")) == ["Oval 100%"]
+    # wildcards of LIKE are matched literally
+    assert names(store.search(name="%")) == ["Oval 100%"]
+    assert names(store.search(name="_")) == ["Box_1"]
+    assert names(store.search(name="1_")) == []
+    assert names(store.search(groove_type="RoundGroove")) == ["broken", "round 10", "Oval 100%"]
+    assert names(store.search(groove_type="CircularOvalGroove")) == ["Oval 100%"]
+    assert names(store.search(material="C45")) == ["broken", "round 10", "Oval 100%"]
+    assert names(store.search(material="tool steel")) == ["round 10"]
+    assert names(store.search(shape="square")) == ["Box_1"]
+    assert names(store.search(min_cross_section_area=1e-4, max_cross_section_area=4e-4)) == \
+        ["round 10", "Oval 100%"]
+    assert names(store.search(created_after=2 * 86400, created_before=3 * 86400)) == ["round 10", "Box_1"]
+    # materials match whole names only
+    assert names(store.search(material="steel")) == ["broken", "Oval 100%"]
+    assert names(store.search(groove_type="RoundGroove", material="c45", max_cross_section_area=2e-4)) == \
+        ["round 10"]
+
+
+def test_search_pages(stored):
+    store, _ = stored
+
+    total, page = store.search(offset=1, limit=2)
+    assert total == 4
+    assert [design["name"] for design in page] == ["round 10", "Box_1"]
+    assert store.search(material="C45", offset=2, limit=2)[0] == 3
+    assert names(store.search(material="C45", offset=2, limit=2)) == ["Oval 100%"]
+    assert store.search(offset=10) == (4, [])
+
+
+def test_delete_cascades(stored):
+    store, ids = stored
+
+    assert store.delete(ids["oval"])
+    assert not store.delete(ids["oval"])
+    assert store.get(ids["oval"]) is None
+    assert names(store.search(groove_type="CircularOvalGroove")) == []
+    for table in ("design_grooves", "design_materials"):
+        assert store._db.execute(f"SELECT COUNT(*) FROM {table} WHERE design_id = ?", (ids["oval"],)).fetchone() == \
+            (0,)
+
+
+def test_shared_database(tmp_path):
+    first = DesignLibrary(str(tmp_path / "library.sqlite3"))
+    second = DesignLibrary(str(tmp_path / "library.sqlite3"))
+
+    design_id = first.save("shared", request(), "k", result(1e-4))
+
+    assert second.get(design_id)["name"] == "shared"
+    assert second.search(material="c45")[0] == 1
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from pyroll.gui.backend.simulation.executor import SimulationExecutor, SimulationLimitError
+
+
+def allocate_per_unit(units, size, on_unit_solved=None):
+    held = []
+    for i in range(units):
+        # filled, so the pages are resident
+        held.append(b"\1" * size)
+        on_unit_solved(i, None)
+    return len(held)
+
+
+@pytest.fixture
+def executor():
+    executor = SimulationExecutor(max_workers=1, queue_depth=0, poll_interval=0.02, memory_limit=8 * 1024 ** 2)
+    yield executor
+    executor.shutdown()
+
+
+def test_memory_limit(executor):
+    with pytest.raises(SimulationLimitError, match="after unit 2, .* 8 MiB"):
+        asyncio.run(executor.run(allocate_per_unit, units=10, size=6 * 1024 ** 2))
+
+    # the memory the worker holds before a job is not charged to it
+    assert asyncio.run(executor.run(allocate_per_unit, units=10, size=1024)) == 10
+
+
+def test_release_units(designs):
+    from pyroll.core import PassSequence
+    from pyroll.gui.backend.simulation.helpers import create_initial_profile
+    from pyroll.gui.backend.simulation.pyroll_basic_runner import create_unit, extract_results
+
+    design = designs["bar_mill_short"]
+    sequence = PassSequence([create_unit(unit) for unit in design["passDesignData"]])
+    sequence.solve(create_initial_profile(design["inProfile"]))
+    units = list(sequence)
+    # rolls and profiles reference their unit and each other
+    hosts = [vars(unit)[name] for unit in units for name in ("roll", "in_profile", "out_profile") if name in vars(unit)]
+    solved = []
+
+    results = extract_results(sequence, on_extracted=lambda i, unit, _: solved.append("out_profile" in vars(unit)),
+                              release=True)
+
+    assert len(results["passes"]) == len(units)
+    assert all(solved)
+    assert len(hosts) > 2 * len(units)
+    for unit in units:
+        assert "in_profile" not in vars(unit)
+        assert "out_profile" not in vars(unit)
+        assert vars(unit) == {}
+    for host in hosts:
+        assert vars(host) == {}
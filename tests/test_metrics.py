@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from pyroll.gui.backend.simulation.metrics import MetricsRegistry, RequestMetricsMiddleware, StageTimer
+
+
+def test_histogram_buckets():
+    registry = MetricsRegistry(prefix="pyroll_")
+    histogram = registry.histogram("solve_seconds", "Solve time.", ["stage"], buckets=(2, 1))
+
+    # the bounds are inclusive, a value on a bound is counted in its bucket
+    for value in (0.5, 1, 1.5, 3):
+        histogram.observe(value, stage="solve")
+    histogram.observe(2, stage="extract")
+
+    assert registry.render() == (
+        "# HELP pyroll_solve_seconds Solve time.\n"
+        "# TYPE pyroll_solve_seconds histogram\n"
+        'pyroll_solve_seconds_bucket{stage="extract",le="1.0"} 0\n'
+        'pyroll_solve_seconds_bucket{stage="extract",le="2.0"} 1\n'
+        'pyroll_solve_seconds_bucket{stage="extract",le="+Inf"} 1\n'
+        'pyroll_solve_seconds_sum{stage="extract"} 2.0\n'
+        'pyroll_solve_seconds_count{stage="extract"} 1\n'
+        'pyroll_solve_seconds_bucket{stage="solve",le="1.0"} 2\n'
+        'pyroll_solve_seconds_bucket{stage="solve",le="2.0"} 3\n'
+        'pyroll_solve_seconds_bucket{stage="solve",le="+Inf"} 4\n'
+        'pyroll_solve_seconds_sum{stage="solve"} 6.0\n'
+        'pyroll_solve_seconds_count{stage="solve"} 4\n'
+    )
+
+
+def test_counter_and_gauge():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.", ["route"])
+    registry.gauge("cache_hits_total", "Hits.", lambda: 3, kind="counter")
+    registry.gauge("jobs_running", "Jobs.", lambda: float("inf"))
+
+    counter.inc(route='/api/"x"\n')
+    counter.inc(2, route='/api/"x"\n')
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/api/\\"x\\"\\n"} 3.0',
+        "# HELP cache_hits_total Hits.",
+        "# TYPE cache_hits_total counter",
+        "cache_hits_total 3.0",
+        "# HELP jobs_running Jobs.",
+        "# TYPE jobs_running gauge",
+        "jobs_running +Inf",
+    ]
+
+
+def test_labels_checked():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.", ["route"])
+
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc(method="GET")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.counter("requests_total", "Requests.")
+
+
+def test_stage_timer():
+    timer = StageTimer(started=0)
+    with timer.span("solve"):
+        pass
+    with timer.span("solve"):
+        pass
+    timer.record_unit(1, 0.25)
+    timer.record_unit(1, 0.5)
+    timer.record_unit(0, 0.125)
+
+    report = timer.report([{"type": "TwoRollPass", "label": "Oval"}])
+
+    assert set(report["stages"]) == {"solve"}
+    assert report["units"] == [
+        {"unit": 0, "type": "TwoRollPass", "label": "Oval", "seconds": 0.125, "solves": 1},
+        {"unit": 1, "type": None, "label": None, "seconds": 0.75, "solves": 2},
+    ]
+
+
+def test_middleware_observes_requests():
+    registry = MetricsRegistry()
+    requests = registry.histogram("request_seconds", "Requests.", ["method", "route", "status"])
+    stages = registry.histogram("stage_seconds", "Stages.", ["stage"])
+
+    async def app(scope, receive, send):
+        scope["state"]["handler_done"] = scope["state"]["received"]
+        await send({"type": "http.response.start", "status": 200})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message["type"])
+
+    middleware = RequestMetricsMiddleware(app, requests, stages)
+    asyncio.run(middleware({"type": "http", "method": "GET"}, None, send))
+
+    rendered = registry.render()
+    assert sent == ["http.response.start", "http.response.body"]
+    assert 'request_seconds_count{method="GET",route="unmatched",status="200"} 1' in rendered
+    assert 'stage_seconds_count{stage="response_encoding"} 1' in rendered
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from pyroll.gui.backend.simulation.montecarlo import OutputStatistics, sample_parameters, sample_requests
+
+DISTRIBUTIONS = [
+    {"distribution": "normal", "mean": 1200, "std": 50, "lower": 1150, "upper": 1300},
+    {"distribution": "uniform", "lower": 0.02, "upper": 0.03},
+    {"distribution": "triangular", "lower": 1, "mode": 2, "upper": 4},
+]
+
+
+def test_same_seed_same_samples():
+    first = sample_parameters(DISTRIBUTIONS, 200, seed=42)
+    second = sample_parameters(DISTRIBUTIONS, 200, seed=42)
+    other = sample_parameters(DISTRIBUTIONS, 200, seed=43)
+
+    assert first.shape == (200, 3)
+    np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first, other)
+
+
+def test_bounds():
+    values = sample_parameters(DISTRIBUTIONS, 2000, seed=0)
+
+    assert values[:, 0].min() == 1150
+    assert values[:, 0].max() <= 1300
+    assert np.all((values[:, 1] >= 0.02) & (values[:, 1] < 0.03))
+    assert np.all((values[:, 2] >= 1) & (values[:, 2] <= 4))
+
+
+def test_no_parameters():
+    assert sample_parameters([], 5, seed=0).shape == (5, 0)
+
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError, match="lognormal"):
+        sample_parameters([{"distribution": "lognormal"}], 5)
+
+
+def test_sample_requests():
+    base = {"inProfile": {"temperature": 1200}, "passDesignData": [{"gap": 0.002}]}
+    values = np.array([[1100, 0.003], [1250, 0.004]])
+
+    requests = list(sample_requests(base, ["inProfile.temperature", "passDesignData[0].gap"], values))
+
+    assert [r["inProfile"]["temperature"] for r in requests] == [1100, 1250]
+    assert [r["passDesignData"][0]["gap"] for r in requests] == [0.003, 0.004]
+    assert base["inProfile"]["temperature"] == 1200
+
+
+def test_sensitivity():
+    inputs = sample_parameters(DISTRIBUTIONS[:2], 100, seed=1)
+    statistics = OutputStatistics(100, 1, ["roll_force"])
+    for i, (temperature, _) in enumerate(inputs):
+        statistics.add(i, {"passes": [{"pass": 1, "label": "Box", "roll_force": [3e5 - 100 * temperature] * 2}]})
+
+    unit, = statistics.summary(inputs, ["temperature", "gap"], [5, 95])
+    force = unit["outputs"]["roll_force"]
+
+    assert force["sensitivity"]["temperature"] == pytest.approx(-1)
+    assert force["sensitivity"]["gap"] == pytest.approx(0, abs=1e-9)
+    assert force["r2"] == pytest.approx(1)
+    assert set(force["percentiles"]) == {"5", "95"}
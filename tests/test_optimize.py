@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from pyroll.gui.backend.simulation.optimize import (
+    PENALTY, PatternSearch, candidate_requests, parameter_path, score
+)
+
+
+def minimize(search, objective, max_polls=1000):
+    polls = 0
+    while polls < max_polls:
+        points = search.poll()
+        if not points:
+            return polls
+        search.tell(points, [objective(search.values(p)) for p in points])
+        polls += 1
+    raise AssertionError("not converged")
+
+
+def test_converges_to_minimum():
+    search = PatternSearch([0, -5], [10, 5], [9, 4], min_step=1e-4)
+
+    minimize(search, lambda v: (v[0] - 3) ** 2 + 2 * (v[1] + 1.5) ** 2)
+
+    assert search.converged
+    assert search.values(search.best) == pytest.approx([3, -1.5], abs=1e-3)
+    assert search.best_value == pytest.approx(0, abs=1e-5)
+
+
+def test_minimum_outside_bounds():
+    search = PatternSearch([0, 0], [1, 1], [0.5, 0.5])
+    evaluated = []
+
+    def objective(values):
+        evaluated.append(values)
+        return (values[0] - 3) ** 2 + (values[1] - 0.25) ** 2
+
+    minimize(search, objective)
+
+    assert search.values(search.best) == pytest.approx([1, 0.25], abs=1e-3)
+    assert all(0 <= v <= 1 for values in evaluated for v in values)
+
+
+def test_initial_clipped():
+    search = PatternSearch([1, 1], [2, 2], [0, 5])
+
+    start, = search.poll()
+    assert search.values(start) == [1, 2]
+
+
+def test_step_halved_only_without_improvement():
+    search = PatternSearch([0], [1], [0.5], step=0.25)
+
+    search.tell(search.poll(), [1.0])
+    assert search.step == 0.25
+
+    # one step up and one down
+    points = search.poll()
+    assert [p[0] for p in points] == [0.75, 0.25]
+    search.tell(points, [2.0, 0.5])
+    assert search.step == 0.25
+    assert search.best[0] == 0.25
+
+    # of the neighbours of the new best point, 0.5 is known already
+    points = search.poll()
+    assert [p[0] for p in points] == [0.0]
+    search.tell(points, [3.0])
+    assert search.step == 0.125
+
+
+def test_step_halved_when_all_neighbours_seen():
+    search = PatternSearch([0], [1], [1.0], step=0.5)
+    search.tell(search.poll(), [0.0])
+
+    # 1.5 is clipped to the start point, which is known already
+    points = search.poll()
+    assert [p[0] for p in points] == [0.5]
+
+
+def test_converged_search_polls_nothing():
+    search = PatternSearch([0], [1], [0.5], step=1e-3, min_step=1e-3)
+    search.tell(search.poll(), [1.0])
+    search.tell(search.poll(), [2.0, 2.0])
+
+    assert search.converged
+    assert search.poll() == []
+
+
+def unit(**values):
+    return {"type": "TwoRollPass", **values}
+
+
+def test_score_targets():
+    result = {"passes": [unit(out_profile_width=0.03), unit(out_profile_width=[0.022, 0.022], out_profile_height=0.01)]}
+
+    scored = score(result, {"width": 0.02, "height": 0.01}, {})
+
+    assert scored["deviation"] == pytest.approx(0.01)
+    assert scored["objective"] == pytest.approx(0.01)
+    assert scored["feasible"]
+    assert scored["final"] == {"width": 0.022, "height": 0.01}
+
+
+def test_score_constraint_penalties():
+    result = {"passes": [
+        unit(filling_ratio=0.8, roll_force=[1.2e5, 1e5]),
+        {"type": "Transport", "roll_force": 1e9},
+        unit(filling_ratio=1.1, power=3e5, out_profile_width=0.02),
+    ]}
+    constraints = {"filling_ratio_min": 0.9, "filling_ratio_max": 1.0, "max_roll_force": 1e5, "max_power": None}
+
+    scored = score(result, {"width": 0.02}, constraints)
+
+    violation = (0.1 / 0.9) ** 2 + 0.2 ** 2 + 0.1 ** 2
+    assert scored["violation"] == pytest.approx(violation)
+    assert scored["objective"] == pytest.approx(PENALTY * violation)
+    assert not scored["feasible"]
+
+
+def test_score_missing_target():
+    with pytest.raises(ValueError, match="height"):
+        score({"passes": [unit(out_profile_width=0.02)]}, {"height": 0.01}, {})
+
+
+def test_candidate_requests_keep_base():
+    base = {
+        "inProfile": {"diameter": 0.03},
+        "passDesignData": [unit(gap=0.002, nominal_radius=0.16), {"type": "Transport"}, unit(gap=0.003)],
+    }
+    paths = [parameter_path(0, "gap"), parameter_path(2, "gap")]
+
+    candidates = candidate_requests(base, paths, [[0.001, 0.004], np.array([0.005, 0.006]).tolist()])
+
+    assert [overrides for overrides, _ in candidates] == [
+        {"passDesignData[0].gap": 0.001, "passDesignData[2].gap": 0.004},
+        {"passDesignData[0].gap": 0.005, "passDesignData[2].gap": 0.006},
+    ]
+    assert [[u.get("gap") for u in r["passDesignData"]] for _, r in candidates] == [
+        [0.001, None, 0.004], [0.005, None, 0.006]
+    ]
+    assert candidates[0][1]["passDesignData"][0]["nominal_radius"] == 0.16
+    assert [u.get("gap") for u in base["passDesignData"]] == [0.002, None, 0.003]
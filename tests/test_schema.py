@@ -0,0 +1,72 @@
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from pyroll.gui.backend.simulation.schema import InProfileData, PassDesignUnit, json_schemas
+
+UNITS = TypeAdapter(List[PassDesignUnit])
+IN_PROFILE = TypeAdapter(InProfileData)
+
+TWO_ROLL_PASS = {
+    "id": 1, "type": "TwoRollPass", "label": "Oval I", "grooveType": "CircularOvalGroove",
+    "groove": {"depth": 8e-3, "r1": 6e-3, "r2": 40e-3}, "nominal_radius": 160e-3, "velocityValue": 1,
+    "gap": 2e-3, "orientation": "h",
+}
+
+
+def errors(adapter, value):
+    with pytest.raises(ValidationError) as e:
+        adapter.validate_python(value)
+    return [".".join(str(part) for part in error["loc"]) for error in e.value.errors()]
+
+
+@pytest.mark.parametrize("name", ["bar_mill_short", "cooling_heavy", "wire_rod_long"])
+def test_fixture_designs_valid(designs, name):
+    design = designs[name]
+
+    # the dictionaries come back as sent, the cache keys depend on that
+    assert UNITS.validate_python(design["passDesignData"]) == design["passDesignData"]
+    assert IN_PROFILE.validate_python(design["inProfile"]) == design["inProfile"]
+
+
+def test_defaults_not_added():
+    transport = {"type": "Transport", "transportValue": 1}
+    assert UNITS.validate_python([transport]) == [transport]
+
+
+def test_unknown_unit_types_pass_through():
+    row = {"type": "Sketch", "anything": [1, 2]}
+    assert UNITS.validate_python([row]) == [row]
+
+
+def test_invalid_rows():
+    assert errors(UNITS, [{**TWO_ROLL_PASS, "gap": -1}]) == ["0.TwoRollPass.gap"]
+    assert errors(UNITS, [{**TWO_ROLL_PASS, "grooveType": "NoGroove"}]) == ["0.TwoRollPass.grooveType"]
+    assert errors(UNITS, [{**TWO_ROLL_PASS, "orientation": "sideways"}]) == ["0.TwoRollPass.orientation"]
+    assert errors(UNITS, [{**TWO_ROLL_PASS, "groove": {"depth": 8e-3, "r1": 6e-3}}]) == ["0.TwoRollPass.groove"]
+    assert errors(UNITS, [{k: v for k, v in TWO_ROLL_PASS.items() if k != "nominal_radius"}]) == \
+        ["0.TwoRollPass.nominal_radius"]
+
+
+def test_groove_choices():
+    diamond = {**TWO_ROLL_PASS, "grooveType": "DiamondGroove", "groove": {"r1": 1e-3, "r2": 2e-3}}
+
+    assert UNITS.validate_python([{**diamond, "groove": {**diamond["groove"], "usable_width": 0.02,
+                                                         "tip_depth": 0.005}}])
+    assert errors(UNITS, [{**diamond, "groove": {**diamond["groove"], "usable_width": 0.02}}]) == \
+        ["0.TwoRollPass.groove"]
+
+
+def test_invalid_in_profiles():
+    assert errors(IN_PROFILE, {"shape": "round", "temperature": 1200}) == ["round.diameter"]
+    assert errors(IN_PROFILE, {"shape": "round", "diameter": 0.03, "temperature": -1}) == ["round.temperature"]
+    assert errors(IN_PROFILE, {"shape": "triangle", "temperature": 1200}) == [""]
+
+
+def test_json_schemas():
+    schemas = json_schemas()
+
+    assert set(schemas) == {"pass_design_unit", "in_profile", "grooves"}
+    assert "RoundGroove" in schemas["grooves"]
+    assert "r2" in schemas["grooves"]["RoundGroove"]["properties"]
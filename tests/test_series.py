@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from pyroll.gui.backend.simulation.series import lttb, reduce_lines, result_series
+
+
+@pytest.mark.parametrize("size, max_points", [(1000, 3), (1000, 50), (101, 100), (7, 5)])
+def test_lttb_keeps_endpoints_and_budget(size, max_points):
+    x = np.arange(size, dtype=float)
+    y = np.sin(x / 10) + np.random.default_rng(0).normal(0, 0.1, size)
+
+    indices = lttb(x, y, max_points)
+
+    assert len(indices) == max_points
+    assert indices[0] == 0
+    assert indices[-1] == size - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_short_lines_unchanged():
+    x = np.arange(10, dtype=float)
+    assert lttb(x, x ** 2, 10).tolist() == list(range(10))
+    assert lttb(x, x ** 2, 100).tolist() == list(range(10))
+
+
+def test_lttb_keeps_peak():
+    x = np.arange(500, dtype=float)
+    y = np.zeros(500)
+    y[317] = 1
+
+    assert 317 in lttb(x, y, 20)
+
+
+def test_result_series():
+    passes = [
+        {"pass": 1, "label": "Box", "in_profile_width": 0.1, "out_profile_width": 0.09, "roll_force": [1e5, 1e5]},
+        {"label": "Transport", "in_profile_width": 0.09, "out_profile_width": 0.09},
+        {"pass": 2, "label": "Oval", "in_profile_width": 0.09, "out_profile_width": 0.08, "roll_force": [2e5, 2e5]},
+    ]
+
+    series = result_series({"passes": passes}, ["width", "roll_force"], 100)
+
+    assert series["width"]["x"] == [-0.5, 0.5, 1.5, 2.5]
+    assert series["width"]["y"] == [0.1, 0.09, 0.09, 0.08]
+    assert series["width"]["labels"] == ["Input", "Box", "Transport", "Oval"]
+    assert series["roll_force"]["x"] == [0.5, 2.5]
+    assert series["roll_force"]["pass"] == [1, 2]
+    assert series["roll_force"]["points"] == 2
+
+
+def test_reduce_lines():
+    angles = np.linspace(0, 2 * np.pi, 2001)
+    circle = {"x": np.cos(angles).tolist(), "y": np.sin(angles).tolist()}
+    circle["x"][-1], circle["y"][-1] = circle["x"][0], circle["y"][0]
+    short = {"x": [0.0, 1.0], "y": [0.0, 1.0]}
+
+    reduced = reduce_lines({"contours": [circle, short], "label": "Round"}, 100)
+
+    line = reduced["contours"][0]
+    assert 3 <= len(line["x"]) <= 100
+    assert len(line["x"]) == len(line["y"])
+    # closed contours stay closed
+    assert (line["x"][0], line["y"][0]) == (line["x"][-1], line["y"][-1])
+    assert reduced["contours"][1] is short
+    assert reduced["label"] == "Round"
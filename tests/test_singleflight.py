@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from pyroll.gui.backend.simulation.singleflight import SingleFlight
+
+
+def test_concurrent_calls_coalesce():
+    async def main():
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def compute(all_disconnected):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"value": 42}
+
+        waiters = [asyncio.ensure_future(flights.run("a", compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert "a" in flights and flights.in_flight == 1
+
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == 1
+        assert all(r is results[0] for r in results)
+        assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 2}
+
+    asyncio.run(main())
+
+
+def test_different_keys_run_separately():
+    async def main():
+        flights = SingleFlight()
+
+        async def compute(all_disconnected):
+            await asyncio.sleep(0)
+            return object()
+
+        first, second = await asyncio.gather(flights.run("a", compute), flights.run("b", compute))
+
+        assert first is not second
+        assert flights.stats()["started"] == 2
+
+    asyncio.run(main())
+
+
+def test_exception_shared_and_key_released():
+    async def main():
+        flights = SingleFlight()
+
+        async def fail(all_disconnected):
+            await asyncio.sleep(0)
+            raise ValueError("unsolvable")
+
+        outcomes = await asyncio.gather(flights.run("a", fail), flights.run("a", fail), return_exceptions=True)
+        assert [type(o) for o in outcomes] == [ValueError, ValueError]
+        assert "a" not in flights
+
+        async def succeed(all_disconnected):
+            return 1
+
+        # a failed computation is not remembered
+        assert await flights.run("a", succeed) == 1
+
+    asyncio.run(main())
+
+
+def test_cancelled_only_when_all_callers_gone():
+    async def main():
+        flights = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def compute(all_disconnected):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.ensure_future(flights.run("a", compute))
+        second = asyncio.ensure_future(flights.run("a", compute))
+        await started.wait()
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        with pytest.raises(asyncio.CancelledError):
+            await second
+
+    asyncio.run(main())
+
+
+def test_all_disconnected():
+    async def main():
+        flights = SingleFlight()
+        connected = {"first": True, "second": True}
+
+        def check(name):
+            async def is_disconnected():
+                return not connected[name]
+            return is_disconnected
+
+        async def compute(all_disconnected):
+            states = []
+            for name in ("first", "second"):
+                await asyncio.sleep(0.01)
+                connected[name] = False
+                states.append(await all_disconnected())
+            return states
+
+        results = await asyncio.gather(
+            flights.run("a", compute, is_disconnected=check("first")),
+            flights.run("a", compute, is_disconnected=check("second")),
+        )
+
+        assert results[0] == [False, True]
+
+    asyncio.run(main())
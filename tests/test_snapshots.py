@@ -0,0 +1,64 @@
+import copy
+
+import pytest
+
+from pyroll.gui.backend.simulation import pyroll_basic_runner
+from pyroll.gui.backend.simulation.pyroll_basic_runner import run_pyroll_simulation
+from pyroll.gui.backend.simulation.snapshots import PrefixSnapshotCache, prefix_keys
+from pyroll.gui.backend.simulation.sweep import run_simulation_batch
+
+
+@pytest.fixture
+def snapshots(monkeypatch):
+    cache = PrefixSnapshotCache(max_entries=100)
+    monkeypatch.setattr(pyroll_basic_runner, "prefix_snapshots", cache)
+    return cache
+
+
+def scalars(result):
+    return [{k: v for k, v in p.items() if isinstance(v, float)} for p in result["passes"]]
+
+
+def test_prefix_keys_shared_up_to_first_change():
+    in_profile = {"shape": "round", "diameter": 0.03}
+    units = [{"type": "Transport", "duration": 1}, {"type": "Transport", "duration": 2}]
+    changed = [units[0], {"type": "Transport", "duration": 3}]
+
+    keys = prefix_keys(in_profile, units)
+    assert prefix_keys(in_profile, changed)[0] == keys[0]
+    assert prefix_keys(in_profile, changed)[1] != keys[1]
+    assert prefix_keys({"shape": "round", "diameter": 0.04}, units)[0] != keys[0]
+
+
+def test_restart_matches_fresh_solve(designs, snapshots):
+    design = designs["bar_mill_short"]
+    run_pyroll_simulation(design["passDesignData"], design["inProfile"])
+
+    changed = copy.deepcopy(design["passDesignData"])
+    last_pass = max(i for i, u in enumerate(changed) if u["type"] == "TwoRollPass")
+    changed[last_pass]["gap"] *= 1.1
+
+    restarted = run_pyroll_simulation(changed, design["inProfile"])
+    fresh = run_pyroll_simulation(changed, design["inProfile"], use_snapshots=False)
+
+    assert restarted["timings"]["reused_units"] == last_pass
+    assert snapshots.stats()["hits"] == 1
+
+    assert len(restarted["passes"]) == len(fresh["passes"])
+    for restarted_unit, fresh_unit in zip(scalars(restarted), scalars(fresh)):
+        assert restarted_unit.keys() == fresh_unit.keys()
+        for name, value in fresh_unit.items():
+            assert restarted_unit[name] == pytest.approx(value, rel=1e-3), name
+
+
+def test_batch_without_snapshots(designs, snapshots):
+    design = designs["bar_mill_short"]
+    requests = [design, {**design, "inProfile": {**design["inProfile"], "temperature": 1400}}]
+
+    outcomes = run_simulation_batch(requests, use_snapshots=False)
+
+    assert [o["error"] for o in outcomes] == [None, None]
+    assert snapshots.stats()["entries"] == 0
+
+    run_simulation_batch(requests[:1])
+    assert snapshots.stats()["entries"] > 0
@@ -0,0 +1,105 @@
+import itertools
+
+import pytest
+
+from pyroll.gui.backend.simulation.sweep import apply_override, expand_variants, lookup_value, parameter_values, \
+    parse_path, variant_count
+
+BASE = {
+    "inProfile": {"temperature": 1200, "diameter": 0.03},
+    "passDesignData": [
+        {"type": "TwoRollPass", "gap": 0.002, "groove": {"r1": 0.001}},
+        {"type": "Transport", "duration": 1},
+        {"type": "TwoRollPass", "gap": 0.003, "groove": {"r1": 0.002}},
+    ],
+}
+
+
+def test_parse_path():
+    assert parse_path("passDesignData[3].groove.r1") == ["passDesignData", 3, "groove", "r1"]
+    assert parse_path("inProfile.temperature") == ["inProfile", "temperature"]
+
+
+@pytest.mark.parametrize("path", ["", ".inProfile", "inProfile..x", "inProfile[x]", "passDesignData[-1].gap",
+                                  "passDesignData[0]gap!", "solve_params.in_velocity", "gap"])
+def test_parse_path_invalid(path):
+    with pytest.raises(ValueError):
+        parse_path(path)
+
+
+def test_apply_override():
+    request = {"inProfile": {}, "passDesignData": [{"groove": None}]}
+
+    apply_override(request, "inProfile.temperature", 1100)
+    apply_override(request, "passDesignData[0].groove.r1", 0.002)
+
+    assert request == {"inProfile": {"temperature": 1100}, "passDesignData": [{"groove": {"r1": 0.002}}]}
+    assert lookup_value(request, "passDesignData[0].groove.r1") == 0.002
+    assert lookup_value(request, "passDesignData[0].groove.r2") is None
+
+
+@pytest.mark.parametrize("path", ["passDesignData[3].gap", "passDesignData[3]", "inProfile.temperature[1]"])
+def test_apply_override_out_of_range(path):
+    with pytest.raises(ValueError):
+        apply_override({"inProfile": {"temperature": [1]}, "passDesignData": [{}]}, path, 1)
+
+
+def test_parameter_values():
+    assert parameter_values([3, 1], None, None, None) == [3, 1]
+    assert parameter_values(None, 1, 2, 0.25) == pytest.approx([1, 1.25, 1.5, 1.75, 2])
+    assert parameter_values(None, 2, 1, -0.5) == pytest.approx([2, 1.5, 1])
+
+
+@pytest.mark.parametrize("start, stop, step", [(1, 2, None), (1, 2, 0), (2, 1, 0.5), (None, 1, 0.1)])
+def test_parameter_values_invalid(start, stop, step):
+    with pytest.raises(ValueError):
+        parameter_values(None, start, stop, step)
+
+
+def test_parameter_values_limit():
+    assert len(parameter_values(None, 0, 1, 0.01, max_count=101)) == 101
+
+    with pytest.raises(ValueError, match="limit"):
+        parameter_values(None, 0, 1, 1e-12, max_count=1000)
+
+
+def test_variant_count():
+    grid = {"inProfile.temperature": [1, 2, 3], "passDesignData[0].gap": [1, 2]}
+
+    assert variant_count(grid) == 6
+    assert variant_count(grid, [{"inProfile.diameter": 1}, {"inProfile.diameter": 2}]) == 12
+    assert variant_count({}) == 1
+
+
+def test_expand_variants_order():
+    grid = {
+        "passDesignData[2].gap": [0.1, 0.2],
+        "inProfile.temperature": [1100, 1150],
+        "passDesignData[0].gap": [0.3, 0.4],
+    }
+    variants = [{"inProfile.diameter": 0.02}, {"inProfile.diameter": 0.04}]
+
+    expanded = list(expand_variants(BASE, grid, variants))
+
+    # variants outermost, then the grid parameters in sequence order, so the last unit changes fastest
+    expected = [
+        (variant, point)
+        for variant in variants
+        for point in itertools.product([1100, 1150], [0.3, 0.4], [0.1, 0.2])
+    ]
+    assert len(expanded) == variant_count(grid, variants)
+    for (overrides, request), (variant, (temperature, first_gap, last_gap)) in zip(expanded, expected):
+        assert overrides == {**variant, "inProfile.temperature": temperature,
+                             "passDesignData[0].gap": first_gap, "passDesignData[2].gap": last_gap}
+        assert request["inProfile"] == {"temperature": temperature, "diameter": variant["inProfile.diameter"]}
+        assert request["passDesignData"][0]["gap"] == first_gap
+        assert request["passDesignData"][2]["gap"] == last_gap
+
+    assert BASE["inProfile"]["temperature"] == 1200
+
+
+def test_expand_variants_lazy():
+    variants = expand_variants(BASE, {"passDesignData[5].gap": [1]})
+
+    with pytest.raises(ValueError):
+        next(variants)